@@ -0,0 +1,60 @@
+"""
+Measures the throughput of the UltraStar parser.
+
+Run with ``python -m benchmarks.ultrastar [--files N]``. The benchmark generates
+``N`` synthetic songs in a temporary directory and parses all of them.
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from karman.ultrastar import parse_file
+
+
+def write_song(path: Path, index: int, notes: int) -> None:
+    lines = [
+        f"#TITLE:Song {index}",
+        f"#ARTIST:Artist {index % 100} feat. Guest {index % 7}",
+        f"#MP3:Song {index}.mp3",
+        f"#YEAR:{1960 + index % 60}",
+        "#GENRE:Pop",
+        "#BPM:300,12",
+        "#GAP:1234",
+    ]
+    beat = 0
+    for note in range(notes):
+        kind = "*" if random.random() < 0.02 else ":"
+        lines.append(f"{kind} {beat} 4 {random.randint(-5, 15)} la")
+        beat += 5
+        if note % 8 == 7:
+            lines.append(f"- {beat}")
+            beat += 4
+    lines.append("E")
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--notes", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [Path(directory) / f"{i}.txt" for i in range(args.files)]
+        for i, path in enumerate(paths):
+            write_song(path, i, args.notes)
+
+        start = time.perf_counter()
+        for path in paths:
+            parse_file(path)
+        elapsed = time.perf_counter() - start
+    print(
+        f"Parsed {args.files} files in {elapsed:.3f}s "
+        f"({args.files / elapsed:,.0f} files/s, {elapsed / args.files * 1e6:.1f}µs/file)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measures the startup cost of the versioned API.
+
+Run with ``python -m benchmarks.versioning [--versions N]``. The benchmark measures the
+time it takes to import ``karman.main`` in a fresh interpreter and the time it takes to
+build ``N`` versioned apps from the Karman routes, once with the route selector of
+``karman.versioning`` and once with a selector that deep-copies every route (the
+previous implementation).
+"""
+import argparse
+import copy
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute
+
+from karman.main import api
+from karman.versioning import select_routes, strict_version_selector
+
+Selector = Callable[[BaseRoute], Optional[BaseRoute]]
+
+
+def deepcopy_selector(major: int) -> Selector:
+    selector = strict_version_selector(major)
+
+    def deepcopy(route: BaseRoute) -> Optional[BaseRoute]:
+        selected = selector(route)
+        return copy.deepcopy(selected) if selected is not None else None
+
+    return deepcopy
+
+
+def build_apps(versions: int, selector: Callable[[int], Selector]) -> float:
+    start = time.perf_counter()
+    for _ in range(versions):
+        app = FastAPI()
+        # All versions select the routes of version 1, which is equivalent to an API
+        # where every route is available in every version.
+        select_routes(api, app, selector(1))
+    return time.perf_counter() - start
+
+
+def import_time() -> float:
+    code = "import time; s = time.perf_counter(); import karman.main; "
+    code += "print(time.perf_counter() - s)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return float(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--versions", type=int, default=10)
+    args = parser.parse_args()
+
+    routes = len(api.routes)
+    print(f"Import of karman.main: {import_time() * 1000:.1f}ms")
+    print(f"Building {args.versions} versions with {routes} routes each:")
+    for name, selector in (
+        ("deepcopy", deepcopy_selector),
+        ("shared routes", strict_version_selector),
+    ):
+        elapsed = build_apps(args.versions, selector)
+        print(
+            f"  {name:14} {elapsed * 1000:8.1f}ms "
+            f"({elapsed / args.versions * 1000:.2f}ms per version)"
+        )
+
+
+if __name__ == "__main__":
+    main()
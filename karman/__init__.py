@@ -1 +1,13 @@
-from .main import app
+__all__ = ["app"]
+
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    # The app is imported on first access so that the CLI, migrations and other
+    # users of the submodules do not pay for building the whole API.
+    if name == "app":
+        from .main import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
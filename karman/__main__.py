@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import getpass
+from pathlib import Path
+
+from karman import library, models, oauth, ratings
+from karman.config import configure_logging, settings
+
+
+async def import_songs(args: argparse.Namespace) -> None:
+    async with models.database:
+        await library.import_songs(args.root, workers=args.workers)
+
+
+async def reconcile_ratings(args: argparse.Namespace) -> None:
+    async with models.database:
+        await ratings.reconcile_ratings(batch_size=args.batch_size)
+
+
+async def hash_password(args: argparse.Namespace) -> None:
+    password = getpass.getpass()
+    if password != getpass.getpass("Repeat password: "):
+        raise SystemExit("The passwords do not match.")
+    print(oauth.hash_password(password))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m karman", description="Management commands for Karman."
+    )
+    commands = parser.add_subparsers(title="commands", required=True)
+
+    import_parser = commands.add_parser(
+        "import",
+        aliases=["rescan"],
+        help="Import all UltraStar songs from a directory into the library. Songs "
+        "that were imported before are only parsed again if their file changed.",
+    )
+    import_parser.add_argument(
+        "root", type=Path, help="The directory containing the songs."
+    )
+    import_parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.import_workers,
+        help="The number of worker processes used to parse songs.",
+    )
+    import_parser.set_defaults(command=import_songs)
+
+    reconcile_parser = commands.add_parser(
+        "reconcile-ratings",
+        help="Recompute the rating counters of all songs from their ratings. Run this "
+        "after ratings were changed outside of Karman.",
+    )
+    reconcile_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="The number of songs that are processed in a single transaction.",
+    )
+    reconcile_parser.set_defaults(command=reconcile_ratings)
+
+    hash_parser = commands.add_parser(
+        "hash-password",
+        help="Create the hash of a password for the 'users' setting.",
+    )
+    hash_parser.set_defaults(command=hash_password)
+
+    args = parser.parse_args()
+    configure_logging()
+    asyncio.run(args.command(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+__all__ = ["CacheStats", "CachedResponse", "ResponseCache"]
+
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    """A serialized response stored in a ``ResponseCache``."""
+
+    body: bytes
+    headers: Dict[str, str]
+    expires: float
+
+
+class CacheStats(NamedTuple):
+    """Statistics about a ``ResponseCache``."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+
+class ResponseCache:
+    """
+    An in-memory LRU cache of serialized responses.
+
+    The cache is bounded by the total size of the cached bodies. Entries expire after
+    ``ttl`` seconds. The cache can be cleared explicitly, e.g. when the underlying
+    data changes. Because a response might be computed while the data changes, each
+    entry is stored with the ``generation`` of the cache that was current before the
+    response was computed. Entries from earlier generations are discarded.
+    ``cleared_at`` is the time of the last clear so that callers can avoid caching
+    responses computed from data that may not include the latest changes yet.
+
+    :param max_size: The maximum total size of all cached bodies in bytes. A size of
+                     ``0`` disables the cache.
+    :param ttl: The number of seconds after which an entry expires.
+    :param clock: A monotonic clock returning seconds.
+    """
+
+    def __init__(
+        self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.generation = 0
+        self.cleared_at = -math.inf
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._hits = self._misses = self._evictions = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """Returns the current statistics of the cache."""
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            entries=len(self._entries),
+            size=self._size,
+        )
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """
+        Returns the entry for ``key`` or ``None`` if there is no current entry.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires <= self.clock():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry
+
+    def put(
+        self, key: Hashable, body: bytes, headers: Dict[str, str], generation: int
+    ) -> None:
+        """
+        Stores a response for ``key``. Responses that are larger than the cache or
+        were computed in an earlier ``generation`` are not stored.
+        """
+        if generation != self.generation or len(body) > self.max_size:
+            return
+        self._remove(key)
+        self._entries[key] = CachedResponse(body, headers, self.clock() + self.ttl)
+        self._size += len(body)
+        while self._size > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def clear(self, *args: Any) -> None:
+        """
+        Removes all entries and starts a new generation. Arguments are ignored so that
+        this method can be connected to signals.
+        """
+        self.generation += 1
+        self.cleared_at = self.clock()
+        self._entries.clear()
+        self._size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
@@ -1 +1 @@
-from .settings import settings
+from .settings import configure_logging, settings
@@ -3,7 +3,6 @@ __all__ = ["ConfigFileSettingsSource", "SQLiteDsn", "PostgresDsn", "MySQLDsn"]
 from pathlib import Path
 from typing import Any, Dict, Optional, Sequence, Union
 
-import yaml
 from pydantic import AnyUrl, BaseSettings
 
 
@@ -26,6 +25,9 @@ class ConfigFileSettingsSource:
         for path in self.file:
             file = Path(path).expanduser()
             if file.exists():
+                # PyYAML is only imported if there is a config file.
+                import yaml
+
                 with file.open("r", encoding=self.encoding) as stream:
                     # Since YAML is a superset of JSON this can process JSON
                     # configs as well.
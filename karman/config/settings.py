@@ -1,12 +1,12 @@
-__all__ = ["settings"]
+__all__ = ["settings", "configure_logging"]
 
 import os
+from functools import lru_cache
 from logging.config import dictConfig
 from pathlib import Path
-from typing import Any, Dict, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-import yaml
-from pydantic import BaseSettings, Extra, Field, FilePath
+from pydantic import BaseSettings, Extra, Field, FilePath, SecretStr
 from pydantic.env_settings import SettingsSourceCallable
 
 from .helpers import ConfigFileSettingsSource, MySQLDsn, PostgresDsn, SQLiteDsn
@@ -80,7 +80,9 @@ class Settings(BaseSettings):
         title="Logging Configuration",
         description="Either the path to a JSON or YAML file according to the Logging "
         "Config Dict Schema or an embedded dictionary that is used to configure "
-        "logging.",
+        "logging. Additionally the config may contain the key 'queue'. If it is true, "
+        "log records are formatted and written by background threads instead of the "
+        "thread that logs them.",
     )
     app_name: str = Field(
         "Karman API",
@@ -91,6 +93,178 @@ class Settings(BaseSettings):
         title="Database connection string",
         description="A SQLAlchemy database connection URL.",
     )
+    db_replica_urls: List[Union[SQLiteDsn, MySQLDsn, PostgresDsn]] = Field(
+        [],
+        title="Read Replica Connection Strings",
+        description="SQLAlchemy database connection URLs of read-only replicas of the "
+        "database. Read-only endpoints are distributed among the healthy replicas.",
+    )
+    db_replica_check_interval: float = Field(
+        10,
+        gt=0,
+        title="Replica Health Check Interval",
+        description="The number of seconds between two health checks of the "
+        "replicas.",
+    )
+    db_read_your_writes: float = Field(
+        5,
+        ge=0,
+        title="Read Your Writes Time",
+        description="The number of seconds after a client changed data during which "
+        "its requests are served by the primary database instead of a replica. 0 "
+        "disables this.",
+    )
+    db_pool_min_size: Optional[int] = Field(
+        None,
+        ge=0,
+        title="Minimum Connection Pool Size",
+        description="The number of connections that are opened when the app starts "
+        "and kept open. Only used with PostgreSQL and MySQL. By default the "
+        "default of the database driver is used.",
+    )
+    db_pool_max_size: Optional[int] = Field(
+        None,
+        ge=1,
+        title="Maximum Connection Pool Size",
+        description="The maximum number of connections per worker process. Only used "
+        "with PostgreSQL and MySQL. By default the default of the database driver is "
+        "used.",
+    )
+    db_connect_timeout: Optional[float] = Field(
+        None,
+        gt=0,
+        title="Connection Timeout",
+        description="The number of seconds after which connecting to the database "
+        "fails. Only used with PostgreSQL and MySQL.",
+    )
+    db_statement_cache_size: Optional[int] = Field(
+        None,
+        ge=0,
+        title="Prepared Statement Cache Size",
+        description="The number of prepared statements cached per connection. Only "
+        "used with PostgreSQL and SQLite. Set this to 0 if you connect to PostgreSQL "
+        "through a connection pooler like PgBouncer in transaction mode.",
+    )
+    db_pool_recycle: Optional[float] = Field(
+        None,
+        gt=0,
+        title="Connection Recycling Time",
+        description="The number of seconds after which connections are replaced. With "
+        "PostgreSQL this applies to idle connections only. Only used with PostgreSQL "
+        "and MySQL.",
+    )
+    db_profiling: bool = Field(
+        False,
+        title="Database Profiling Switch",
+        description="Adds a Server-Timing header with the number and duration of "
+        "database queries to every response and logs slow queries with their "
+        "parameters and query plan.",
+    )
+    db_slow_query_threshold: float = Field(
+        0.1,
+        ge=0,
+        title="Slow Query Threshold",
+        description="The number of seconds after which a query is logged as slow if "
+        "database profiling is enabled.",
+    )
+    import_workers: Optional[int] = Field(
+        None,
+        ge=1,
+        title="Import Worker Processes",
+        description="The number of worker processes used to parse songs during a "
+        "library import. By default one worker per CPU is used.",
+    )
+    song_cache_size: int = Field(
+        16 * 1024 * 1024,
+        ge=0,
+        title="Song List Cache Size",
+        description="The maximum size in bytes of the cache for song list responses. "
+        "The least recently used responses are evicted when the cache grows larger. A "
+        "size of 0 disables the cache.",
+    )
+    song_cache_ttl: float = Field(
+        60,
+        ge=0,
+        title="Song List Cache TTL",
+        description="The number of seconds after which cached song list responses "
+        "expire. The cache is cleared immediately when songs are changed through the "
+        "API. Changes made by other processes become visible after this time.",
+    )
+    thumbnail_dir: Path = Field(
+        Path("thumbnails"),
+        title="Thumbnail Cache Directory",
+        description="The directory in which resized song images are stored.",
+    )
+    thumbnail_cache_size: int = Field(
+        512 * 1024 * 1024,
+        ge=0,
+        title="Thumbnail Cache Size",
+        description="The maximum size of the thumbnail cache in bytes. The least "
+        "recently used thumbnails are deleted when the cache grows larger.",
+    )
+    thumbnail_workers: Optional[int] = Field(
+        None,
+        ge=1,
+        title="Thumbnail Worker Processes",
+        description="The number of worker processes used to resize images. By "
+        "default one worker per CPU is used.",
+    )
+    users: Dict[str, SecretStr] = Field(
+        {},
+        title="Users",
+        description="The users that can log in, mapped to the hashes of their "
+        "passwords. Hashes are created with 'python -m karman hash-password'.",
+    )
+    token_keys_file: Optional[FilePath] = Field(
+        None,
+        title="Token Keys File",
+        description="A file containing the secret keys used to sign access and refresh "
+        "tokens, one key per line as '<key id> <secret>'. The first key signs new "
+        "tokens, all keys are accepted. The file is reloaded when it changes so that "
+        "keys can be rotated without a restart. Required unless debug mode is enabled. "
+        "In debug mode a random key is used that is only valid in the current "
+        "process.",
+    )
+    access_token_lifetime: float = Field(
+        3600,
+        gt=0,
+        title="Access Token Lifetime",
+        description="The number of seconds after which access tokens expire.",
+    )
+    refresh_token_lifetime: float = Field(
+        30 * 24 * 3600,
+        gt=0,
+        title="Refresh Token Lifetime",
+        description="The number of seconds after which refresh tokens expire.",
+    )
+    token_cache_size: int = Field(
+        4096,
+        ge=0,
+        title="Token Cache Size",
+        description="The maximum number of verified tokens that are remembered so that "
+        "their signatures do not have to be verified again. A size of 0 disables the "
+        "cache.",
+    )
+    metrics: bool = Field(
+        True,
+        title="Metrics Endpoint Switch",
+        description="Enables or disables the /metrics endpoint that reports request "
+        "and database metrics in the Prometheus text format.",
+    )
+    metrics_dir: Optional[Path] = Field(
+        None,
+        title="Metrics Snapshot Directory",
+        description="A directory in which every worker process stores snapshots of its "
+        "metrics. If set, the /metrics endpoint reports the aggregated metrics of all "
+        "workers. The directory should be emptied before the server is started.",
+    )
+    metrics_interval: float = Field(
+        5,
+        gt=0,
+        title="Metrics Snapshot Interval",
+        description="The number of seconds between two snapshots of the metrics of a "
+        "worker process.",
+    )
 
     class Config:
         allow_population_by_field_name = True
@@ -121,21 +295,38 @@ class Settings(BaseSettings):
                 env_settings,
             )
 
-    def __init__(self) -> None:
-        super().__init__()
-        # Load Default Logging Config
-        with open("logging.yml", "r") as file:
-            dictConfig(yaml.safe_load(file))
-        # Load User Logging Config
-        if isinstance(self.logging_config, dict):
-            logging_config = self.logging_config
-        elif isinstance(self.logging_config, Path):
-            with self.logging_config.open("r") as file:
-                logging_config = yaml.safe_load(file)
-        else:
-            logging_config = None
-        if logging_config:
-            dictConfig(logging_config)
-
 
 settings = Settings()
+
+
+@lru_cache(maxsize=None)
+def configure_logging() -> None:
+    """
+    Configures logging with the default logging config (``logging.yml`` in the working
+    directory) and the ``logging_config`` of the settings. Logging is only configured
+    on the first call so entry points can call this function unconditionally.
+
+    Importing the settings does not configure logging. This keeps the import cheap
+    for tools and tests that only need the settings.
+    """
+    import yaml
+
+    # Load Default Logging Config
+    with open("logging.yml", "r") as file:
+        default_config = yaml.safe_load(file)
+    dictConfig(default_config)
+    # Load User Logging Config
+    if isinstance(settings.logging_config, dict):
+        logging_config = settings.logging_config
+    elif isinstance(settings.logging_config, Path):
+        with settings.logging_config.open("r") as file:
+            logging_config = yaml.safe_load(file)
+    else:
+        logging_config = None
+    if logging_config:
+        dictConfig(logging_config)
+    # The queue key is a Karman extension of the logging config dict schema.
+    if (logging_config or {}).get("queue", default_config.get("queue", False)):
+        from karman.logging import start_queue_listeners
+
+        start_queue_listeners()
@@ -0,0 +1,410 @@
+"""
+Measurements of HTTP requests and database queries.
+
+The ``RequestMiddleware`` measures every HTTP request handled by the app: its duration,
+status code, response size, route template, API version and the time spent in
+database queries. While a request is handled its measurements are available through
+``current_request``. The ``request_started`` and ``request_finished`` signals are sent
+before the request is handled and when the response is complete.
+
+Database time is measured by ``InstrumentedDatabase``, a drop-in replacement for
+``databases.Database`` that adds the duration of each query to the current request.
+With ``settings.db_profiling`` enabled, responses get a ``Server-Timing`` header with
+the database time and slow queries are logged with their query plan.
+"""
+
+__all__ = [
+    "RequestStats",
+    "current_request",
+    "request_started",
+    "request_finished",
+    "RequestMiddleware",
+    "InstrumentedDatabase",
+    "access_logger",
+]
+
+import logging
+import math
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple, Union
+
+import databases
+from databases.core import Connection
+from sqlalchemy.engine import Dialect
+from sqlalchemy.sql import ClauseElement, text
+from starlette.datastructures import MutableHeaders
+from starlette.routing import BaseRoute, Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from karman.signals import Signal
+
+access_logger = logging.getLogger("karman.access")
+db_logger = logging.getLogger("karman.db")
+
+Query = Union[ClauseElement, str]
+
+
+class RequestStats:
+    """
+    The measurements of a single HTTP request. Durations are in seconds.
+    """
+
+    __slots__ = (
+        "method",
+        "path",
+        "client",
+        "start",
+        "duration",
+        "status_code",
+        "response_size",
+        "route",
+        "api_version",
+        "db_queries",
+        "db_time",
+    )
+
+    def __init__(self, method: str, path: str, client: Optional[str]) -> None:
+        self.method = method
+        self.path = path
+        self.client = client
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.status_code = 0
+        self.response_size = 0
+        self.route: Optional[str] = None
+        """The path template of the matched route, e.g. ``/v1/songs/{id}``."""
+        self.api_version: Optional[str] = None
+        self.db_queries = 0
+        self.db_time = 0.0
+
+    def add_query(self, duration: float, queries: int = 1) -> None:
+        """
+        Records the execution of database queries taking ``duration`` seconds.
+        """
+        self.db_queries += queries
+        self.db_time += duration
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request", default=None
+)
+
+request_started = Signal()
+"""
+Sent before an HTTP request is handled. Receivers get the ``RequestStats`` of the
+request as single argument. The route of the request is not yet known.
+"""
+
+request_finished = Signal()
+"""
+Sent after the response to an HTTP request has been sent completely. Receivers get the
+``RequestStats`` of the request as single argument.
+"""
+
+
+_RouteInfo = Tuple[str, Optional[str]]
+
+
+def _routes(
+    routes: List[BaseRoute], prefix: str = "", api_version: Optional[str] = None
+) -> Dict[Tuple[str, Callable[..., Any]], _RouteInfo]:
+    # Maps the mount prefix and the endpoint of every route to its path template and
+    # API version. Mounted apps are API versions.
+    result: Dict[Tuple[str, Callable[..., Any]], _RouteInfo] = {}
+    for route in routes:
+        if isinstance(route, Mount):
+            path = prefix + route.path
+            version = getattr(route.app, "version", None)
+            result.update(_routes(route.routes or [], path, version))
+        elif hasattr(route, "endpoint"):
+            template = prefix + getattr(route, "path_format", route.path)
+            result.setdefault((prefix, route.endpoint), (template, api_version))
+    return result
+
+
+class RequestMiddleware:
+    """
+    An ASGI middleware that measures HTTP requests. See the module documentation.
+
+    :param app: The ASGI app.
+    :param server_timing: Whether to add a ``Server-Timing`` header with the time
+                          spent handling the request and the number and duration of
+                          database queries until the response started.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False) -> None:
+        self.app = app
+        self.server_timing = server_timing
+        self._routes: Optional[Dict[Tuple[str, Callable[..., Any]], _RouteInfo]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        client = scope.get("client")
+        stats = RequestStats(
+            scope["method"],
+            scope["path"],
+            f"{client[0]}:{client[1]}" if client else None,
+        )
+        root_path = scope.get("root_path", "")
+        app = scope.get("app")
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                stats.status_code = message["status"]
+                if self.server_timing:
+                    _add_server_timing(message, stats)
+            elif message["type"] == "http.response.body":
+                stats.response_size += len(message.get("body", b""))
+            elif message["type"] == "http.response.zerocopysend":
+                stats.response_size += message.get("count", 0)
+            await send(message)
+
+        token = current_request.set(stats)
+        await request_started.send(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not stats.status_code:
+                stats.status_code = 500
+            raise
+        finally:
+            current_request.reset(token)
+            stats.duration = time.perf_counter() - stats.start
+            if self._routes is None:
+                self._routes = _routes(getattr(app, "routes", []))
+            # Routing sets the endpoint and the root path of mounted apps in the scope.
+            prefix = scope.get("root_path", "")[len(root_path) :]
+            route = self._routes.get((prefix, scope.get("endpoint")))  # type: ignore
+            if route is not None:
+                stats.route, stats.api_version = route
+            await request_finished.send(stats)
+
+
+def _add_server_timing(message: Message, stats: RequestStats) -> None:
+    total = (time.perf_counter() - stats.start) * 1000
+    MutableHeaders(scope=message).append(
+        "Server-Timing",
+        f"app;dur={total:.3f}, db;dur={stats.db_time * 1000:.3f};"
+        f'desc="{stats.db_queries} queries"',
+    )
+
+
+@request_finished.connect
+def log_access(stats: RequestStats) -> None:
+    if not access_logger.isEnabledFor(logging.INFO):
+        return
+    access_logger.info(
+        "%s %s -> %d",
+        stats.method,
+        stats.path,
+        stats.status_code,
+        extra={
+            "client": stats.client,
+            "method": stats.method,
+            "path": stats.path,
+            "route": stats.route,
+            "api_version": stats.api_version,
+            "status_code": stats.status_code,
+            "response_size": stats.response_size,
+            "duration_ms": round(stats.duration * 1000, 3),
+            "db_queries": stats.db_queries,
+            "db_time_ms": round(stats.db_time * 1000, 3),
+        },
+    )
+
+
+class InstrumentedDatabase(databases.Database):
+    """
+    A ``databases.Database`` that adds the time spent executing queries to the
+    ``RequestStats`` of the current request.
+
+    Queries that take at least ``slow_query_threshold`` seconds are logged to the
+    ``karman.db`` logger together with their parameters and query plan. Getting the
+    plan executes an additional ``EXPLAIN`` statement after the slow query.
+
+    :param url: The database URL.
+    :param slow_query_threshold: The minimum duration of queries that are logged. If
+                                 ``None``, no queries are logged.
+    :param options: Additional options for the database backend.
+    """
+
+    def __init__(
+        self,
+        url: Union[str, databases.DatabaseURL],
+        *,
+        slow_query_threshold: Optional[float] = None,
+        **options: Any,
+    ) -> None:
+        super().__init__(url, **options)
+        self.slow_query_threshold = slow_query_threshold
+        self._threshold = (
+            math.inf if slow_query_threshold is None else slow_query_threshold
+        )
+        self._named_dialect: Optional[Dialect] = None
+
+    async def fetch_all(
+        self, query: Query, values: Optional[Dict[str, Any]] = None
+    ) -> List[Any]:
+        start = time.perf_counter()
+        try:
+            result = await super().fetch_all(query, values)
+        finally:
+            duration = _add_query(start)
+        if duration >= self._threshold:
+            await self._log_slow_query(duration, query, values)
+        return result
+
+    async def fetch_one(
+        self, query: Query, values: Optional[Dict[str, Any]] = None
+    ) -> Optional[Any]:
+        start = time.perf_counter()
+        try:
+            result = await super().fetch_one(query, values)
+        finally:
+            duration = _add_query(start)
+        if duration >= self._threshold:
+            await self._log_slow_query(duration, query, values)
+        return result
+
+    async def fetch_val(
+        self,
+        query: Query,
+        values: Optional[Dict[str, Any]] = None,
+        column: Any = 0,
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await super().fetch_val(query, values, column)
+        finally:
+            duration = _add_query(start)
+        if duration >= self._threshold:
+            await self._log_slow_query(duration, query, values)
+        return result
+
+    async def execute(
+        self, query: Query, values: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await super().execute(query, values)
+        finally:
+            duration = _add_query(start)
+        if duration >= self._threshold:
+            await self._log_slow_query(duration, query, values)
+        return result
+
+    async def execute_many(self, query: Query, values: List[Dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        try:
+            await super().execute_many(query, values)
+        finally:
+            duration = _add_query(start, len(values))
+        if duration >= self._threshold and values:
+            await self._log_slow_query(duration, query, values[0])
+
+    async def iterate(
+        self, query: Query, values: Optional[Dict[str, Any]] = None
+    ) -> AsyncGenerator[Any, None]:
+        # Only the time spent waiting for rows counts, not the time the caller spends
+        # processing them.
+        rows = super().iterate(query, values).__aiter__()
+        queries, duration = 1, 0.0
+        while True:
+            start = time.perf_counter()
+            try:
+                row = await rows.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                duration += _add_query(start, queries)
+                queries = 0
+            yield row
+        if duration >= self._threshold:
+            await self._log_slow_query(duration, query, values)
+
+    def _compile(
+        self, query: Query, values: Optional[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        # Compiles the query for the dialect of the backend but with named parameters
+        # so that it can be embedded in a text query.
+        if isinstance(query, str):
+            return query, values or {}
+        if self._named_dialect is None:
+            dialect = self._backend._dialect  # type: ignore
+            self._named_dialect = type(dialect)(paramstyle="named")
+        if values:
+            query = query.values(**values)  # type: ignore
+        compiled = query.compile(
+            dialect=self._named_dialect, compile_kwargs={"render_postcompile": True}
+        )
+        return str(compiled), compiled.params
+
+    async def _explain(self, sql: str, params: Dict[str, Any]) -> str:
+        if self.url.dialect == "sqlite":
+            statement = text(f"EXPLAIN QUERY PLAN {sql}").bindparams(**params)
+        else:
+            statement = text(f"EXPLAIN {sql}").bindparams(**params)
+        # The EXPLAIN statement itself is not measured. It runs on its own connection
+        # from the pool because the connection of the current task may be in a
+        # transaction that a failing statement would abort.
+        async with Connection(self._backend) as connection:
+            rows = await connection.fetch_all(statement)
+        return "\n".join(" | ".join(str(value) for value in row) for row in rows)
+
+    async def _log_slow_query(
+        self, duration: float, query: Query, values: Optional[Dict[str, Any]]
+    ) -> None:
+        try:
+            sql, params = self._compile(query, values)
+        except Exception as e:
+            db_logger.warning(
+                "Slow query (%.1fms) could not be compiled: %s", duration * 1000, e
+            )
+            return
+        try:
+            plan = await self._explain(sql, params)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {e}"
+        logged_params = _truncate_params(params)
+        db_logger.warning(
+            "Slow query (%.1fms): %s\nParameters: %r\nPlan:\n%s",
+            duration * 1000,
+            sql,
+            logged_params,
+            plan,
+            extra={
+                "duration_ms": round(duration * 1000, 3),
+                "sql": sql,
+                "params": logged_params,
+                "plan": plan,
+            },
+        )
+
+
+def _truncate_params(params: Dict[str, Any], limit: int = 100) -> Dict[str, Any]:
+    # Large values such as lyrics or binary data would flood the log and may contain
+    # user data, so they are shortened.
+    truncated = {}
+    for name, value in params.items():
+        if isinstance(value, (bytes, bytearray)):
+            value = f"<{len(value)} bytes>"
+        elif isinstance(value, str):
+            if len(value) > limit:
+                value = f"{value[:limit]}... ({len(value)} characters)"
+        elif value is not None and not isinstance(value, (int, float)):
+            rendered = repr(value)
+            if len(rendered) > limit:
+                value = f"{rendered[:limit]}... ({len(rendered)} characters)"
+        truncated[name] = value
+    return truncated
+
+
+def _add_query(start: float, queries: int = 1) -> float:
+    duration = time.perf_counter() - start
+    stats = current_request.get()
+    if stats is not None:
+        stats.add_query(duration, queries)
+    return duration
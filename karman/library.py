@@ -0,0 +1,436 @@
+__all__ = [
+    "ImportResult",
+    "delete_songs",
+    "find_song_files",
+    "import_songs",
+    "song_media_path",
+    "song_values",
+    "update_songs",
+]
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import sqlalchemy
+from databases import Database
+
+from karman import models, ultrastar
+from karman.models.song import song_revision
+from karman.schemas import SongKind
+from karman.signals import songs_changed
+
+logger = logging.getLogger("karman.library")
+songs = models.Song.Meta.table
+song_files = models.SongFile.Meta.table
+ratings = models.Rating.Meta.table
+
+# The lowest limit for bound parameters in a single statement among the supported
+# databases (SQLite before 3.32). Multi-row statements are sized to stay below it.
+MAX_PARAMETERS = 999
+INSERT_BATCH_SIZE = MAX_PARAMETERS // len(songs.columns)
+
+T = TypeVar("T")
+
+
+class ImportResult(NamedTuple):
+    """Statistics about a library import."""
+
+    added: int
+    """The number of songs that were added to the library."""
+    updated: int
+    """The number of songs that were parsed again because their file changed."""
+    removed: int
+    """The number of songs that were removed because their file was deleted."""
+    unchanged: int
+    """The number of files that were skipped because their fingerprint matched."""
+    failed: int
+    """The number of files that could not be parsed."""
+    elapsed: float
+    """The duration of the import in seconds."""
+
+    @property
+    def throughput(self) -> float:
+        """The number of parsed files per second."""
+        parsed = self.added + self.updated + self.failed
+        return parsed / self.elapsed if self.elapsed else 0
+
+
+class _ParsedFile(NamedTuple):
+    path: str
+    hash: str
+    """The content hash or an empty string if the file could not be read."""
+    song: Optional[ultrastar.UltraStarSong]
+    """The parsed song or ``None`` if the content hash did not change."""
+    error: Optional[str] = None
+
+
+def find_song_files(root: Union[str, "os.PathLike[str]"]) -> Iterator[str]:
+    """
+    Recursively finds all UltraStar files (``*.txt``) in ``root``.
+    """
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.lower().endswith(".txt"):
+                yield os.path.join(directory, name)
+
+
+def song_values(song: ultrastar.UltraStarSong, path: str) -> Dict[str, Any]:
+    """
+    Returns the column values of the ``songs`` table for a ``song`` parsed from the
+    file at ``path``.
+    """
+    return {
+        "title": song.title,
+        "artist": song.artist,
+        "featured_artists": song.featured_artists,
+        "year": song.year,
+        "genre": song.genre,
+        "kind": SongKind.ultrastar.value,
+        "players": song.players,
+        "duration": song.duration,
+        "golden_notes": song.golden_notes,
+        "path": path,
+        "audio_file": song.audio,
+        "video_file": song.video,
+        "cover_file": song.cover,
+        "background_file": song.background,
+    }
+
+
+def song_media_path(path: Optional[str], name: Optional[str]) -> Optional[str]:
+    """
+    Resolves the media file ``name`` referenced by the song file at ``path``. Media
+    files must be located in the directory of the song file or one of its
+    subdirectories.
+
+    :return: The absolute path of the media file or ``None`` if the song does not
+             reference a file or the reference points outside of the song directory.
+    """
+    if not path or not name:
+        return None
+    directory = os.path.dirname(os.path.abspath(path))
+    media = os.path.normpath(os.path.join(directory, name))
+    if os.path.commonpath([directory, media]) != directory:
+        return None
+    return media
+
+
+def _chunks(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _stat_song_files(root: str) -> Dict[str, Tuple[int, int]]:
+    # Returns the size and modification time of all song files in root.
+    stats = {}
+    for path in find_song_files(root):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stats[path] = (stat.st_size, stat.st_mtime_ns)
+    return stats
+
+
+def _parse_files(files: Sequence[Tuple[str, Optional[str]]]) -> List[_ParsedFile]:
+    # Runs in a worker process. Files are only parsed if their content hash differs
+    # from the known hash. Errors are returned so that a single broken file does not
+    # fail the whole batch.
+    results = []
+    for path, known_hash in files:
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError as e:
+            results.append(_ParsedFile(path, "", None, str(e)))
+            continue
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        try:
+            song = None if digest == known_hash else ultrastar.parse(data.splitlines())
+        except ultrastar.UltraStarError as e:
+            results.append(_ParsedFile(path, digest, None, str(e)))
+        else:
+            results.append(_ParsedFile(path, digest, song))
+    return results
+
+
+async def _remove_songs(
+    database: Database, paths: Sequence[str], song_ids: Sequence[int]
+) -> None:
+    for chunk in _chunks(paths, MAX_PARAMETERS):
+        await database.execute(song_files.delete().where(song_files.c.path.in_(chunk)))
+    for ids in _chunks(song_ids, MAX_PARAMETERS):
+        await database.execute(ratings.delete().where(ratings.c.song_id.in_(ids)))
+        await database.execute(songs.delete().where(songs.c.id.in_(ids)))
+
+
+async def _store_files(
+    database: Database,
+    parsed: Sequence[_ParsedFile],
+    stats: Mapping[str, Tuple[int, int]],
+    index: Mapping[str, Mapping[str, Any]],
+    changed: Set[int],
+) -> Tuple[int, int, int]:
+    """
+    Writes a batch of parsed files into the database and returns the number of added,
+    updated and failed songs. The IDs of added and updated songs are added to
+    ``changed``.
+
+    Files that could be read but not parsed keep their song, if any, and get a new
+    fingerprint so that they are skipped until they change again.
+    """
+    new_songs = []
+    song_ids: Dict[str, Optional[int]] = {}
+    updated = failed = 0
+    for file in parsed:
+        if file.error is not None:
+            logger.warning("Could not import %s: %s", file.path, file.error)
+            failed += 1
+            if file.path in index:
+                song_ids[file.path] = index[file.path]["song_id"]
+        elif file.path in index and index[file.path]["song_id"] is not None:
+            song_id = song_ids[file.path] = index[file.path]["song_id"]
+            if file.song is not None:
+                await database.execute(
+                    songs.update()
+                    .where(songs.c.id == song_id)
+                    .values(song_values(file.song, file.path))
+                    .values(song_revision())
+                )
+                changed.add(song_id)
+                updated += 1
+        elif file.song is not None:
+            new_songs.append(
+                {**song_values(file.song, file.path), "updated_at": datetime.utcnow()}
+            )
+
+    if new_songs:
+        paths = [values["path"] for values in new_songs]
+        await database.execute(songs.insert().values(new_songs))
+        query = sqlalchemy.select([songs.c.id, songs.c.path]).where(
+            songs.c.path.in_(paths)
+        )
+        for row in await database.fetch_all(query.order_by(songs.c.id)):
+            song_ids[row["path"]] = row["id"]
+            changed.add(row["id"])
+
+    # Fingerprints are replaced instead of updated to keep the number of statements
+    # independent of the batch size.
+    fingerprints = [
+        {
+            "path": file.path,
+            "size": stats[file.path][0],
+            "mtime": stats[file.path][1],
+            "hash": file.hash,
+            "song_id": song_ids.get(file.path),
+        }
+        for file in parsed
+        if file.hash
+    ]
+    if fingerprints:
+        paths = [fingerprint["path"] for fingerprint in fingerprints]
+        await database.execute(song_files.delete().where(song_files.c.path.in_(paths)))
+        await database.execute(song_files.insert().values(fingerprints))
+    return len(new_songs), updated, failed
+
+
+async def import_songs(
+    root: Union[str, "os.PathLike[str]"],
+    database: Database = models.database,
+    workers: Optional[int] = None,
+) -> ImportResult:
+    """
+    Imports all UltraStar songs found in ``root`` into the library.
+
+    The import is incremental. The size, modification time and content hash of each
+    imported file are stored in the ``song_files`` table. Files whose size and
+    modification time did not change are not read again. Files that changed are only
+    parsed again if their content hash differs. Songs whose files were deleted are
+    removed from the library.
+
+    Files are parsed in batches on a pool of ``workers`` processes. Each parsed batch
+    is inserted using a single multi-row ``INSERT``. All changes happen in a single
+    transaction so a failed import does not leave a partial library behind. After the
+    transaction is committed ``karman.signals.songs_changed`` is sent with the IDs of
+    all added, updated and removed songs.
+
+    :param root: The directory containing the songs.
+    :param database: The database into which the songs are imported.
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+    """
+    start = time.perf_counter()
+    root = os.path.abspath(root)
+    loop = asyncio.get_running_loop()
+    stats = await loop.run_in_executor(None, _stat_song_files, root)
+    query = song_files.select().where(
+        song_files.c.path.startswith(os.path.join(root, ""), autoescape=True)
+    )
+    index = {row["path"]: row for row in await database.fetch_all(query)}
+
+    removed = [path for path in index if path not in stats]
+    pending = [
+        (path, index[path]["hash"] if path in index else None)
+        for path, stat in stats.items()
+        if path not in index or (index[path]["size"], index[path]["mtime"]) != stat
+    ]
+    logger.info(
+        "Found %d song files in %s, %d changed and %d removed",
+        len(stats),
+        root,
+        len(pending),
+        len(removed),
+    )
+
+    added = updated = failed = 0
+    song_ids = [
+        index[path]["song_id"] for path in removed if index[path]["song_id"] is not None
+    ]
+    changed = set(song_ids)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        batches = [
+            loop.run_in_executor(executor, _parse_files, batch)
+            for batch in _chunks(pending, INSERT_BATCH_SIZE)
+        ]
+        async with database.transaction():
+            await _remove_songs(database, removed, song_ids)
+            for batch in asyncio.as_completed(batches):
+                counts = await _store_files(
+                    database, await batch, stats, index, changed
+                )
+                added += counts[0]
+                updated += counts[1]
+                failed += counts[2]
+    if changed:
+        await songs_changed.send(changed)
+
+    result = ImportResult(
+        added=added,
+        updated=updated,
+        removed=len(song_ids),
+        unchanged=len(stats) - len(pending),
+        failed=failed,
+        elapsed=time.perf_counter() - start,
+    )
+    logger.info(
+        "Added %d, updated %d and removed %d songs (%d failed) in %.2fs, "
+        "%.0f songs/s",
+        result.added,
+        result.updated,
+        result.removed,
+        result.failed,
+        result.elapsed,
+        result.throughput,
+    )
+    return result
+
+
+async def delete_songs(
+    song_ids: Sequence[int], database: Database = models.database
+) -> List[Any]:
+    """
+    Deletes the songs with the specified IDs together with their ratings. The file
+    fingerprints of the songs are kept without a song so that the next import does
+    not add the songs again until their files change.
+    All rows are deleted in a single transaction using one statement per chunk of
+    IDs. After the transaction is committed ``karman.signals.songs_changed`` is sent
+    with the IDs of the deleted songs.
+
+    :return: The rows of the deleted songs. They contain the columns ``id``, ``path``,
+             ``cover_file`` and ``background_file``.
+    """
+    song_ids = list(dict.fromkeys(song_ids))
+    query = sqlalchemy.select(
+        [songs.c.id, songs.c.path, songs.c.cover_file, songs.c.background_file]
+    )
+    deleted: List[Any] = []
+    async with database.transaction():
+        for ids in _chunks(song_ids, MAX_PARAMETERS):
+            rows = await database.fetch_all(query.where(songs.c.id.in_(ids)))
+            if not rows:
+                continue
+            existing = [row["id"] for row in rows]
+            await database.execute(
+                song_files.update()
+                .where(song_files.c.song_id.in_(existing))
+                .values(song_id=None)
+            )
+            await database.execute(
+                ratings.delete().where(ratings.c.song_id.in_(existing))
+            )
+            await database.execute(songs.delete().where(songs.c.id.in_(existing)))
+            deleted.extend(rows)
+    if deleted:
+        await songs_changed.send([row["id"] for row in deleted])
+    return deleted
+
+
+def _hashable(value: Any) -> Hashable:
+    return tuple(value) if isinstance(value, list) else value
+
+
+async def update_songs(
+    updates: Sequence[Mapping[str, Any]], database: Database = models.database
+) -> List[int]:
+    """
+    Changes the column values of multiple songs. Every mapping in ``updates`` contains
+    the ``id`` of a song and the new values of the columns that should change. IDs
+    must be unique.
+
+    Songs that receive identical values are updated together using one statement per
+    chunk of IDs. All changes happen in a single transaction. After the transaction is
+    committed ``karman.signals.songs_changed`` is sent with the IDs of the updated
+    songs.
+
+    :return: The IDs of the songs that exist and were updated.
+    """
+    groups: Dict[Hashable, List[int]] = {}
+    values: Dict[Hashable, Mapping[str, Any]] = {}
+    for update in updates:
+        changes = {name: value for name, value in update.items() if name != "id"}
+        key: Hashable = tuple(
+            sorted((name, _hashable(value)) for name, value in changes.items())
+        )
+        groups.setdefault(key, []).append(update["id"])
+        values[key] = changes
+    updated: List[int] = []
+    async with database.transaction():
+        for key, song_ids in groups.items():
+            # Every value and the revision are bound parameters as well.
+            size = MAX_PARAMETERS - len(values[key]) - 2
+            for ids in _chunks(song_ids, size):
+                rows = await database.fetch_all(
+                    sqlalchemy.select([songs.c.id]).where(songs.c.id.in_(ids))
+                )
+                if not rows:
+                    continue
+                existing = [row["id"] for row in rows]
+                await database.execute(
+                    songs.update()
+                    .where(songs.c.id.in_(existing))
+                    .values(values[key])
+                    .values(song_revision())
+                )
+                updated.extend(existing)
+    if updated:
+        await songs_changed.send(updated)
+    return updated
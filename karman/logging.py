@@ -1,12 +1,24 @@
+import atexit
 import http
 import logging
+import logging.handlers
+import queue
 import sys
 from copy import copy
-from typing import Any, Dict, Literal, Optional, Union
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Literal, Optional, Union
 
 import click
+import orjson
 from uvicorn.logging import TRACE_LOG_LEVEL  # type: ignore
 
+_status_phrases = {status.value: status.phrase for status in http.HTTPStatus}
+
+# The attributes of every log record. Other attributes were passed as extra.
+_record_attributes = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "color_message", "taskName"}
+
 
 class ColorFormatter(logging.Formatter):
     """
@@ -98,14 +110,16 @@ class ColorFormatter(logging.Formatter):
         return color
 
     def formatMessage(self, record: logging.LogRecord) -> str:
+        if not self.use_colors:
+            # Without colors the record is not modified so it does not need a copy.
+            return super().formatMessage(record)
         record_copy = copy(record)
-        if self.use_colors:
-            setattr(record_copy, "reset", click.style("", reset=True))
-            for key in ["name", "levelname", "asctime", "module", "funcName", "lineno"]:
-                self.colorize(record_copy, key)
-            if "color_message" in record_copy.__dict__:
-                record_copy.msg = record_copy.__dict__["color_message"]
-                record_copy.__dict__["message"] = record_copy.getMessage()
+        setattr(record_copy, "reset", click.style("", reset=True))
+        for key in ["name", "levelname", "asctime", "module", "funcName", "lineno"]:
+            self.colorize(record_copy, key)
+        if "color_message" in record_copy.__dict__:
+            record_copy.msg = record_copy.__dict__["color_message"]
+            record_copy.__dict__["message"] = record_copy.getMessage()
         return super().formatMessage(record_copy)
 
 
@@ -161,6 +175,22 @@ class AccessFormatter(ColorFormatter):
 
     def formatMessage(self, record: logging.LogRecord) -> str:
         record_copy = copy(record)
+        self._set_fields(record_copy)
+        if not self.use_colors:
+            return logging.Formatter.formatMessage(self, record_copy)
+        for key in [
+            "client_addr",
+            "method",
+            "full_path",
+            "http_version",
+            "status_code",
+            "status_phrase",
+        ]:
+            self.colorize(record_copy, key)
+        return super().formatMessage(record_copy)
+
+    @staticmethod
+    def _set_fields(record: logging.LogRecord) -> None:
         status_code: int
         (
             client_addr,
@@ -168,26 +198,105 @@ class AccessFormatter(ColorFormatter):
             full_path,
             http_version,
             status_code,
-        ) = record_copy.args  # type: ignore
-        try:
-            status_phrase = http.HTTPStatus(status_code).phrase
-        except ValueError:
-            status_phrase = ""
-        setattr(record_copy, "client_addr", client_addr)
-        setattr(record_copy, "method", method)
-        setattr(record_copy, "full_path", full_path)
-        setattr(record_copy, "http_version", http_version)
-        setattr(record_copy, "status_code", status_code)
-        setattr(record_copy, "status_phrase", status_phrase)
-
-        if self.use_colors:
-            for key in [
-                "client_addr",
-                "method",
-                "full_path",
-                "http_version",
-                "status_code",
-                "status_phrase",
-            ]:
-                self.colorize(record_copy, key)
-        return super().formatMessage(record_copy)
+        ) = record.args  # type: ignore
+        status_phrase = _status_phrases.get(status_code, "")
+        setattr(record, "client_addr", client_addr)
+        setattr(record, "method", method)
+        setattr(record, "full_path", full_path)
+        setattr(record, "http_version", http_version)
+        setattr(record, "status_code", status_code)
+        setattr(record, "status_phrase", status_phrase)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects for log processing pipelines.
+
+    Every object contains the time, level, logger name and message of the record as
+    well as all values passed via ``extra``. Exceptions and stack traces are included
+    as formatted text. Values that cannot be encoded as JSON are converted to strings.
+    The record is not modified.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _record_attributes:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(data, default=str).decode()
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    A ``QueueHandler`` for queues that are consumed by a thread of the same process.
+
+    The standard ``QueueHandler`` formats records before enqueuing them so that they
+    can be pickled. This is not necessary for a thread, so all formatting happens in
+    the thread of the ``QueueListener``. A record that propagates to several loggers
+    is handled by several listener threads, so every queue gets its own copy. The
+    arguments are kept because formatters like ``AccessFormatter`` read them.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy(record)
+        if isinstance(record.args, dict):
+            # Arguments that change after the call must not change the message.
+            record.args = dict(record.args)
+        return record
+
+
+def _stop_listener(listener: logging.handlers.QueueListener) -> None:
+    # QueueListener.stop() fails if the listener has already been stopped.
+    if listener._thread is not None:
+        listener.stop()
+
+
+def start_queue_listeners(
+    loggers: Optional[Iterable[logging.Logger]] = None,
+) -> List[logging.handlers.QueueListener]:
+    """
+    Moves the handlers of all configured loggers to background threads. Each logger
+    with handlers gets a ``QueueHandler`` instead and a ``QueueListener`` passes the
+    records to the original handlers. Records are therefore formatted and written
+    without blocking the event loop. The listeners are stopped when the interpreter
+    exits, so that all queued records are written.
+
+    Loggers that already log to a queue are not changed.
+
+    :param loggers: The loggers to change. Defaults to the root logger and all
+                    loggers that have been created.
+    :return: The started listeners.
+    """
+    if loggers is None:
+        loggers = [logging.getLogger()] + [
+            logger
+            for logger in logging.Logger.manager.loggerDict.values()
+            if isinstance(logger, logging.Logger)
+        ]
+    listeners = []
+    for logger in loggers:
+        handlers = list(logger.handlers)
+        if not handlers or any(
+            isinstance(handler, logging.handlers.QueueHandler) for handler in handlers
+        ):
+            continue
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            records, *handlers, respect_handler_level=True
+        )
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(QueueHandler(records))
+        listener.start()
+        atexit.register(_stop_listener, listener)
+        listeners.append(listener)
+    return listeners
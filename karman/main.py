@@ -1,15 +1,21 @@
 __all__ = ["app", "v1"]
 
 from fastapi import APIRouter, FastAPI
-from starlette.responses import RedirectResponse
+from starlette.responses import RedirectResponse, Response
 
-from karman.config import settings
-from karman.routes import auth, songs
-from karman.util.openapi import remove_body_schemas
+from karman import metrics, models, oauth
+from karman.config import configure_logging, settings
+from karman.instrumentation import RequestMiddleware
+from karman.replicas import ReadYourWritesMiddleware, replicas
+from karman.routes import auth, ratings, songs
+from karman.suggest import build_song_index
+from karman.thumbnails import thumbnails
+from karman.util.openapi import remove_body_schemas, serve_openapi
 from karman.versioning import select_routes, strict_version_selector
 
 api = APIRouter()
 api.include_router(songs.router, prefix="/songs")
+api.include_router(ratings.router, prefix="/songs")
 api.include_router(auth.router)
 
 v1 = FastAPI(
@@ -21,6 +27,7 @@ v1 = FastAPI(
 )
 select_routes(api, v1, strict_version_selector(1))
 remove_body_schemas(v1)
+v1_openapi = serve_openapi(v1)
 
 app = FastAPI(
     title=settings.app_name,
@@ -30,9 +37,70 @@ app = FastAPI(
     debug=settings.debug,
 )
 app.mount("/v1", v1)
+app.add_middleware(RequestMiddleware, server_timing=settings.db_profiling)
+if settings.db_replica_urls and settings.db_read_your_writes > 0:
+    app.add_middleware(ReadYourWritesMiddleware, max_age=settings.db_read_your_writes)
+
+# Startup hooks run in order before the server accepts connections. Shutdown hooks
+# run in order after the last request.
+app.add_event_handler("startup", configure_logging)
+app.add_event_handler("startup", oauth.check_token_keys)
+
+
+@app.on_event("startup")
+async def connect_database() -> None:
+    # The connection pool is filled before the first request.
+    await models.warm_up(models.database)
+
+
+@app.on_event("startup")
+async def connect_replicas() -> None:
+    # Unavailable replicas do not prevent the startup, reads use the primary until
+    # a health check succeeds.
+    await replicas.start(
+        settings.db_replica_check_interval, settings.db_connect_timeout or 5
+    )
+
+
+@app.on_event("startup")
+async def build_indexes() -> None:
+    # In-memory indexes are built once, later changes are applied incrementally.
+    await build_song_index(models.database)
+
+
+@app.on_event("startup")
+def prepare_openapi() -> None:
+    # Mounted apps do not receive lifespan events so the documents of all API
+    # versions are prepared here.
+    v1_openapi.prepare()
+
+
+app.add_event_handler("startup", metrics.start_snapshots)
+app.add_event_handler("shutdown", metrics.stop_snapshots)
+
+
+@app.on_event("shutdown")
+def stop_thumbnail_workers() -> None:
+    thumbnails.close()
+
+
+app.add_event_handler("shutdown", replicas.stop)
+
+
+@app.on_event("shutdown")
+async def disconnect_database() -> None:
+    if models.database.is_connected:
+        await models.database.disconnect()
 
 
 # The API root is not currently in use so we redirect to the documentation.
 @app.get("/", include_in_schema=False)
 def redirect_to_docs() -> RedirectResponse:
     return RedirectResponse("/v1/docs")
+
+
+if settings.metrics:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics() -> Response:
+        return Response(await metrics.export(), media_type=metrics.CONTENT_TYPE)
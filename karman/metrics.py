@@ -0,0 +1,476 @@
+"""
+Prometheus metrics.
+
+Every process collects its metrics in memory. Metrics are only updated on the thread of
+the event loop, so no locks are needed. Collectors compute derived values (like the
+utilization of the database pool) right before the metrics are exported.
+
+If ``settings.metrics_dir`` is set, every process periodically writes a snapshot of
+its metrics to this directory and the ``/metrics`` endpoint aggregates the snapshots
+of all processes. This way the metrics of all uvicorn workers are reported no matter
+which worker answers the request. Counters and histograms of processes that have
+exited are kept, gauges are only reported for running processes. The directory should
+be emptied before the server is started.
+"""
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "registry",
+    "register_cache",
+    "export",
+    "write_snapshot",
+    "start_snapshots",
+    "stop_snapshots",
+    "CONTENT_TYPE",
+]
+
+import asyncio
+import logging
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import anyio
+import orjson
+from databases import Database
+
+from karman.cache import ResponseCache
+from karman.config import settings
+from karman.instrumentation import RequestStats, request_finished, request_started
+from karman.replicas import replicas
+
+logger = logging.getLogger("karman.metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+Values = Dict[Labels, Any]
+M = TypeVar("M", bound="Metric")
+
+
+class Metric:
+    """
+    A metric with a value for every combination of label values.
+
+    :param name: The name of the metric.
+    :param documentation: A description of the metric.
+    :param labels: The names of the labels.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values: Values = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        """Sets the value for the given label values."""
+        self.values[labels] = value
+
+    def merge(self, values: Values, other: Values) -> None:
+        """Adds the ``other`` values of another process to ``values``."""
+        for labels, value in other.items():
+            values[labels] = values.get(labels, 0) + value
+
+    def render(self, values: Values) -> List[str]:
+        """Returns the lines of the Prometheus text format for ``values``."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{self._labels(labels)} {value}")
+        return lines
+
+    def _labels(self, values: Labels, **extra: str) -> str:
+        pairs = list(zip(self.labels, values)) + list(extra.items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(v)}"' for name, v in pairs) + "}"
+
+
+class Counter(Metric):
+    """A value that only increases."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        """Increases the value for the given label values by ``amount``."""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Counter):
+    """A value that can increase and decrease."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1, *labels: str) -> None:
+        """Decreases the value for the given label values by ``amount``."""
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram(Metric):
+    """
+    Counts observations in buckets. For every combination of labels the value is a
+    list with the number of observations in each bucket (not cumulative), followed by
+    the number of observations larger than the largest bucket and the sum of all
+    observations.
+
+    :param buckets: The upper bounds of the buckets in ascending order.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = (
+            0.005,
+            0.01,
+            0.025,
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1,
+            2.5,
+            5,
+            10,
+        ),
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(float(bucket) for bucket in buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Records an observation for the given label values."""
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def merge(self, values: Values, other: Values) -> None:
+        for labels, counts in other.items():
+            current = values.get(labels)
+            values[labels] = (
+                [a + b for a, b in zip(current, counts)] if current else list(counts)
+            )
+
+    def render(self, values: Values) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for labels, counts in sorted(values.items()):
+            total = 0
+            for bucket, count in zip(self.buckets + (float("inf"),), counts):
+                total += count
+                le = "+Inf" if bucket == float("inf") else repr(bucket)
+                lines.append(f"{self.name}_bucket{self._labels(labels, le=le)} {total}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {counts[-1]}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {total}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    A collection of metrics that are exported together.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: M) -> M:
+        """Adds ``metric`` to the registry and returns it."""
+        assert metric.name not in self.metrics, f"Duplicate metric {metric.name}."
+        self.metrics[metric.name] = metric
+        return metric
+
+    def collector(self, function: Callable[[], None]) -> Callable[[], None]:
+        """
+        Registers a function that updates metrics before they are exported. This
+        method can be used as a decorator.
+        """
+        self.collectors.append(function)
+        return function
+
+    def collect(self) -> Dict[str, Values]:
+        """Runs the collectors and returns a copy of the current values."""
+        for collector in self.collectors:
+            collector()
+        return {name: dict(metric.values) for name, metric in self.metrics.items()}
+
+    def render(self, snapshots: Iterable[Tuple[Dict[str, Values], bool]]) -> str:
+        """
+        Aggregates the values of multiple processes in the Prometheus text format.
+
+        :param snapshots: The values of each process and whether the process is still
+                          running. Gauges are only aggregated for running processes.
+        """
+        aggregated: Dict[str, Values] = {name: {} for name in self.metrics}
+        for values, alive in snapshots:
+            for name, metric in self.metrics.items():
+                if name in values and (alive or not isinstance(metric, Gauge)):
+                    metric.merge(aggregated[name], values[name])
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.extend(metric.render(aggregated[name]))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(
+    Counter(
+        "karman_http_requests_total",
+        "The number of handled HTTP requests.",
+        ["method", "route", "version", "status"],
+    )
+)
+http_request_duration = registry.register(
+    Histogram(
+        "karman_http_request_duration_seconds",
+        "The time it took to handle HTTP requests.",
+        ["method", "route", "version"],
+    )
+)
+http_requests_in_progress = registry.register(
+    Gauge(
+        "karman_http_requests_in_progress",
+        "The number of HTTP requests that are currently handled.",
+        ["method"],
+    )
+)
+http_request_db_queries = registry.register(
+    Counter(
+        "karman_http_request_db_queries_total",
+        "The number of database queries executed while handling HTTP requests.",
+        ["method", "route", "version"],
+    )
+)
+http_request_db_time = registry.register(
+    Counter(
+        "karman_http_request_db_seconds_total",
+        "The time spent on database queries while handling HTTP requests.",
+        ["method", "route", "version"],
+    )
+)
+db_pool_connections = registry.register(
+    Gauge(
+        "karman_db_pool_connections",
+        "The number of connections in a database connection pool.",
+        ["database", "state"],
+    )
+)
+db_pool_max_connections = registry.register(
+    Gauge(
+        "karman_db_pool_max_connections",
+        "The maximum size of a database connection pool.",
+        ["database"],
+    )
+)
+
+
+@request_started.connect
+def _request_started(stats: RequestStats) -> None:
+    http_requests_in_progress.inc(1, stats.method)
+
+
+@request_finished.connect
+def _request_finished(stats: RequestStats) -> None:
+    http_requests_in_progress.dec(1, stats.method)
+    labels = (stats.method, stats.route or "", stats.api_version or "")
+    http_requests.inc(1, *labels, str(stats.status_code))
+    http_request_duration.observe(stats.duration, *labels)
+    if stats.db_queries:
+        http_request_db_queries.inc(stats.db_queries, *labels)
+        http_request_db_time.inc(stats.db_time, *labels)
+
+
+def _collect_db_pool(name: str, database: Database) -> None:
+    # The pools of the asyncpg and aiomysql backends. SQLite does not use a pool.
+    pool = getattr(database._backend, "_pool", None)
+    if pool is None:
+        # The database is not connected.
+        return
+    if hasattr(pool, "get_size"):
+        size, idle, maximum = pool.get_size(), pool.get_idle_size(), pool.get_max_size()
+    elif hasattr(pool, "freesize"):
+        size, idle, maximum = pool.size, pool.freesize, pool.maxsize
+    else:
+        return
+    db_pool_connections.set(size - idle, name, "in_use")
+    db_pool_connections.set(idle, name, "idle")
+    db_pool_max_connections.set(maximum, name)
+
+
+@registry.collector
+def _collect_db_pools() -> None:
+    # The replicas are labelled by their position in settings.db_replica_urls.
+    _collect_db_pool("primary", replicas.primary)
+    for i, replica in enumerate(replicas.replicas, 1):
+        _collect_db_pool(f"replica{i}", replica)
+
+
+cache_hits = registry.register(
+    Counter("karman_cache_hits_total", "The number of cache hits.", ["cache"])
+)
+cache_misses = registry.register(
+    Counter("karman_cache_misses_total", "The number of cache misses.", ["cache"])
+)
+cache_evictions = registry.register(
+    Counter(
+        "karman_cache_evictions_total",
+        "The number of entries evicted from a cache.",
+        ["cache"],
+    )
+)
+cache_entries = registry.register(
+    Gauge("karman_cache_entries", "The number of entries in a cache.", ["cache"])
+)
+cache_size = registry.register(
+    Gauge("karman_cache_bytes", "The size of a cache in bytes.", ["cache"])
+)
+
+
+def register_cache(name: str, cache: ResponseCache) -> None:
+    """
+    Reports the statistics of ``cache`` with the label ``cache=name``.
+    """
+
+    @registry.collector
+    def collect() -> None:
+        stats = cache.stats
+        cache_hits.set(stats.hits, name)
+        cache_misses.set(stats.misses, name)
+        cache_evictions.set(stats.evictions, name)
+        cache_entries.set(stats.entries, name)
+        cache_size.set(stats.size, name)
+
+
+def _dump(values: Dict[str, Values]) -> bytes:
+    return orjson.dumps(
+        {
+            name: [[list(k), v] for k, v in metric.items()]
+            for name, metric in values.items()
+        }
+    )
+
+
+def _load(data: bytes) -> Dict[str, Values]:
+    return {
+        name: {tuple(labels): value for labels, value in items}
+        for name, items in orjson.loads(data).items()
+    }
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    temp = path.with_suffix(".tmp")
+    temp.write_bytes(data)
+    os.replace(temp, path)
+
+
+def _read_snapshots(directory: Path) -> List[Tuple[Dict[str, Values], bool]]:
+    snapshots = []
+    for path in directory.glob("*.json"):
+        try:
+            pid = int(path.stem)
+            if pid == os.getpid():
+                continue
+            snapshots.append((_load(path.read_bytes()), _is_alive(pid)))
+        except (OSError, ValueError):
+            logger.warning("Could not read metrics snapshot %s.", path, exc_info=True)
+    return snapshots
+
+
+async def write_snapshot(directory: Path) -> None:
+    """
+    Writes the current values of this process to ``directory``.
+    """
+    data = _dump(registry.collect())
+    await anyio.to_thread.run_sync(_write_file, directory / f"{os.getpid()}.json", data)
+
+
+async def export() -> str:
+    """
+    Returns the metrics in the Prometheus text format. If ``settings.metrics_dir`` is
+    set, the metrics of all processes are aggregated.
+    """
+    snapshots = [(registry.collect(), True)]
+    if settings.metrics_dir is not None:
+        snapshots += await anyio.to_thread.run_sync(
+            _read_snapshots, settings.metrics_dir
+        )
+    return registry.render(snapshots)
+
+
+_snapshot_task: Optional["asyncio.Task[None]"] = None
+
+
+async def _write_snapshots(directory: Path, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await write_snapshot(directory)
+        except OSError:
+            logger.warning("Could not write metrics snapshot.", exc_info=True)
+
+
+async def start_snapshots() -> None:
+    """
+    Starts writing snapshots periodically if ``settings.metrics_dir`` is set.
+    """
+    global _snapshot_task
+    directory = settings.metrics_dir
+    if directory is None or _snapshot_task is not None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    _snapshot_task = asyncio.create_task(
+        _write_snapshots(directory, settings.metrics_interval)
+    )
+
+
+async def stop_snapshots() -> None:
+    """
+    Stops writing snapshots and writes a final snapshot.
+    """
+    global _snapshot_task
+    if _snapshot_task is None:
+        return
+    _snapshot_task.cancel()
+    _snapshot_task = None
+    assert settings.metrics_dir is not None
+    await write_snapshot(settings.metrics_dir)
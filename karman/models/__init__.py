@@ -1,2 +1,5 @@
-from .base import metadata
+from .base import database, metadata, warm_up
+from .rating import Rating
 from .song import Song
+from .song_file import SongFile
+from .song_search import POSTGRES_SEARCH_COLUMN, SQLITE_SEARCH_TABLE
@@ -1,12 +1,82 @@
-__all__ = ["database", "metadata", "BaseMeta"]
+__all__ = ["database", "metadata", "BaseMeta", "database_options", "warm_up"]
+
+import asyncio
+from typing import Any, Dict
 
 import databases
 import ormar
 import sqlalchemy
+from databases.core import Connection
 
 from karman.config import settings
+from karman.instrumentation import InstrumentedDatabase
+
+
+def database_options(url: str) -> Dict[str, Any]:
+    """
+    Returns the options for the backend of the database at ``url`` according to the
+    connection pool settings. Settings that the backend does not support are ignored.
+    """
+    dialect = databases.DatabaseURL(url).dialect
+    options: Dict[str, Any] = {}
+    if dialect == "postgresql":
+        # See asyncpg.create_pool()
+        names = {
+            "db_pool_min_size": "min_size",
+            "db_pool_max_size": "max_size",
+            "db_connect_timeout": "timeout",
+            "db_statement_cache_size": "statement_cache_size",
+            "db_pool_recycle": "max_inactive_connection_lifetime",
+        }
+    elif dialect == "mysql":
+        # See aiomysql.create_pool()
+        names = {
+            "db_pool_min_size": "min_size",
+            "db_pool_max_size": "max_size",
+            "db_connect_timeout": "connect_timeout",
+            "db_pool_recycle": "pool_recycle",
+        }
+    elif dialect == "sqlite":
+        # See sqlite3.connect()
+        names = {"db_statement_cache_size": "cached_statements"}
+    else:
+        names = {}
+    for setting, option in names.items():
+        value = getattr(settings, setting)
+        if value is not None:
+            options[option] = value
+    if "pool_recycle" in options:
+        options["pool_recycle"] = int(options["pool_recycle"])
+    return options
+
+
+async def warm_up(database: databases.Database) -> None:
+    """
+    Connects ``database`` if necessary and makes sure that the connections of the pool
+    are established, so that requests do not have to wait for new connections.
+    """
+    if not database.is_connected:
+        await database.connect()
+    # Drivers with a pool open the minimum number of connections when connecting.
+    # Each of them is checked with a trivial query.
+    size = settings.db_pool_min_size or 1
+    await asyncio.gather(*(_ping(database) for _ in range(size)))
+
+
+async def _ping(database: databases.Database) -> None:
+    # Database.connection() would reuse the connection of the current task. A new
+    # Connection acquires its own connection from the pool.
+    async with Connection(database._backend) as connection:
+        await connection.fetch_val("SELECT 1")
+
 
-database = databases.Database(settings.db_url)
+database = InstrumentedDatabase(
+    settings.db_url,
+    slow_query_threshold=(
+        settings.db_slow_query_threshold if settings.db_profiling else None
+    ),
+    **database_options(settings.db_url),
+)
 metadata = sqlalchemy.MetaData()
 
 
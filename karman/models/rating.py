@@ -0,0 +1,32 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+import ormar
+
+from .base import BaseMeta
+from .song import Song
+
+
+class Rating(ormar.Model):
+    """
+    The rating of a song by a user. Every user rates a song at most once. The sum and
+    the number of the ratings of a song are stored in its ``rating_total`` and
+    ``rating_count`` columns, see ``karman.ratings``.
+    """
+
+    class Meta(BaseMeta):
+        tablename = "ratings"
+        constraints = [
+            ormar.UniqueColumns("song_id", "username", name="uq_ratings_song_id_user")
+        ]
+
+    id: int = ormar.Integer(primary_key=True)
+    song: Optional[Song] = ormar.ForeignKey(
+        Song, name="song_id", nullable=False, ondelete="CASCADE", related_name="ratings"
+    )
+    username: str = ormar.String(max_length=255)
+    rating: Decimal = ormar.Decimal(precision=3, scale=1)
+    updated_at: Optional[datetime] = ormar.DateTime(
+        default=datetime.utcnow, nullable=True
+    )
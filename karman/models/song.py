@@ -1,4 +1,9 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
 import ormar
+import sqlalchemy
 
 from .base import BaseMeta
 
@@ -6,5 +11,58 @@ from .base import BaseMeta
 class Song(ormar.Model):
     class Meta(BaseMeta):
         tablename = "songs"
+        constraints = [
+            # Indexes supporting keyset pagination on the sortable columns.
+            ormar.IndexColumns("title", "id", name="ix_songs_title_id"),
+            ormar.IndexColumns("artist", "id", name="ix_songs_artist_id"),
+        ]
 
     id: int = ormar.Integer(primary_key=True, description="")
+    title: str = ormar.String(max_length=255)
+    artist: str = ormar.String(max_length=255)
+    featured_artists: List[str] = ormar.JSON(
+        default=list, server_default="[]", nullable=False
+    )
+    year: Optional[int] = ormar.Integer(nullable=True)
+    genre: Optional[str] = ormar.String(max_length=255, nullable=True)
+    kind: str = ormar.String(max_length=32, default="ultrastar")
+    players: int = ormar.Integer(default=1)
+    duration: Optional[Decimal] = ormar.Decimal(precision=10, scale=3, nullable=True)
+    golden_notes: bool = ormar.Boolean(default=False)
+    path: Optional[str] = ormar.String(max_length=1024, nullable=True, index=True)
+    # Media files are stored as file names relative to the directory of path.
+    audio_file: Optional[str] = ormar.String(max_length=1024, nullable=True)
+    video_file: Optional[str] = ormar.String(max_length=1024, nullable=True)
+    cover_file: Optional[str] = ormar.String(max_length=1024, nullable=True)
+    background_file: Optional[str] = ormar.String(max_length=1024, nullable=True)
+    # The sum and the number of all ratings of the song. Both are updated together with
+    # the ratings so that the average rating can be read without aggregation.
+    rating_total: Decimal = ormar.Decimal(
+        precision=12, scale=1, server_default="0", nullable=False
+    )
+    rating_count: int = ormar.Integer(server_default="0", nullable=False)
+    # The revision and modification time identify a version of the song for HTTP
+    # caching. Both must be updated on every change, see song_revision().
+    revision: int = ormar.Integer(server_default="1", nullable=False)
+    updated_at: Optional[datetime] = ormar.DateTime(
+        default=datetime.utcnow, nullable=True
+    )
+
+
+# Songs without a year are sorted as if their year was 0. The index must use the exact
+# same expression as the queries, so the literal is not passed as a bind parameter.
+song_year_key = sqlalchemy.func.coalesce(
+    Song.Meta.table.c.year, sqlalchemy.literal_column("0")
+)
+sqlalchemy.Index("ix_songs_year_id", song_year_key, Song.Meta.table.c.id)
+
+
+def song_revision() -> Dict[str, Any]:
+    """
+    Returns the values that must be included in every ``UPDATE`` of the ``songs``
+    table. The values increment the revision and set the modification time.
+    """
+    return {
+        "revision": Song.Meta.table.c.revision + 1,
+        "updated_at": datetime.utcnow(),
+    }
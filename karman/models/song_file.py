@@ -0,0 +1,27 @@
+from typing import Optional
+
+import ormar
+
+from .base import BaseMeta
+from .song import Song
+
+
+class SongFile(ormar.Model):
+    """
+    The fingerprint of an UltraStar file in the library. A file is only parsed again
+    if its size or modification time changed and its content hash differs from the
+    stored one. Files that could not be imported are stored without a song so that
+    they are not parsed again until they change.
+    """
+
+    class Meta(BaseMeta):
+        tablename = "song_files"
+        constraints = [ormar.IndexColumns("song_id", name="ix_song_files_song_id")]
+
+    path: str = ormar.String(primary_key=True, max_length=1024)
+    size: int = ormar.BigInteger()
+    mtime: int = ormar.BigInteger(description="The modification time in nanoseconds.")
+    hash: str = ormar.String(max_length=32)
+    song: Optional[Song] = ormar.ForeignKey(
+        Song, name="song_id", nullable=True, ondelete="CASCADE", related_name="files"
+    )
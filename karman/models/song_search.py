@@ -0,0 +1,80 @@
+"""
+Full text search indexes for the ``songs`` table.
+
+The search indexes are specific to the database dialect and are not part of the ormar
+models. They are attached to the ``songs`` table as DDL events so that
+``metadata.create_all()`` creates them as well. Migrations create them explicitly.
+"""
+
+__all__ = ["SQLITE_SEARCH_TABLE", "POSTGRES_SEARCH_COLUMN"]
+
+from sqlalchemy import DDL, event
+
+from .song import Song
+
+SQLITE_SEARCH_TABLE = "songs_fts"
+"""The name of the FTS5 table indexing songs in SQLite."""
+POSTGRES_SEARCH_COLUMN = "search_vector"
+"""The name of the generated ``tsvector`` column of the ``songs`` table."""
+
+_sqlite_ddl = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE} USING fts5(
+        title, artist, featured_artists,
+        content='songs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_insert AFTER INSERT ON songs
+    BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, title, artist, featured_artists)
+        VALUES (new.id, new.title, new.artist, new.featured_artists);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_delete AFTER DELETE ON songs
+    BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}(
+            {SQLITE_SEARCH_TABLE}, rowid, title, artist, featured_artists
+        ) VALUES ('delete', old.id, old.title, old.artist, old.featured_artists);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_update
+    AFTER UPDATE OF title, artist, featured_artists ON songs
+    BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}(
+            {SQLITE_SEARCH_TABLE}, rowid, title, artist, featured_artists
+        ) VALUES ('delete', old.id, old.title, old.artist, old.featured_artists);
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, title, artist, featured_artists)
+        VALUES (new.id, new.title, new.artist, new.featured_artists);
+    END
+    """,
+]
+_postgres_ddl = [
+    f"""
+    ALTER TABLE songs ADD COLUMN {POSTGRES_SEARCH_COLUMN} tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', title), 'A')
+        || setweight(to_tsvector('simple', artist), 'B')
+        || setweight(to_tsvector('simple', coalesce(featured_artists::text, '')), 'C')
+    ) STORED
+    """,
+    f"CREATE INDEX ix_songs_{POSTGRES_SEARCH_COLUMN} ON songs "
+    f"USING gin ({POSTGRES_SEARCH_COLUMN})",
+]
+
+for statement in _sqlite_ddl:
+    event.listen(
+        Song.Meta.table, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Song.Meta.table,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {SQLITE_SEARCH_TABLE}").execute_if(dialect="sqlite"),
+)
+for statement in _postgres_ddl:
+    event.listen(
+        Song.Meta.table,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
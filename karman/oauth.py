@@ -1,8 +1,56 @@
+"""
+Authentication with signed tokens.
+
+Access and refresh tokens are self-contained JSON Web Tokens signed with HMAC-SHA256.
+They carry the name of the user, the granted scopes and their expiry time so that
+authenticated requests do not need to look up a session in the database. Verified
+tokens are remembered in a bounded LRU cache so that repeated requests with the same
+token skip the signature verification.
+
+Tokens are signed with the keys of a ``KeyRing``. The header of every token names the
+key that signed it. New keys can be added to the key file and old keys can be removed
+while the server is running.
+"""
+
+__all__ = [
+    "Scope",
+    "TokenType",
+    "TokenClaims",
+    "TokenError",
+    "KeyRing",
+    "TokenAuthority",
+    "tokens",
+    "check_token_keys",
+    "hash_password",
+    "verify_password",
+    "authenticate",
+    "oauth2_password_scheme",
+    "token_url",
+    "authorize_url",
+]
+
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
 from enum import Enum
 from functools import lru_cache
-from typing import Dict
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple
 
-from fastapi.security import OAuth2PasswordBearer
+import orjson
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer, SecurityScopes
+from starlette.status import HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN
+
+from karman.config import settings
+
+logger = logging.getLogger("karman.oauth")
 
 
 class Scope(str, Enum):
@@ -22,6 +70,7 @@ class Scope(str, Enum):
 
     SONGS = ("songs", "Allow full access to songs.")
     READ_SONGS = ("songs:read", "Allow read access to songs.")
+    RATE_SONGS = ("songs:rate", "Allow rating songs as the authenticated user.")
     # TODO: Add more scopes
 
 
@@ -34,3 +83,350 @@ oauth2_password_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{token_url}",
     scopes=Scope.all(),
 )
+
+
+class TokenType(str, Enum):
+    """The purpose of a token."""
+
+    access = "access"
+    """Authenticates requests to the API."""
+    refresh = "refresh"
+    """Can be exchanged for a new access token at the token endpoint."""
+
+
+class TokenClaims(NamedTuple):
+    """The verified contents of a token."""
+
+    subject: str
+    """The name of the user."""
+    scopes: FrozenSet[Scope]
+    type: TokenType
+    issued_at: int
+    expires: int
+    """The expiry time as a Unix timestamp."""
+
+
+class TokenError(Exception):
+    """Raised if a token is malformed, has an invalid signature or has expired."""
+
+
+def _encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class KeyRing:
+    """
+    The secret keys used to sign and verify tokens.
+
+    Keys are read from a file containing one key per line as ``<key id> <secret>``.
+    Empty lines and lines starting with ``#`` are ignored. The first key signs new
+    tokens, all keys verify tokens. To rotate keys, add a new key as first line and
+    remove the old key once all tokens signed by it have expired. The file is read
+    again when its modification time changes, at most every ``check_interval``
+    seconds.
+
+    Without a file a random key is generated. Tokens signed by this key are only valid
+    in the current process, see ``check_token_keys()``.
+
+    :param path: The path of the key file.
+    :param check_interval: The minimum number of seconds between two checks for
+                           changes of the key file.
+    :param clock: A monotonic clock.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        check_interval: float = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self.clock = clock
+        self.version = 0
+        """Incremented every time the keys change."""
+        self._keys: Dict[str, bytes] = {}
+        self._signing_key: Tuple[str, bytes] = ("", b"")
+        self._mtime: Optional[int] = None
+        self._next_check = -float("inf")
+        if path is None:
+            self._set_keys([("ephemeral", secrets.token_bytes(32))])
+        else:
+            self.refresh()
+
+    def _set_keys(self, keys: Iterable[Tuple[str, bytes]]) -> None:
+        keys = list(keys)
+        if not keys:
+            raise ValueError("The key file does not contain any keys.")
+        self._keys = dict(keys)
+        self._signing_key = keys[0]
+        self.version += 1
+
+    def _read(self, path: Path) -> None:
+        keys = []
+        for line in path.read_text().splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split(None, 1)
+            if len(parts) != 2:
+                raise ValueError(f"The key {parts[0]!r} has no secret.")
+            keys.append((parts[0], parts[1].encode()))
+        self._set_keys(keys)
+
+    def refresh(self) -> None:
+        """
+        Reads the key file again if it changed. Errors are logged and the current keys
+        are kept.
+        """
+        if self.path is None or self.clock() < self._next_check:
+            return
+        self._next_check = self.clock() + self.check_interval
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+            self._read(self.path)
+            self._mtime = mtime
+        except (OSError, ValueError) as e:
+            if not self._keys:
+                raise
+            logger.error("Could not reload the token keys from %s: %s", self.path, e)
+            return
+        logger.info("Loaded %d token keys from %s", len(self._keys), self.path)
+
+    @property
+    def signing_key(self) -> Tuple[str, bytes]:
+        """The ID and the secret of the key that signs new tokens."""
+        self.refresh()
+        return self._signing_key
+
+    def get(self, key_id: str) -> Optional[bytes]:
+        """
+        Returns the secret of the key with ID ``key_id`` or ``None`` if there is no
+        such key.
+        """
+        self.refresh()
+        return self._keys.get(key_id)
+
+
+class TokenAuthority:
+    """
+    Issues and verifies signed tokens.
+
+    :param keys: The keys that sign the tokens.
+    :param access_lifetime: The number of seconds after which access tokens expire.
+    :param refresh_lifetime: The number of seconds after which refresh tokens expire.
+    :param cache_size: The maximum number of verified tokens that are cached.
+    :param clock: A clock returning the current Unix time.
+    """
+
+    header = {"alg": "HS256", "typ": "JWT"}
+
+    def __init__(
+        self,
+        keys: KeyRing,
+        access_lifetime: float,
+        refresh_lifetime: float,
+        cache_size: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.keys = keys
+        self.lifetimes = {
+            TokenType.access: access_lifetime,
+            TokenType.refresh: refresh_lifetime,
+        }
+        self.cache_size = cache_size
+        self.clock = clock
+        self._cache: "OrderedDict[str, TokenClaims]" = OrderedDict()
+        self._version = keys.version
+
+    def issue(
+        self,
+        subject: str,
+        scopes: Iterable[Scope],
+        type: TokenType = TokenType.access,
+    ) -> str:
+        """
+        Returns a new signed token of the specified ``type`` for the user ``subject``
+        that grants ``scopes``.
+        """
+        key_id, secret = self.keys.signing_key
+        now = int(self.clock())
+        header = _encode(orjson.dumps({**self.header, "kid": key_id}))
+        payload = _encode(
+            orjson.dumps(
+                {
+                    "sub": subject,
+                    "scope": " ".join(sorted(scopes)),
+                    "token_use": type.value,
+                    "iat": now,
+                    "exp": now + int(self.lifetimes[type]),
+                }
+            )
+        )
+        message = header + b"." + payload
+        signature = _encode(hmac.new(secret, message, hashlib.sha256).digest())
+        return (message + b"." + signature).decode()
+
+    def verify(self, token: str, type: TokenType = TokenType.access) -> TokenClaims:
+        """
+        Verifies ``token`` and returns its claims. Results are cached until the token
+        expires or the keys change.
+
+        :raises TokenError: If the token is invalid, has expired or is not of the
+                            specified ``type``.
+        """
+        self.keys.refresh()
+        if self._version != self.keys.version:
+            # Tokens signed by removed keys must not be accepted anymore.
+            self._cache.clear()
+            self._version = self.keys.version
+        claims = self._cache.get(token)
+        if claims is None:
+            claims = self._verify_signature(token)
+            if self.cache_size:
+                self._cache[token] = claims
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(token)
+        if claims.expires <= self.clock():
+            self._cache.pop(token, None)
+            raise TokenError("The token has expired.")
+        if claims.type != type:
+            raise TokenError(f"The token is not an {type.value} token.")
+        return claims
+
+    def _verify_signature(self, token: str) -> TokenClaims:
+        try:
+            header, payload, signature = token.split(".")
+            headers = orjson.loads(_decode(header))
+            secret = self.keys.get(headers.get("kid", ""))
+            if headers.get("alg") != "HS256" or secret is None:
+                raise TokenError("The token was not signed by a known key.")
+            message = f"{header}.{payload}".encode()
+            expected = hmac.new(secret, message, hashlib.sha256).digest()
+            if not hmac.compare_digest(expected, _decode(signature)):
+                raise TokenError("The signature of the token is invalid.")
+            claims = orjson.loads(_decode(payload))
+            return TokenClaims(
+                subject=claims["sub"],
+                scopes=frozenset(Scope(scope) for scope in claims["scope"].split()),
+                type=TokenType(claims["token_use"]),
+                issued_at=claims["iat"],
+                expires=claims["exp"],
+            )
+        except (ValueError, KeyError, TypeError, AttributeError, binascii.Error) as e:
+            raise TokenError("The token is malformed.") from e
+
+
+tokens = TokenAuthority(
+    KeyRing(settings.token_keys_file),
+    access_lifetime=settings.access_token_lifetime,
+    refresh_lifetime=settings.refresh_token_lifetime,
+    cache_size=settings.token_cache_size,
+)
+"""Issues and verifies the tokens of the API."""
+
+
+def check_token_keys() -> None:
+    """
+    Makes sure that tokens are signed with configured keys. Without a key file every
+    process signs tokens with its own random key, so tokens issued by one worker are
+    rejected by the others and all tokens become invalid on restart. This is only
+    allowed in debug mode.
+
+    :raises RuntimeError: If no key file is configured outside of debug mode.
+    """
+    if tokens.keys.path is not None:
+        return
+    if not settings.debug:
+        raise RuntimeError(
+            "The token_keys_file setting is required when debug mode is disabled."
+        )
+    logger.warning(
+        "No token_keys_file is configured. Tokens are signed with a random key that "
+        "is only valid in this process."
+    )
+
+
+PASSWORD_ITERATIONS = 600_000
+
+
+def hash_password(password: str, iterations: int = PASSWORD_ITERATIONS) -> str:
+    """
+    Returns a salted PBKDF2-SHA256 hash of ``password`` that can be used in
+    ``settings.users``.
+    """
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return "$".join(
+        [
+            "pbkdf2_sha256",
+            str(iterations),
+            _encode(salt).decode(),
+            _encode(digest).decode(),
+        ]
+    )
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """
+    Checks ``password`` against a hash created by ``hash_password()``. This takes a
+    considerable amount of time by design and should not run on the event loop.
+    """
+    try:
+        algorithm, iterations, salt, digest = password_hash.split("$")
+        if algorithm != "pbkdf2_sha256":
+            return False
+        actual = hashlib.pbkdf2_hmac(
+            "sha256", password.encode(), _decode(salt), int(iterations)
+        )
+        return hmac.compare_digest(actual, _decode(digest))
+    except (ValueError, binascii.Error):
+        return False
+
+
+def _has_scope(granted: FrozenSet[Scope], required: str) -> bool:
+    # A scope like "songs" includes all scopes below it like "songs:read".
+    values = {scope.value for scope in granted}
+    return required in values or required.partition(":")[0] in values
+
+
+async def authenticate(
+    security_scopes: SecurityScopes, token: str = Depends(oauth2_password_scheme)
+) -> TokenClaims:
+    """
+    A dependency that verifies the access token of a request and returns its claims.
+    Use it with ``fastapi.Security()`` to require scopes. It is a coroutine so that
+    the token cache is only used from the event loop and never by several threads.
+    """
+    authenticate_value = "Bearer"
+    if security_scopes.scopes:
+        authenticate_value = f'Bearer scope="{security_scopes.scope_str}"'
+    try:
+        claims = tokens.verify(token)
+    except TokenError as e:
+        raise HTTPException(
+            HTTP_401_UNAUTHORIZED,
+            str(e),
+            headers={
+                "WWW-Authenticate": f'{authenticate_value}, error="invalid_token"'
+            },
+        )
+    for scope in security_scopes.scopes:
+        if not _has_scope(claims.scopes, scope):
+            raise HTTPException(
+                HTTP_403_FORBIDDEN,
+                "The token does not grant the required scopes.",
+                headers={
+                    "WWW-Authenticate": f"{authenticate_value}, "
+                    'error="insufficient_scope"'
+                },
+            )
+    return claims
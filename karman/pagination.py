@@ -0,0 +1,142 @@
+__all__ = ["Cursor", "CursorParams", "paginate"]
+
+import base64
+from typing import Any, List, Mapping, NamedTuple, Optional, Tuple
+
+import orjson
+import sqlalchemy
+from databases import Database
+from fastapi import HTTPException, Query
+from sqlalchemy.sql import ColumnElement, Select
+from starlette.status import HTTP_400_BAD_REQUEST
+
+
+class Cursor(NamedTuple):
+    """
+    Identifies a position in a keyset paginated listing. A cursor stores the sort key
+    and ID of the item at the boundary of a page so that the adjacent page can be
+    fetched with an index seek instead of an ``OFFSET`` scan.
+    """
+
+    ordering: str
+    """The ordering (e.g. ``title`` or ``-year``) for which the cursor was issued."""
+    key: Any
+    """The sort key of the boundary item."""
+    id: int
+    """The ID of the boundary item. The ID is used to break ties in the sort key."""
+    backwards: bool = False
+    """Whether the cursor points to the items before or after the boundary item."""
+
+    def encode(self) -> str:
+        """
+        Encodes the cursor into an opaque, URL-safe string.
+        """
+        data = orjson.dumps([self.ordering, self.key, self.id, self.backwards])
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        """
+        Decodes a cursor previously created by ``encode()``.
+
+        :raises ValueError: If ``value`` is not a valid cursor.
+        """
+        try:
+            data = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            ordering, key, id, backwards = orjson.loads(data)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {value}") from e
+        if (
+            not isinstance(ordering, str)
+            or not isinstance(key, (str, int, float, type(None)))
+            or not isinstance(id, int)
+            or not isinstance(backwards, bool)
+        ):
+            raise ValueError(f"Invalid cursor: {value}")
+        return cls(ordering, key, id, backwards)
+
+
+class CursorParams:
+    """
+    Query parameters for endpoints that use keyset pagination.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(
+            50, ge=1, le=100, description="The maximum number of items per page."
+        ),
+        cursor: Optional[str] = Query(
+            None,
+            description="An opaque cursor as returned in the `next` or `prev` field of "
+            "a previous page. If omitted the first page is returned.",
+        ),
+    ):
+        self.limit = limit
+        try:
+            self.cursor = Cursor.decode(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(HTTP_400_BAD_REQUEST, "The cursor is invalid.")
+
+
+async def paginate(
+    database: Database,
+    query: Select,
+    ordering: str,
+    key: ColumnElement,
+    id: sqlalchemy.Column,
+    params: CursorParams,
+    descending: bool = False,
+) -> Tuple[List[Mapping[str, Any]], Optional[str], Optional[str]]:
+    """
+    Fetches a single page of ``query`` using keyset pagination. Instead of skipping
+    rows the query seeks directly to the position stored in the cursor. If there is an
+    index on ``(key, id)`` fetching a deep page is as fast as fetching the first one.
+
+    :param database: The database on which the query is executed.
+    :param query: The query producing the items. The query must not be ordered.
+    :param ordering: A name for the ordering. Cursors are only valid for the ordering
+                     for which they were issued.
+    :param key: The sort key. This may be a column or an expression.
+    :param id: A unique column of the query used to break ties in ``key``.
+    :param params: The pagination parameters of the request.
+    :param descending: Whether items are sorted in descending order.
+    :return: A tuple consisting of the rows of the page as well as the encoded
+             cursors of the next and the previous page (if they exist).
+    """
+    cursor = params.cursor
+    if cursor is not None and cursor.ordering != ordering:
+        raise HTTPException(
+            HTTP_400_BAD_REQUEST, "The cursor was issued for a different ordering."
+        )
+    backwards = cursor is not None and cursor.backwards
+    reverse = descending != backwards
+
+    query = query.add_columns(key.label("cursor_key"))
+    if cursor is not None:
+        position = sqlalchemy.tuple_(key, id)
+        bound = (cursor.key, cursor.id)
+        query = query.where(position < bound if reverse else position > bound)
+    if reverse:
+        query = query.order_by(key.desc(), id.desc())
+    else:
+        query = query.order_by(key.asc(), id.asc())
+    rows = await database.fetch_all(query.limit(params.limit + 1))
+
+    has_more = len(rows) > params.limit
+    rows = rows[: params.limit]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+
+    next_cursor = prev_cursor = None
+    if backwards or has_more:
+        last = rows[-1]
+        next_cursor = Cursor(ordering, last["cursor_key"], last[id.name]).encode()
+    if cursor is not None and (has_more or not backwards):
+        first = rows[0]
+        prev_cursor = Cursor(
+            ordering, first["cursor_key"], first[id.name], backwards=True
+        ).encode()
+    return rows, next_cursor, prev_cursor
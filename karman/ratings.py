@@ -0,0 +1,219 @@
+"""
+User ratings of songs.
+
+Every song stores the sum and the number of its ratings in the ``rating_total`` and
+``rating_count`` columns so that its average rating can be read without aggregating
+the ``ratings`` table. The counters are changed in the same transaction as the
+ratings. The row of the song is locked first so that concurrent ratings of a song
+are applied one after another.
+
+A rating only changes the counters of its song. The revision of the song is
+incremented so that its ETag changes, but ``karman.signals.songs_changed`` is not
+sent because it invalidates library-wide caches and indexes. Cached song list pages
+show the new average once they expire.
+
+``reconcile_ratings()`` recomputes the counters from the ratings, e.g. after ratings
+were changed by hand.
+"""
+
+__all__ = [
+    "average_rating",
+    "get_rating",
+    "rate_song",
+    "reconcile_ratings",
+    "remove_rating",
+]
+
+import logging
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import sqlalchemy
+from databases import Database
+
+from karman import models
+from karman.models.song import song_revision
+from karman.signals import songs_changed
+
+logger = logging.getLogger("karman.ratings")
+songs = models.Song.Meta.table
+ratings = models.Rating.Meta.table
+
+RATING_PRECISION = Decimal("0.1")
+
+
+def average_rating(row: Any) -> Optional[Decimal]:
+    """
+    Returns the average rating of a row of the ``songs`` table or ``None`` if the song
+    has not been rated.
+    """
+    if not row["rating_count"]:
+        return None
+    average = Decimal(row["rating_total"]) / int(row["rating_count"])
+    return average.quantize(RATING_PRECISION, ROUND_HALF_UP)
+
+
+async def _lock_song(database: Database, song_id: int) -> bool:
+    # Returns whether the song exists. Databases without row locks ignore FOR UPDATE.
+    query = sqlalchemy.select([songs.c.id]).where(songs.c.id == song_id)
+    return await database.fetch_val(query.with_for_update()) is not None
+
+
+async def _update_counters(
+    database: Database, song_id: int, total: Decimal, count: int
+) -> None:
+    # Adds total and count to the counters of the song.
+    await database.execute(
+        songs.update()
+        .where(songs.c.id == song_id)
+        .values(
+            rating_total=songs.c.rating_total + total,
+            rating_count=songs.c.rating_count + count,
+        )
+        .values(song_revision())
+    )
+
+
+async def get_rating(
+    song_id: int, username: str, database: Database = models.database
+) -> Optional[Decimal]:
+    """
+    Returns the rating of the song with ID ``song_id`` by ``username`` or ``None`` if
+    the user has not rated the song.
+    """
+    return await database.fetch_val(  # type: ignore
+        sqlalchemy.select([ratings.c.rating]).where(
+            ratings.c.song_id == song_id, ratings.c.username == username
+        )
+    )
+
+
+async def rate_song(
+    song_id: int, username: str, rating: Decimal, database: Database = models.database
+) -> bool:
+    """
+    Sets the rating of the song with ID ``song_id`` by ``username``. A previous rating
+    by the same user is replaced.
+
+    :return: Whether the song exists.
+    """
+    async with database.transaction():
+        if not await _lock_song(database, song_id):
+            return False
+        condition = sqlalchemy.and_(
+            ratings.c.song_id == song_id, ratings.c.username == username
+        )
+        previous = await database.fetch_val(
+            sqlalchemy.select([ratings.c.rating]).where(condition)
+        )
+        values = {"rating": rating, "updated_at": datetime.utcnow()}
+        if previous is None:
+            await database.execute(
+                ratings.insert().values(song_id=song_id, username=username, **values)
+            )
+            await _update_counters(database, song_id, rating, 1)
+        else:
+            await database.execute(ratings.update().where(condition).values(values))
+            await _update_counters(database, song_id, rating - Decimal(previous), 0)
+    return True
+
+
+async def remove_rating(
+    song_id: int, username: str, database: Database = models.database
+) -> bool:
+    """
+    Removes the rating of the song with ID ``song_id`` by ``username``.
+
+    :return: Whether the rating existed.
+    """
+    async with database.transaction():
+        if not await _lock_song(database, song_id):
+            return False
+        condition = sqlalchemy.and_(
+            ratings.c.song_id == song_id, ratings.c.username == username
+        )
+        previous = await database.fetch_val(
+            sqlalchemy.select([ratings.c.rating]).where(condition)
+        )
+        if previous is None:
+            return False
+        await database.execute(ratings.delete().where(condition))
+        await _update_counters(database, song_id, -Decimal(previous), -1)
+    return True
+
+
+async def _reconcile_batch(database: Database, song_ids: List[int]) -> List[int]:
+    # Recomputes the counters of the songs and returns the IDs of the songs whose
+    # counters were wrong.
+    query = sqlalchemy.select(
+        [songs.c.id, songs.c.rating_total, songs.c.rating_count]
+    ).where(songs.c.id.in_(song_ids))
+    counters = {
+        row["id"]: (Decimal(row["rating_total"]), row["rating_count"])
+        for row in await database.fetch_all(query.with_for_update())
+    }
+    query = (
+        sqlalchemy.select(
+            [
+                ratings.c.song_id,
+                sqlalchemy.func.sum(ratings.c.rating).label("total"),
+                sqlalchemy.func.count().label("count"),
+            ]
+        )
+        .where(ratings.c.song_id.in_(song_ids))
+        .group_by(ratings.c.song_id)
+    )
+    expected: Dict[int, Tuple[Decimal, int]] = {
+        row["song_id"]: (Decimal(row["total"]).quantize(RATING_PRECISION), row["count"])
+        for row in await database.fetch_all(query)
+    }
+    changed = []
+    for song_id, (actual_total, actual_count) in counters.items():
+        total, count = expected.get(song_id, (Decimal(0), 0))
+        # Some databases store decimals as floats.
+        if actual_count == count and actual_total.quantize(RATING_PRECISION) == total:
+            continue
+        await database.execute(
+            songs.update()
+            .where(songs.c.id == song_id)
+            .values(rating_total=total, rating_count=count)
+            .values(song_revision())
+        )
+        changed.append(song_id)
+    return changed
+
+
+async def reconcile_ratings(
+    database: Database = models.database, batch_size: int = 500
+) -> int:
+    """
+    Recomputes the rating counters of all songs from the ``ratings`` table. Songs are
+    processed in batches of ``batch_size`` songs in separate transactions so that
+    ratings are only blocked briefly. ``karman.signals.songs_changed`` is sent after
+    every batch that corrected counters.
+
+    :return: The number of songs whose counters were corrected.
+    """
+    corrected = 0
+    last_id = 0
+    while True:
+        song_ids = [
+            row["id"]
+            for row in await database.fetch_all(
+                sqlalchemy.select([songs.c.id])
+                .where(songs.c.id > last_id)
+                .order_by(songs.c.id)
+                .limit(batch_size)
+            )
+        ]
+        if not song_ids:
+            break
+        async with database.transaction():
+            changed = await _reconcile_batch(database, song_ids)
+        if changed:
+            logger.info("Corrected the rating counters of %d songs", len(changed))
+            await songs_changed.send(changed)
+            corrected += len(changed)
+        last_id = song_ids[-1]
+    return corrected
@@ -0,0 +1,168 @@
+"""
+Read-only database replicas.
+
+Read-only endpoints use the ``read_database`` dependency to get a database. If
+``settings.db_replica_urls`` is set, it returns one of the healthy replicas in
+round-robin order. Otherwise, and while no replica is healthy, it returns the primary
+database. Writes always use the primary database (``karman.models.database``).
+
+Replicas lag behind the primary. To let clients read their own writes, the
+``ReadYourWritesMiddleware`` sets a short-lived cookie on the responses to successful
+write requests. Requests with this cookie are served by the primary. Other clients
+may read slightly outdated data from a replica for a short time.
+"""
+
+__all__ = [
+    "ReplicaSet",
+    "ReadYourWritesMiddleware",
+    "read_database",
+    "replicas",
+    "PIN_COOKIE",
+]
+
+import asyncio
+import logging
+import math
+from typing import Iterable, List, Optional
+
+import databases
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from karman import models
+from karman.config import settings
+from karman.instrumentation import InstrumentedDatabase
+from karman.models.base import database_options, warm_up
+
+logger = logging.getLogger("karman.db")
+
+PIN_COOKIE = "karman_primary"
+"""The cookie that pins a client to the primary database."""
+
+
+class ReplicaSet:
+    """
+    A primary database and its read-only replicas.
+
+    :param primary: The primary database.
+    :param replicas: The replica databases.
+    """
+
+    def __init__(
+        self,
+        primary: databases.Database,
+        replicas: Iterable[databases.Database] = (),
+    ) -> None:
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.healthy = [False] * len(self.replicas)
+        self._index = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def reader(self, pinned: bool = False) -> databases.Database:
+        """
+        Returns the database for a read-only request. This is the next healthy
+        replica unless the request is ``pinned`` to the primary.
+        """
+        if pinned:
+            return self.primary
+        for _ in range(len(self.replicas)):
+            self._index = (self._index + 1) % len(self.replicas)
+            if self.healthy[self._index]:
+                return self.replicas[self._index]
+        return self.primary
+
+    async def check(self, timeout: float = 5) -> None:
+        """
+        Checks the health of all replicas concurrently. Replicas that are not
+        connected are connected first.
+        """
+        results = await asyncio.gather(
+            *(asyncio.wait_for(warm_up(replica), timeout) for replica in self.replicas),
+            return_exceptions=True,
+        )
+        for index, result in enumerate(results):
+            healthy = not isinstance(result, BaseException)
+            if healthy != self.healthy[index]:
+                url = self.replicas[index].url.obscure_password
+                if healthy:
+                    logger.info("Replica %s is available.", url)
+                else:
+                    logger.warning("Replica %s is unavailable: %r", url, result)
+            self.healthy[index] = healthy
+
+    async def _run_checks(self, interval: float, timeout: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check(timeout)
+
+    async def start(self, interval: float, timeout: float = 5) -> None:
+        """
+        Connects the replicas and starts checking their health every ``interval``
+        seconds.
+        """
+        if not self.replicas or self._task is not None:
+            return
+        await self.check(timeout)
+        self._task = asyncio.create_task(self._run_checks(interval, timeout))
+
+    async def stop(self) -> None:
+        """
+        Stops the health checks and disconnects the replicas.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for index, replica in enumerate(self.replicas):
+            self.healthy[index] = False
+            if replica.is_connected:
+                await replica.disconnect()
+
+
+class ReadYourWritesMiddleware:
+    """
+    An ASGI middleware that sets the ``PIN_COOKIE`` on responses to successful
+    requests with methods other than ``GET``, ``HEAD`` and ``OPTIONS``. Browsers keep
+    the cookie for ``max_age`` seconds.
+    """
+
+    def __init__(self, app: ASGIApp, max_age: float) -> None:
+        self.app = app
+        self.cookie = (
+            f"{PIN_COOKIE}=1; Max-Age={math.ceil(max_age)}; Path=/; HttpOnly; "
+            "SameSite=Lax"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("Set-Cookie", self.cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _create_replicas(urls: List[str]) -> List[databases.Database]:
+    threshold = settings.db_slow_query_threshold if settings.db_profiling else None
+    return [
+        InstrumentedDatabase(
+            url, slow_query_threshold=threshold, **database_options(url)
+        )
+        for url in urls
+    ]
+
+
+replicas = ReplicaSet(models.database, _create_replicas(settings.db_replica_urls))
+
+
+async def read_database(request: Request) -> databases.Database:
+    """
+    A dependency returning the database that serves a read-only request. It is a
+    coroutine so that it runs on the event loop instead of the threadpool.
+    """
+    return replicas.reader(pinned=PIN_COOKIE in request.cookies)
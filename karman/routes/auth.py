@@ -1,14 +1,30 @@
 __all__ = ["router"]
 
+from datetime import timedelta
+from typing import Set, Union
+
 from fastapi import APIRouter, Depends, Query, Response
 from fastapi.routing import APIRoute
-from starlette.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, RedirectResponse
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED
 
 from karman import oauth
+from karman.config import settings
+from karman.oauth import (
+    PASSWORD_ITERATIONS,
+    Scope,
+    TokenClaims,
+    TokenError,
+    TokenType,
+    tokens,
+    verify_password,
+)
 from karman.schemas.auth import (
     OAuth2AuthorizationRequest,
+    OAuth2Error,
     OAuth2ErrorResponse,
+    OAuth2GrantType,
     OAuth2TokenRequestForm,
     OAuth2TokenResponse,
 )
@@ -29,6 +45,10 @@ router = APIRouter(
     },
 )
 
+# Passwords of unknown users are verified against this hash. Its digest does not match
+# any password.
+dummy_password_hash = f"pbkdf2_sha256${PASSWORD_ITERATIONS}${'A' * 22}${'A' * 43}"
+
 
 # Note: This endpoint is intentionally designed to be compatible with the OAuth token
 # flows. Currently no such flow is implemented but may be in the future without breaking
@@ -44,14 +64,103 @@ router = APIRouter(
 async def token(
     response: Response,
     form_data: OAuth2TokenRequestForm = Depends(),
-) -> OAuth2TokenResponse:
+) -> Union[OAuth2TokenResponse, JSONResponse]:
     """
     Authenticates a user using `username` and`password`. This endpoint implements the
     [OAuth 2.0 Password Grant](
     https://www.oauth.com/oauth2-servers/access-tokens/password-grant/).
+
+    The response contains a `refresh_token` that can be exchanged for a new access
+    token using the `refresh_token` grant type. The scopes of the new token must be
+    a subset of the scopes of the refresh token.
     """
     response.headers["Cache-Control"] = "no-store"
-    raise NotImplementedError
+    if form_data.unknown_scopes:
+        return oauth_error(
+            OAuth2Error.INVALID_SCOPE,
+            f"Unknown scopes: {' '.join(form_data.unknown_scopes)}",
+        )
+    requested = set(form_data.scopes)
+    if form_data.grant_type == OAuth2GrantType.PASSWORD:
+        if form_data.username is None or form_data.password is None:
+            return oauth_error(
+                OAuth2Error.INVALID_REQUEST, "The username and password are required."
+            )
+        if not await check_password(form_data.username, form_data.password):
+            return oauth_error(
+                OAuth2Error.INVALID_GRANT, "The username or password is invalid."
+            )
+        subject = form_data.username
+        scopes: Set[Scope] = requested or set(Scope)
+    elif form_data.grant_type == OAuth2GrantType.REFRESH_TOKEN:
+        if form_data.refresh_token is None:
+            return oauth_error(
+                OAuth2Error.INVALID_REQUEST, "The refresh token is required."
+            )
+        claims = verify_refresh_token(form_data.refresh_token, requested)
+        if isinstance(claims, JSONResponse):
+            return claims
+        subject = claims.subject
+        scopes = requested or set(claims.scopes)
+    else:
+        return oauth_error(
+            OAuth2Error.UNSUPPORTED_GRANT_TYPE,
+            f"The grant type {form_data.grant_type.value} is not supported.",
+        )
+    return OAuth2TokenResponse(
+        access_token=tokens.issue(subject, scopes),
+        expires_in=timedelta(seconds=settings.access_token_lifetime),
+        refresh_token=tokens.issue(subject, scopes, TokenType.refresh),
+        scope=" ".join(sorted(scopes)),
+    )
+
+
+def verify_refresh_token(
+    refresh_token: str, requested: Set[Scope]
+) -> Union[TokenClaims, JSONResponse]:
+    """
+    Verifies a ``refresh_token`` that is exchanged for a token with the ``requested``
+    scopes. Returns the claims of the refresh token or an error response.
+    """
+    try:
+        claims = tokens.verify(refresh_token, TokenType.refresh)
+    except TokenError as e:
+        return oauth_error(OAuth2Error.INVALID_GRANT, str(e))
+    # Removing a user revokes their refresh tokens.
+    if claims.subject not in settings.users:
+        return oauth_error(OAuth2Error.INVALID_GRANT, "The user does not exist.")
+    if not requested <= claims.scopes:
+        return oauth_error(
+            OAuth2Error.INVALID_SCOPE,
+            "The requested scopes exceed the scopes of the refresh token.",
+        )
+    return claims
+
+
+async def check_password(username: str, password: str) -> bool:
+    """
+    Checks the ``password`` of the user ``username``. Unknown users take as long as
+    existing users so that the response time does not reveal which users exist.
+    """
+    password_hash = settings.users.get(username)
+    secret = dummy_password_hash
+    if password_hash is not None:
+        secret = password_hash.get_secret_value()
+    # Verifying a password takes a while by design.
+    valid = await run_in_threadpool(verify_password, password, secret)
+    return valid and password_hash is not None
+
+
+def oauth_error(error: OAuth2Error, description: str) -> JSONResponse:
+    """
+    Returns an error response of the token endpoint.
+    """
+    content = OAuth2ErrorResponse(error=error, error_description=description)
+    return JSONResponse(
+        content.dict(exclude_none=True),
+        status_code=HTTP_400_BAD_REQUEST,
+        headers={"Cache-Control": "no-store"},
+    )
 
 
 def authorize_callback(
@@ -0,0 +1,92 @@
+__all__ = ["router"]
+
+from databases import Database
+from fastapi import APIRouter, HTTPException, Path, Security
+from fastapi.params import Depends
+from starlette.responses import Response
+from starlette.status import HTTP_204_NO_CONTENT, HTTP_404_NOT_FOUND
+
+from karman import ratings, schemas
+from karman.oauth import Scope, TokenClaims, authenticate
+from karman.replicas import read_database
+from karman.versioning import version
+
+router = APIRouter(tags=["Ratings"])
+
+song_id_path = Path(..., alias="id", description="The ID of the song.", example=123)
+username_path = Path(
+    ...,
+    max_length=255,
+    description="The name of the user who rated the song.",
+    example="alice",
+)
+# Users can only change their own ratings.
+rate_scope = Security(authenticate, scopes=[Scope.RATE_SONGS.value])
+
+
+@version(1)
+@router.get(
+    "/{id}/ratings/{username}",
+    summary="Get A Rating",
+    response_model=schemas.Rating,
+    response_description="The request was executed successfully.",
+    responses={HTTP_404_NOT_FOUND: {"description": "The user has not rated the song."}},
+)
+async def get_rating(
+    song_id: int = song_id_path,
+    username: str = username_path,
+    database: Database = Depends(read_database),
+) -> schemas.Rating:
+    """
+    Returns the rating of the song with ID `id` by `username`.
+    """
+    rating = await ratings.get_rating(song_id, username, database)
+    if rating is None:
+        raise HTTPException(HTTP_404_NOT_FOUND, "Rating not found.")
+    return schemas.Rating.parse_obj({"rating": rating})
+
+
+@version(1)
+@router.put(
+    "/{id}/rating",
+    summary="Rate A Song",
+    response_model=schemas.Rating,
+    response_description="The rating was saved successfully.",
+    responses={
+        HTTP_404_NOT_FOUND: {
+            "description": "No song with the specified `id` was found."
+        }
+    },
+)
+async def put_rating(
+    rating: schemas.Rating,
+    song_id: int = song_id_path,
+    claims: TokenClaims = rate_scope,
+) -> schemas.Rating:
+    """
+    Sets the rating of the song with ID `id` by the authenticated user. A previous
+    rating by the same user is replaced. The `averageRating` of the song is updated
+    immediately.
+    """
+    if not await ratings.rate_song(song_id, claims.subject, rating.rating):
+        raise HTTPException(HTTP_404_NOT_FOUND, "Song not found.")
+    return rating
+
+
+@version(1)
+@router.delete(
+    "/{id}/rating",
+    summary="Delete A Rating",
+    status_code=HTTP_204_NO_CONTENT,
+    response_description="The rating was deleted successfully.",
+    responses={HTTP_404_NOT_FOUND: {"description": "The user has not rated the song."}},
+)
+async def delete_rating(
+    song_id: int = song_id_path, claims: TokenClaims = rate_scope
+) -> Response:
+    """
+    Removes the rating of the song with ID `id` by the authenticated user.
+    """
+    if not await ratings.remove_rating(song_id, claims.subject):
+        raise HTTPException(HTTP_404_NOT_FOUND, "Rating not found.")
+    return Response(status_code=HTTP_204_NO_CONTENT)
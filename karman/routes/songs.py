@@ -1,14 +1,57 @@
 __all__ = ["router"]
 
-from typing import List
+import logging
+import os
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from fastapi import APIRouter, Path
+import sqlalchemy
+from databases import Database
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Path, Query, Security
 from fastapi.params import Depends
-from fastapi_pagination import LimitOffsetPage
-from fastapi_pagination.limit_offset import Params
-from starlette.status import HTTP_204_NO_CONTENT, HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND
+from sqlalchemy.sql import ColumnElement
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_204_NO_CONTENT,
+    HTTP_206_PARTIAL_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
+    HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+)
 
-from karman import schemas
+from karman import metrics, models, schemas
+from karman.cache import ResponseCache
+from karman.config import settings
+from karman.library import delete_songs, song_media_path, update_songs
+from karman.models.song import song_year_key
+from karman.oauth import Scope, authenticate
+from karman.pagination import CursorParams, paginate
+from karman.ratings import average_rating
+from karman.replicas import PIN_COOKIE, read_database, replicas
+from karman.search import search_songs
+from karman.serialization import RowSerializer, dumps
+from karman.signals import songs_changed
+from karman.suggest import song_index
+from karman.thumbnails import ThumbnailError, thumbnail_sizes, thumbnails
+from karman.util import MediaResponse, cache_headers, is_not_modified, make_etag
 from karman.versioning import version
 
 router = APIRouter(
@@ -28,19 +71,352 @@ detail_router = APIRouter(
     }
 )
 
+logger = logging.getLogger("karman.api")
+T = TypeVar("T")
+songs = models.Song.Meta.table
+song_files = models.SongFile.Meta.table
+sort_keys: Dict[schemas.SongSort, ColumnElement] = {
+    schemas.SongSort.title: songs.c.title,
+    schemas.SongSort.artist: songs.c.artist,
+    schemas.SongSort.year: song_year_key,
+    schemas.SongSort.id: songs.c.id,
+}
+
+export_media_types = {
+    schemas.SongExportFormat.ndjson: "application/x-ndjson",
+    schemas.SongExportFormat.json: "application/json",
+}
+media_columns: Dict[str, sqlalchemy.Column] = {
+    "audio": songs.c.audio_file,
+    "video": songs.c.video_file,
+    "artwork": songs.c.cover_file,
+    "background": songs.c.background_file,
+}
+# Resized images are content-addressed and rarely change so they can be cached long.
+thumbnail_cache_control = "public, max-age=604800"
+# Serialized song list pages. Any change to the songs invalidates all pages because
+# inserted or modified songs can move into any page.
+song_list_cache = ResponseCache(settings.song_cache_size, settings.song_cache_ttl)
+songs_changed.connect(song_list_cache.clear)
+metrics.register_cache("song_list", song_list_cache)
+# Exported songs are serialized and sent in batches of this many songs.
+export_batch_size = 256
+# The maximum number of songs that can be requested at once. All IDs are sent in a
+# single IN clause which must stay below the parameter limits of the databases.
+batch_size_limit = 500
+# Endpoints that change the library require a token with full access to songs.
+songs_scope = Security(authenticate, scopes=[Scope.SONGS.value])
+
+
+def media_url(kind: str) -> Callable[[Any, str], Optional[str]]:
+    """
+    Returns a function that builds the URL of the media file of the specified
+    ``kind`` from a row of the ``songs`` table and the base URL of the song list.
+    """
+    column = media_columns[kind].name
+
+    def url(row: Any, base_url: str) -> Optional[str]:
+        return f"{base_url}{row['id']}/{kind}" if row[column] else None
+
+    return url
+
+
+song_serializer = RowSerializer[str](
+    schemas.Song,
+    {
+        **{f"{kind}_url": media_url(kind) for kind in media_columns},
+        "average_rating": lambda row, _: average_rating(row),
+    },
+)
+"""Serializes rows of the ``songs`` table. The context is the song list URL."""
+
+
+def song_response(
+    content: Any, headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """
+    Returns a JSON response containing serialized songs.
+    """
+    return Response(
+        dumps(content), media_type="application/json", headers=dict(headers or {})
+    )
+
 
 @version(1)
 @router.get(
     "/",
     summary="List Songs",
-    response_model=LimitOffsetPage[schemas.Song],
+    response_model=schemas.CursorPage[schemas.Song],
     response_description="The request was executed successfully.",
+    responses={
+        HTTP_400_BAD_REQUEST: {
+            "description": "The `cursor` is invalid or was issued for a different "
+            "sort order."
+        },
+        HTTP_304_NOT_MODIFIED: {
+            "description": "The page has not changed since it was last requested."
+        },
+    },
 )
 async def get_songs(
-    params: Params = Depends(),  # type: ignore
-) -> List[schemas.Song]:
-    """Lists all songs in the Karman library."""
-    raise NotImplementedError
+    request: Request,
+    q: Optional[str] = Query(
+        None,
+        description="Searches songs by title, artist and featured artists. Every word "
+        "is matched as a prefix. If specified, songs are sorted by relevance and "
+        "`sort` and `desc` are ignored.",
+        example="love the way",
+    ),
+    sort: schemas.SongSort = Query(
+        schemas.SongSort.title,
+        description="The field by which the songs are sorted. Songs with equal values "
+        "are sorted by their ID.",
+    ),
+    desc: bool = Query(False, description="Sort the songs in descending order."),
+    params: CursorParams = Depends(),
+    database: Database = Depends(read_database),
+) -> Response:
+    """
+    Lists all songs in the Karman library. The list is paginated using cursors. Pass
+    the `next` or `prev` value of a page as `cursor` to get the adjacent page.
+
+    Pages can be revalidated using `If-None-Match`. `If-Modified-Since` is not
+    supported for pages because deleted songs do not change the `Last-Modified` date.
+    """
+    base_url = request.url_for("get_songs")
+    if q is not None:
+        # Searches are case insensitive so equivalent queries can share cache entries.
+        q = " ".join(q.split()).casefold()
+        key: Hashable = (base_url, q, params.limit, params.cursor)
+    else:
+        key = (base_url, sort, desc, params.limit, params.cursor)
+    # Clients pinned to the primary bypass the cache because their writes may have
+    # been handled by another process whose changes did not clear this cache.
+    pinned = PIN_COOKIE in request.cookies
+    generation = song_list_cache.generation
+    cached = None if pinned else song_list_cache.get(key)
+    if cached is None:
+        body, headers = await song_page(database, base_url, q, sort, desc, params)
+        # Replicas may lag behind for the read-your-writes time after a change.
+        lag = song_list_cache.clock() - song_list_cache.cleared_at
+        if database is replicas.primary or lag >= settings.db_read_your_writes:
+            song_list_cache.put(key, body, headers, generation)
+    else:
+        body, headers = cached.body, cached.headers
+    headers = {**headers, "X-Cache": "MISS" if cached is None else "HIT"}
+    if is_not_modified(request, headers["ETag"]):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def song_page(
+    database: Database,
+    base_url: str,
+    q: Optional[str],
+    sort: schemas.SongSort,
+    desc: bool,
+    params: CursorParams,
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Queries a page of songs and returns its serialized body and its cache headers.
+    """
+    if q is not None:
+        ordering = f"q:{q}"
+        query, key, id = search_songs(database, q)
+        rows, next_cursor, prev_cursor = await paginate(
+            database, query, ordering, key, id, params
+        )
+    else:
+        ordering = f"-{sort.value}" if desc else sort.value
+        rows, next_cursor, prev_cursor = await paginate(
+            database,
+            songs.select(),
+            ordering=ordering,
+            key=sort_keys[sort],
+            id=songs.c.id,
+            params=params,
+            descending=desc,
+        )
+    # A page is determined by the revisions of its songs and its cursors.
+    etag = make_etag(
+        ordering,
+        next_cursor,
+        prev_cursor,
+        *(f"{row['id']}:{row['revision']}" for row in rows),
+    )
+    last_modified = max(
+        (row["updated_at"] for row in rows if row["updated_at"] is not None),
+        default=None,
+    )
+    page = {
+        "items": song_serializer.to_dicts(rows, base_url),
+        "next": next_cursor,
+        "prev": prev_cursor,
+    }
+    return dumps(page), cache_headers(etag, last_modified)
+
+
+async def export_songs(
+    database: Database, format: schemas.SongExportFormat, base_url: str
+) -> AsyncIterator[bytes]:
+    """
+    Serializes all songs in the database into chunks of the specified ``format``. Rows
+    are read from a server-side cursor so memory usage does not depend on the number
+    of songs.
+    """
+    ndjson = format == schemas.SongExportFormat.ndjson
+    separator = b"\n" if ndjson else b","
+    first = True
+    rows = database.iterate(songs.select().order_by(songs.c.id))
+    async for batch in _batches(rows, export_batch_size):
+        chunk = separator.join(
+            dumps(song) for song in song_serializer.to_dicts(batch, base_url)
+        )
+        if ndjson:
+            yield chunk + separator
+        else:
+            yield (b"[" if first else separator) + chunk
+        first = False
+    if not ndjson:
+        yield b"[]" if first else b"]"
+
+
+async def _batches(items: AsyncIterator[T], size: int) -> AsyncIterator[List[T]]:
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@version(1)
+@router.get(
+    "/export",
+    summary="Export All Songs",
+    response_class=StreamingResponse,
+    response_description="The request was executed successfully. The response "
+    "contains all songs in the library.",
+    responses={
+        200: {
+            "content": {
+                export_media_types[schemas.SongExportFormat.ndjson]: {
+                    "schema": {"$ref": "#/components/schemas/Song"}
+                },
+                export_media_types[schemas.SongExportFormat.json]: {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/Song"},
+                    }
+                },
+            }
+        }
+    },
+)
+async def get_songs_export(
+    request: Request,
+    format: schemas.SongExportFormat = Query(
+        schemas.SongExportFormat.ndjson,
+        description="The format of the export. `ndjson` returns one song per line, "
+        "`json` returns a single array of songs.",
+    ),
+    database: Database = Depends(read_database),
+) -> StreamingResponse:
+    """
+    Exports the entire song library in a single response. The response is streamed
+    so clients can start processing songs before the export is complete. Use this
+    endpoint instead of paging through all songs.
+    """
+    return StreamingResponse(
+        export_songs(database, format, request.url_for("get_songs")),
+        media_type=export_media_types[format],
+    )
+
+
+@version(1)
+@router.get(
+    "/suggest",
+    summary="Suggest Songs",
+    response_model=List[schemas.Song],
+    response_description="The request was executed successfully. The songs are "
+    "ordered by similarity, best matches first.",
+)
+async def get_song_suggestions(
+    request: Request,
+    q: str = Query(
+        ...,
+        min_length=1,
+        description="The text entered by the user. Typos and incomplete words are "
+        "tolerated.",
+        example="luv the wa",
+    ),
+    limit: int = Query(10, ge=1, le=50, description="The maximum number of songs."),
+    database: Database = Depends(read_database),
+) -> Response:
+    """
+    Suggests songs whose title, artist or featured artists are similar to `q`. This
+    endpoint is meant for as-you-type suggestions. Use the `q` parameter of the song
+    list for a complete search.
+    """
+    ids = [id for id, _ in song_index.search(q, limit)]
+    if not ids:
+        return song_response([])
+    rows = await database.fetch_all(songs.select().where(songs.c.id.in_(ids)))
+    by_id = {row["id"]: row for row in rows}
+    rows = [by_id[id] for id in ids if id in by_id]
+    return song_response(song_serializer.to_dicts(rows, request.url_for("get_songs")))
+
+
+@version(1)
+@router.get(
+    "/batch",
+    summary="Get Multiple Songs",
+    response_model=schemas.SongBatch,
+    response_description="The request was executed successfully.",
+    responses={
+        HTTP_304_NOT_MODIFIED: {
+            "description": "None of the songs has changed since they were last "
+            "requested."
+        }
+    },
+)
+async def get_song_batch(
+    request: Request,
+    ids: List[int] = Query(
+        ...,
+        min_items=1,
+        max_items=batch_size_limit,
+        description="The IDs of the songs. Repeat the parameter for every ID.",
+        example=[123, 456],
+    ),
+    database: Database = Depends(read_database),
+) -> Response:
+    """
+    Returns the details of all songs with the specified IDs in the order of the IDs.
+    Use this endpoint instead of requesting every song of a playlist separately. IDs
+    without a song are listed as `missing`.
+
+    The response can be revalidated using `If-None-Match`.
+    """
+    rows = await database.fetch_all(songs.select().where(songs.c.id.in_(set(ids))))
+    by_id = {row["id"]: row for row in rows}
+    found = [by_id[id] for id in ids if id in by_id]
+    missing = [id for id in ids if id not in by_id]
+    # Like a page of the song list, the response is determined by its songs.
+    etag = make_etag(
+        *(f"{row['id']}:{row['revision']}" for row in found),
+        *(f"{id}:-" for id in missing),
+    )
+    headers = cache_headers(etag, None)
+    if is_not_modified(request, etag):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+    batch = {
+        "items": song_serializer.to_dicts(found, request.url_for("get_songs")),
+        "missing": missing,
+    }
+    return song_response(batch, headers)
 
 
 @version(1)
@@ -49,31 +425,305 @@ async def get_songs(
     summary="Get Song Details",
     response_model=schemas.Song,
     response_description="The request was executed successfully.",
+    responses={
+        HTTP_304_NOT_MODIFIED: {
+            "description": "The song has not changed since it was last requested."
+        }
+    },
 )
 async def get_song(
-    song_id: int = Path(..., alias="id", description="The ID of the song.", example=123)
-) -> schemas.Song:
-    """Returns the details of the song with ID `id`."""
-    raise NotImplementedError
+    request: Request,
+    song_id: int = Path(
+        ..., alias="id", description="The ID of the song.", example=123
+    ),
+    database: Database = Depends(read_database),
+) -> Response:
+    """
+    Returns the details of the song with ID `id`. The response can be revalidated
+    using `If-None-Match` or `If-Modified-Since`.
+    """
+    row = await database.fetch_one(songs.select().where(songs.c.id == song_id))
+    if row is None:
+        raise HTTPException(HTTP_404_NOT_FOUND, "Song not found.")
+    etag = f'"{row["id"]}-{row["revision"]}"'
+    headers = cache_headers(etag, row["updated_at"])
+    if is_not_modified(request, etag, row["updated_at"]):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+    song = song_serializer.to_dict(row, request.url_for("get_songs"))
+    return song_response(song, headers)
+
+
+async def song_media(
+    request: Request,
+    database: Database,
+    song_id: int,
+    kind: str,
+    size: Optional[schemas.ImageSize] = None,
+) -> MediaResponse:
+    """
+    Returns a ``MediaResponse`` for the media file of the specified ``kind``. If a
+    ``size`` is specified, a resized variant of the image is returned instead.
+    """
+    column = media_columns[kind]
+    row = await database.fetch_one(
+        sqlalchemy.select([songs.c.path, column]).where(songs.c.id == song_id)
+    )
+    if row is None:
+        raise HTTPException(HTTP_404_NOT_FOUND, "Song not found.")
+    path = song_media_path(row["path"], row[column.name])
+    try:
+        if path is None:
+            raise FileNotFoundError
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(HTTP_404_NOT_FOUND, f"The song has no {kind} file.")
+    if size is None or not thumbnails.available:
+        return MediaResponse(path, stat_result, request)
+    try:
+        thumbnail = await thumbnails.get(path, stat_result, thumbnail_sizes[size])
+        # The variant may have been evicted in the meantime.
+        thumbnail_stat = await run_in_threadpool(os.stat, thumbnail)
+    except (OSError, ThumbnailError) as e:
+        logger.warning("Could not resize %s: %s", path, e)
+        return MediaResponse(path, stat_result, request)
+    return MediaResponse(
+        thumbnail,
+        thumbnail_stat,
+        request,
+        headers={"Cache-Control": thumbnail_cache_control},
+    )
+
+
+media_responses: Dict[Union[int, str], Dict[str, Any]] = {
+    HTTP_206_PARTIAL_CONTENT: {
+        "description": "The requested range of the file is returned."
+    },
+    HTTP_304_NOT_MODIFIED: {
+        "description": "The file has not changed since it was last requested."
+    },
+    HTTP_404_NOT_FOUND: {
+        "description": "No song with the specified `id` was found or the song does "
+        "not have a file of the requested kind."
+    },
+    HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE: {
+        "description": "The requested range lies outside of the file."
+    },
+}
+
+
+@version(1)
+@detail_router.get(
+    "/{id}/audio",
+    status_code=HTTP_200_OK,
+    summary="Get Song Audio",
+    response_class=MediaResponse,
+    response_description="The request was executed successfully. The response "
+    "contains the entire audio file.",
+    responses=media_responses,
+)
+async def get_song_audio(
+    request: Request,
+    song_id: int = Path(
+        ..., alias="id", description="The ID of the song.", example=123
+    ),
+    database: Database = Depends(read_database),
+) -> MediaResponse:
+    """
+    Returns the audio file of the song with ID `id`. Use `Range` requests to seek
+    within the file.
+    """
+    return await song_media(request, database, song_id, "audio")
+
+
+@version(1)
+@detail_router.get(
+    "/{id}/video",
+    status_code=HTTP_200_OK,
+    summary="Get Song Video",
+    response_class=MediaResponse,
+    response_description="The request was executed successfully. The response "
+    "contains the entire video file.",
+    responses=media_responses,
+)
+async def get_song_video(
+    request: Request,
+    song_id: int = Path(
+        ..., alias="id", description="The ID of the song.", example=123
+    ),
+    database: Database = Depends(read_database),
+) -> MediaResponse:
+    """
+    Returns the video file of the song with ID `id`. Use `Range` requests to seek
+    within the file.
+    """
+    return await song_media(request, database, song_id, "video")
 
 
 @version(1)
 @detail_router.delete(
     "/{id}",
     summary="Delete A Song",
+    dependencies=[songs_scope],
     status_code=HTTP_204_NO_CONTENT,
     response_description="The song was deleted successfully.",
 )
 async def delete_song(
+    background_tasks: BackgroundTasks,
     song_id: int = Path(
         ...,
         alias="id",
         description="The ID of the song that should be " "deleted.",
         example=123,
-    )
-) -> None:
+    ),
+) -> Response:
     """Deletes a song from the Karman database."""
-    raise NotImplementedError
+    rows = await delete_songs([song_id])
+    if not rows:
+        raise HTTPException(HTTP_404_NOT_FOUND, "Song not found.")
+    background_tasks.add_task(discard_thumbnails, rows)
+    return Response(status_code=HTTP_204_NO_CONTENT)
+
+
+async def discard_thumbnails(rows: Sequence[Any]) -> None:
+    """
+    Deletes the thumbnails of the images of deleted songs. ``rows`` are the rows
+    returned by ``karman.library.delete_songs()``.
+    """
+    sources = [
+        path
+        for row in rows
+        for path in (
+            song_media_path(row["path"], row["cover_file"]),
+            song_media_path(row["path"], row["background_file"]),
+        )
+        if path is not None
+    ]
+    await thumbnails.discard(sources)
+
+
+@version(1)
+@router.post(
+    "/batch/delete",
+    summary="Delete Multiple Songs",
+    dependencies=[songs_scope],
+    response_model=schemas.SongBatchResult,
+    response_description="The request was executed successfully. The response "
+    "contains the status of every requested song.",
+)
+async def delete_song_batch(
+    batch: schemas.SongBatchDelete, background_tasks: BackgroundTasks
+) -> Response:
+    """
+    Deletes all songs with the specified IDs in a single transaction. Use this
+    endpoint instead of deleting many songs separately. IDs without a song are
+    reported as `not_found`.
+    """
+    rows = await delete_songs(batch.ids)
+    background_tasks.add_task(discard_thumbnails, rows)
+    deleted = {row["id"] for row in rows}
+    return batch_result(batch.ids, deleted, schemas.SongStatus.deleted)
+
+
+@version(1)
+@router.post(
+    "/batch/update",
+    summary="Update Multiple Songs",
+    dependencies=[songs_scope],
+    response_model=schemas.SongBatchResult,
+    response_description="The request was executed successfully. The response "
+    "contains the status of every requested song.",
+    responses={
+        HTTP_400_BAD_REQUEST: {
+            "description": "A song is listed multiple times or an item does not "
+            "change any field."
+        }
+    },
+)
+async def update_song_batch(batch: schemas.SongBatchUpdate) -> Response:
+    """
+    Changes the metadata of multiple songs in a single transaction, e.g. to fix the
+    genre, year or artist of many songs at once. Only the fields present in an item
+    are changed. IDs without a song are reported as `not_found`.
+    """
+    updates = [item.dict(exclude_unset=True) for item in batch.items]
+    ids = [update["id"] for update in updates]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(HTTP_400_BAD_REQUEST, "Every song may only be listed once.")
+    if any(len(update) == 1 for update in updates):
+        raise HTTPException(HTTP_400_BAD_REQUEST, "Every item must change a field.")
+    updated = set(await update_songs(updates))
+    return batch_result(ids, updated, schemas.SongStatus.updated)
+
+
+def batch_result(
+    ids: Sequence[int], found: Set[int], status: schemas.SongStatus
+) -> Response:
+    """
+    Returns the response of a bulk operation that applied ``status`` to the songs with
+    IDs in ``found``. All other ``ids`` are reported as not found.
+    """
+    items = [
+        {"id": id, "status": status if id in found else schemas.SongStatus.not_found}
+        for id in ids
+    ]
+    return song_response({"items": items})
+
+
+image_size_query = Query(
+    None,
+    description="Returns a resized variant of the image. If omitted the original "
+    "image is returned.",
+)
+
+
+@version(1)
+@detail_router.get(
+    "/{id}/artwork",
+    status_code=HTTP_200_OK,
+    summary="Get Song Artwork",
+    response_class=MediaResponse,
+    response_description="The request was executed successfully. The response "
+    "contains the artwork image.",
+    responses=media_responses,
+)
+async def get_song_artwork(
+    request: Request,
+    song_id: int = Path(
+        ..., alias="id", description="The ID of the song.", example=123
+    ),
+    size: Optional[schemas.ImageSize] = image_size_query,
+    database: Database = Depends(read_database),
+) -> MediaResponse:
+    """
+    Returns the artwork of the song with ID `id`. Use the `size` parameter to get a
+    smaller variant for previews.
+    """
+    return await song_media(request, database, song_id, "artwork", size)
+
+
+@version(1)
+@detail_router.get(
+    "/{id}/background",
+    status_code=HTTP_200_OK,
+    summary="Get Song Background",
+    response_class=MediaResponse,
+    response_description="The request was executed successfully. The response "
+    "contains the background image.",
+    responses=media_responses,
+)
+async def get_song_background(
+    request: Request,
+    song_id: int = Path(
+        ..., alias="id", description="The ID of the song.", example=123
+    ),
+    size: Optional[schemas.ImageSize] = image_size_query,
+    database: Database = Depends(read_database),
+) -> MediaResponse:
+    """
+    Returns the background image of the song with ID `id`. Use the `size` parameter
+    to get a smaller variant for previews.
+    """
+    return await song_media(request, database, song_id, "background", size)
 
 
 router.include_router(detail_router)
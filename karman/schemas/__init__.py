@@ -8,4 +8,18 @@ from .auth import (
     OAuth2TokenRequestForm,
     OAuth2TokenResponse,
 )
-from .song import Song, SongKind
+from .pagination import CursorPage
+from .rating import Rating
+from .song import (
+    ImageSize,
+    Song,
+    SongBatch,
+    SongBatchDelete,
+    SongBatchResult,
+    SongBatchUpdate,
+    SongExportFormat,
+    SongKind,
+    SongSort,
+    SongStatus,
+    SongUpdate,
+)
@@ -98,7 +98,11 @@ class OAuth2TokenRequestForm:
             description="The OAuth 2.0 grant type.",
             example=OAuth2GrantType.PASSWORD,
         ),
-        scope: str = Form("", description="The OAuth scopes that are being requested."),
+        scope: str = Form(
+            "",
+            description="The OAuth scopes that are being requested. Unknown scopes are "
+            "rejected. By default all scopes are requested.",
+        ),
         client_id: str = Form(
             None,
             description="Unique identifier of the client application.",
@@ -109,13 +113,13 @@ class OAuth2TokenRequestForm:
         ),
         # Password Flow
         username: Optional[str] = Form(
-            ...,
+            None,
             description="The username of the user that attempts to log in. Required if "
             "`grant_type` is `password`.",
             example="johndoe",
         ),
         password: Optional[str] = Form(
-            ...,
+            None,
             description="The plain text password of the user `username`. Required if "
             "`grant_type` is `password`.",
             example="hunter2",
@@ -144,7 +148,8 @@ class OAuth2TokenRequestForm:
         ),
     ):
         self.grant_type = grant_type
-        self.scopes = [Scope(v) for v in scope.split()]
+        self.scopes = [Scope(v) for v in scope.split() if v in Scope.all()]
+        self.unknown_scopes = [v for v in scope.split() if v not in Scope.all()]
         self.client_id = client_id
         self.client_secret = client_secret
         self.username = username
@@ -0,0 +1,28 @@
+__all__ = ["CursorPage"]
+
+from typing import Generic, Optional, Sequence, TypeVar
+
+from pydantic import Field
+from pydantic.generics import GenericModel
+
+from .base import BaseSchema
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseSchema, GenericModel, Generic[T]):
+    """
+    A single page of a listing that is paginated using opaque cursors.
+    """
+
+    items: Sequence[T] = Field(..., description="The items on this page.")
+    next: Optional[str] = Field(
+        None,
+        description="A cursor pointing to the next page or `null` if this is the last "
+        "page.",
+    )
+    prev: Optional[str] = Field(
+        None,
+        description="A cursor pointing to the previous page or `null` if this is the "
+        "first page.",
+    )
@@ -0,0 +1,21 @@
+__all__ = ["Rating"]
+
+from decimal import Decimal
+
+from pydantic import Field
+
+from .base import BaseSchema
+from .song import RatingType
+
+
+class Rating(BaseSchema):
+    """
+    The rating of a song by a single user.
+    """
+
+    rating: RatingType = Field(
+        ...,
+        description="The rating of the song, a decimal between `0` and `10` with at "
+        "most one decimal place.",
+        example=Decimal("8.5"),
+    )
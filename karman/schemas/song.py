@@ -1,10 +1,28 @@
-__all__ = ["Song", "SongKind"]
+__all__ = [
+    "ImageSize",
+    "Song",
+    "SongBatch",
+    "SongBatchDelete",
+    "SongBatchResult",
+    "SongBatchUpdate",
+    "SongExportFormat",
+    "SongKind",
+    "SongSort",
+    "SongStatus",
+    "SongUpdate",
+]
 
 from decimal import Decimal
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import ConstrainedDecimal, ConstrainedInt, Field, HttpUrl
+from pydantic import (
+    AnyHttpUrl,
+    ConstrainedDecimal,
+    ConstrainedInt,
+    Field,
+    root_validator,
+)
 
 from .base import BaseSchema
 
@@ -31,6 +49,35 @@ class SongKind(str, Enum):
     """UltraStar compatible songs."""
 
 
+class SongSort(str, Enum):
+    """Possible sort orders for song listings."""
+
+    title = "title"
+    artist = "artist"
+    year = "year"
+    id = "id"
+
+
+class SongExportFormat(str, Enum):
+    """Possible formats of a song library export."""
+
+    ndjson = "ndjson"
+    """Newline delimited JSON. Each line contains a single song."""
+    json = "json"
+    """A single JSON array containing all songs."""
+
+
+class ImageSize(str, Enum):
+    """Size variants of song images."""
+
+    small = "small"
+    """Fits into 128×128 pixels."""
+    medium = "medium"
+    """Fits into 256×256 pixels."""
+    large = "large"
+    """Fits into 512×512 pixels."""
+
+
 class Song(BaseSchema):
     """
     A `Song` represents a song in the Karman database.
@@ -86,28 +133,28 @@ class Song(BaseSchema):
         "notes.",
         example=True,
     )
-    artwork_url: Optional[HttpUrl] = Field(
+    artwork_url: Optional[AnyHttpUrl] = Field(
         None,
         title="Artwork URL",
         description="An URL pointing to the song's artwork or `null` if the song does "
         "not have one.",
         example="https://.../artwork",
     )
-    background_url: Optional[HttpUrl] = Field(
+    background_url: Optional[AnyHttpUrl] = Field(
         None,
         title="Background URL",
         description="An URL pointing to the song's background image or `null` if the "
         "song does not have one.",
         example="https://.../background",
     )
-    audio_url: Optional[HttpUrl] = Field(
+    audio_url: Optional[AnyHttpUrl] = Field(
         None,
         title="Audio URL",
         description="An URL pointing to the song's audio file or `null` if the song "
         "does not have one.",
         example="https://.../audio",
     )
-    video_url: Optional[HttpUrl] = Field(
+    video_url: Optional[AnyHttpUrl] = Field(
         None,
         title="Video URL",
         description="An URL pointing to the song's video file or `null` if the song "
@@ -121,3 +168,114 @@ class Song(BaseSchema):
         "`10`) or `null` if there are no ratings yet.",
         example=8.2,
     )
+
+
+class SongBatch(BaseSchema):
+    """
+    The result of looking up multiple songs by their IDs.
+    """
+
+    items: List[Song] = Field(
+        ...,
+        description="The songs that were found, in the order of the requested IDs. A "
+        "song that was requested multiple times is included multiple times.",
+    )
+    missing: List[int] = Field(
+        ...,
+        description="The requested IDs for which no song exists, in the order they "
+        "were requested.",
+        example=[456],
+    )
+
+
+class SongUpdate(BaseSchema):
+    """
+    Changes to the metadata of a single song. Only the fields that are present are
+    changed.
+    """
+
+    id: int = Field(
+        ..., title="ID", description="The ID of the song to update.", example=123
+    )
+    title: str = Field(None, description="The new title of the song.", max_length=255)
+    artist: str = Field(
+        None, description="The new (main) artist of the song.", max_length=255
+    )
+    featured_artists: List[str] = Field(
+        None,
+        title="Featured Artists",
+        description="The new list of featured artists of the song.",
+    )
+    year: Optional[NonZeroInt] = Field(
+        None, description="The new release year of the song.", example=2010
+    )
+    genre: Optional[str] = Field(
+        None, description="The new genre of the song.", max_length=255, example="Pop"
+    )
+
+    @root_validator(pre=True)
+    def not_null(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        # The fields may be omitted but their columns are not nullable. Defaults are
+        # validated in debug mode so a field validator cannot tell them apart.
+        for name in ("title", "artist", "featured_artists"):
+            alias = cls.__fields__[name].alias
+            if values.get(alias, values.get(name, ...)) is None:
+                raise ValueError(f"{alias} must not be null")
+        return values
+
+
+class SongBatchUpdate(BaseSchema):
+    """
+    Changes to the metadata of multiple songs.
+    """
+
+    items: List[SongUpdate] = Field(
+        ...,
+        description="The changes. Every song may only be listed once.",
+        min_items=1,
+        max_items=10000,
+    )
+
+
+class SongBatchDelete(BaseSchema):
+    """
+    The IDs of songs to delete.
+    """
+
+    ids: List[int] = Field(
+        ...,
+        description="The IDs of the songs to delete.",
+        min_items=1,
+        max_items=10000,
+        example=[123, 456],
+    )
+
+
+class SongStatus(str, Enum):
+    """The outcome of a bulk operation for a single song."""
+
+    updated = "updated"
+    """The song was updated."""
+    deleted = "deleted"
+    """The song was deleted."""
+    not_found = "not_found"
+    """No song with the requested ID exists."""
+
+
+class SongResult(BaseSchema):
+    """
+    The outcome of a bulk operation for a single song.
+    """
+
+    id: int = Field(..., title="ID", description="The ID of the song.", example=123)
+    status: SongStatus = Field(..., description="What happened to the song.")
+
+
+class SongBatchResult(BaseSchema):
+    """
+    The outcome of a bulk operation.
+    """
+
+    items: List[SongResult] = Field(
+        ..., description="The outcome for every requested song, in request order."
+    )
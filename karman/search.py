@@ -0,0 +1,93 @@
+__all__ = ["search_songs"]
+
+import re
+from typing import List, Tuple
+
+import sqlalchemy
+from databases import Database
+from sqlalchemy.sql import ColumnElement, Select
+
+from karman import models
+from karman.models.song_search import POSTGRES_SEARCH_COLUMN, SQLITE_SEARCH_TABLE
+
+_TOKEN = re.compile(r"\w+")
+songs = models.Song.Meta.table
+
+
+def _sqlite_query(tokens: List[str]) -> Select:
+    # Every token is matched as a prefix so that incomplete words produce results.
+    match = " ".join(f'"{token}"*' for token in tokens)
+    fts = sqlalchemy.table(SQLITE_SEARCH_TABLE, sqlalchemy.column("rowid"))
+    # Matches in the title weigh more than matches in the artists. BM25 scores are
+    # negative with the best matches having the lowest score.
+    rank = sqlalchemy.func.bm25(
+        sqlalchemy.literal_column(SQLITE_SEARCH_TABLE),
+        sqlalchemy.literal_column("10.0"),
+        sqlalchemy.literal_column("5.0"),
+        sqlalchemy.literal_column("2.0"),
+    )
+    return (
+        sqlalchemy.select([songs, rank.label("rank")])
+        .select_from(songs.join(fts, fts.c.rowid == songs.c.id))
+        .where(sqlalchemy.literal_column(SQLITE_SEARCH_TABLE).op("MATCH")(match))
+    )
+
+
+def _postgres_query(tokens: List[str]) -> Select:
+    match = " & ".join(f"{token}:*" for token in tokens)
+    vector = sqlalchemy.literal_column(f"songs.{POSTGRES_SEARCH_COLUMN}")
+    query = sqlalchemy.func.to_tsquery(
+        sqlalchemy.literal_column("'simple'::regconfig"), match
+    )
+    # The rank is negated so that the best matches come first in ascending order.
+    rank = -sqlalchemy.func.ts_rank(vector, query)
+    return sqlalchemy.select([songs, rank.label("rank")]).where(vector.op("@@")(query))
+
+
+def _fallback_query(tokens: List[str]) -> Select:
+    # Without a full text index songs can only be filtered, not ranked.
+    columns = [songs.c.title, songs.c.artist, songs.c.featured_artists]
+    conditions = [
+        sqlalchemy.or_(
+            *(
+                sqlalchemy.cast(column, sqlalchemy.String).contains(
+                    token, autoescape=True
+                )
+                for column in columns
+            )
+        )
+        for token in tokens
+    ]
+    return sqlalchemy.select([songs, songs.c.title.label("rank")]).where(*conditions)
+
+
+def search_songs(
+    database: Database, q: str
+) -> Tuple[Select, ColumnElement, sqlalchemy.Column]:
+    """
+    Creates a query that searches songs by title, artist and featured artists.
+
+    SQLite databases use an FTS5 index, PostgreSQL databases use a ``tsvector`` column
+    with a GIN index. Both rank the results by relevance. Other databases fall back to
+    a ``LIKE`` search ordered by title.
+
+    :param database: The database in which the query will be executed.
+    :param q: The search string entered by the user. Every word is matched as a
+              prefix and all words must match.
+    :return: A tuple consisting of the query, its sort key and its ID column. The
+             query can be paginated using ``karman.pagination.paginate()``.
+    """
+    tokens = _TOKEN.findall(q)
+    if not tokens:
+        # Nothing that could be matched.
+        query = sqlalchemy.select([songs, songs.c.id.label("rank")]).where(
+            sqlalchemy.false()
+        )
+    elif database.url.dialect == "sqlite":
+        query = _sqlite_query(tokens)
+    elif database.url.dialect in ("postgres", "postgresql"):
+        query = _postgres_query(tokens)
+    else:
+        query = _fallback_query(tokens)
+    results = query.subquery("results")
+    return sqlalchemy.select([results]), results.c.rank, results.c.id
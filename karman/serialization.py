@@ -0,0 +1,166 @@
+"""
+Serialization of database rows without pydantic.
+
+Building pydantic models for every row of a response is expensive even with validation
+disabled. A ``RowSerializer`` maps the fields of a schema to the columns of a result
+row once and then converts rows directly into dictionaries that are encoded with
+orjson. In debug mode a sample of the serialized objects is validated against the
+schema.
+"""
+
+__all__ = ["RowSerializer", "dumps"]
+
+import random
+from decimal import Decimal
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
+
+import orjson
+from pydantic import BaseModel
+
+from karman.config import settings
+
+C = TypeVar("C")
+Row = Sequence[Any]
+
+
+def _default(value: Any) -> Any:
+    # Decimals are encoded as numbers just like pydantic does.
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encodes ``value`` as JSON. In addition to the types supported by orjson,
+    ``Decimal`` values are encoded as numbers.
+    """
+    return orjson.dumps(value, default=_default)
+
+
+class _Plan(NamedTuple):
+    template: Dict[str, Any]
+    aliases: Tuple[str, ...]
+    getter: Callable[[Row], Tuple[Any, ...]]
+
+
+class RowSerializer(Generic[C]):
+    """
+    Converts result rows into JSON-compatible dictionaries matching ``schema``.
+
+    Fields are looked up in the row by their name. Fields in ``computed`` are
+    calculated from the row and a context value (e.g. the base URL of a request).
+    Fields that are neither in the row nor computed get their default value. The keys
+    of the dictionaries are ordered like the fields of the schema.
+
+    The mapping between row positions and aliases is compiled once for every distinct
+    set of row columns.
+
+    :param schema: The schema whose JSON representation is produced.
+    :param computed: Functions calculating the values of fields from a row and a
+                     context value.
+    :param sample_size: The number of objects per call that are validated against
+                        the schema in debug mode.
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        computed: Optional[Mapping[str, Callable[[Any, C], Any]]] = None,
+        sample_size: int = 3,
+    ) -> None:
+        self.schema = schema
+        self.computed = [
+            (schema.__fields__[name].alias, function)
+            for name, function in (computed or {}).items()
+        ]
+        self.sample_size = sample_size if settings.debug else 0
+        self._plans: Dict[Tuple[str, ...], _Plan] = {}
+
+    def _plan(self, keys: Tuple[str, ...]) -> _Plan:
+        plan = self._plans.get(keys)
+        if plan is not None:
+            return plan
+        computed = {alias for alias, _ in self.computed}
+        # The template contains every field in order. Values from the row replace the
+        # defaults without changing the order.
+        template, aliases, positions = {}, [], []
+        for name, field in self.schema.__fields__.items():
+            template[field.alias] = None if field.alias in computed else field.default
+            if name in keys and field.alias not in computed:
+                aliases.append(field.alias)
+                positions.append(keys.index(name))
+        plan = _Plan(template, tuple(aliases), _getter(positions))
+        self._plans[keys] = plan
+        return plan
+
+    def to_dicts(
+        self, rows: Iterable[Any], context: Optional[C] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Converts SQLAlchemy ``rows`` into dictionaries with the schema's aliases as
+        keys. All rows must have the same columns.
+        """
+        results = []
+        plan = None
+        for row in rows:
+            if plan is None:
+                plan = self._plan(tuple(row.keys()))
+            result = plan.template.copy()
+            result.update(zip(plan.aliases, plan.getter(row)))
+            for alias, function in self.computed:
+                # The context is only omitted if the functions do not need it.
+                result[alias] = function(row, cast(C, context))
+            results.append(result)
+        self.check(results)
+        return results
+
+    def to_dict(self, row: Any, context: Optional[C] = None) -> Dict[str, Any]:
+        """
+        Converts a single row into a dictionary. See ``to_dicts()``.
+        """
+        return self.to_dicts((row,), context)[0]
+
+    def check(self, results: Sequence[Dict[str, Any]]) -> None:
+        """
+        Validates a random sample of ``results`` against the schema. This only
+        happens in debug mode.
+
+        :raises pydantic.ValidationError: If a result is invalid.
+        :raises AssertionError: If a result is not serialized like the schema would.
+        """
+        if not self.sample_size or not results:
+            return
+        for result in random.sample(results, min(self.sample_size, len(results))):
+            expected = orjson.loads(self.schema.parse_obj(result).json(by_alias=True))
+            actual = orjson.loads(dumps(result))
+            if actual != expected:
+                raise AssertionError(
+                    f"Serialized {self.schema.__name__} does not match the schema: "
+                    f"{actual!r} != {expected!r}"
+                )
+
+
+def _getter(positions: Sequence[int]) -> Callable[[Row], Tuple[Any, ...]]:
+    if not positions:
+        return lambda row: ()
+    if len(positions) == 1:
+        position = positions[0]
+        return lambda row: (row[position],)
+    return itemgetter(*positions)
@@ -0,0 +1,50 @@
+__all__ = ["Signal", "songs_changed"]
+
+import inspect
+from typing import Any, Awaitable, Callable, List, Union
+
+Receiver = Callable[..., Union[None, Awaitable[None]]]
+
+
+class Signal:
+    """
+    A minimal signal implementation that allows in-memory caches and indexes to react
+    to changes in the database. Receivers can be regular functions or coroutine
+    functions.
+    """
+
+    __slots__ = ("receivers",)
+
+    def __init__(self) -> None:
+        self.receivers: List[Receiver] = []
+
+    def connect(self, receiver: Receiver) -> Receiver:
+        """
+        Registers ``receiver`` to be called when the signal is sent. This method can
+        be used as a decorator.
+        """
+        self.receivers.append(receiver)
+        return receiver
+
+    def disconnect(self, receiver: Receiver) -> None:
+        """
+        Removes a previously connected ``receiver``.
+        """
+        self.receivers.remove(receiver)
+
+    async def send(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Calls all receivers with the specified arguments.
+        """
+        for receiver in self.receivers:
+            result = receiver(*args, **kwargs)
+            if inspect.isawaitable(result):
+                await result
+
+
+songs_changed = Signal()
+"""
+Sent after songs were added, modified or deleted. Receivers get the IDs of the
+affected songs as single argument. The signal is only sent in the process that made
+the changes and only after the changes have been committed.
+"""
@@ -0,0 +1,173 @@
+__all__ = ["TrigramIndex", "song_index", "build_song_index"]
+
+import heapq
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Collection, Dict, List, Set, Tuple
+
+import sqlalchemy
+from databases import Database
+
+from karman import models
+from karman.signals import songs_changed
+
+_NON_ALPHANUMERIC = re.compile(r"[^\w]+")
+songs = models.Song.Meta.table
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Returns the set of trigrams of ``text``. The text is normalized by removing
+    accents, case and punctuation. Each word is padded with two leading spaces and
+    one trailing space so that short prefixes produce trigrams as well.
+
+    >>> sorted(trigrams("Hé!"))
+    ['  h', ' he', 'he ']
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    result: Set[str] = set()
+    for word in _NON_ALPHANUMERIC.sub(" ", stripped.casefold()).split():
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class TrigramIndex:
+    """
+    An in-memory index that finds documents by trigram similarity. The index is
+    tolerant to typos and incomplete words which makes it suitable for as-you-type
+    suggestions.
+
+    Documents are identified by integer IDs and stored in dense slots. Postings are
+    compact ``array`` instances containing slot numbers. Removing a document only
+    marks its slot as free. The postings are compacted once a quarter of all slots is
+    unused.
+    """
+
+    __slots__ = ("_postings", "_ids", "_sizes", "_slots")
+
+    #: The minimum fraction of query trigrams that a document must contain.
+    min_coverage = 0.3
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, array] = {}
+        self._ids = array("q")  # slot -> document ID or -1 if the slot is unused
+        self._sizes = array("H")  # slot -> number of trigrams of the document
+        self._slots: Dict[int, int] = {}  # document ID -> slot
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._slots
+
+    def add(self, id: int, *texts: str) -> None:
+        """
+        Adds or replaces the document ``id`` consisting of the specified ``texts``.
+        """
+        self.remove(id)
+        grams = trigrams(" ".join(texts))
+        slot = len(self._ids)
+        self._slots[id] = slot
+        self._ids.append(id)
+        self._sizes.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                self._postings[gram] = array("I", (slot,))
+            else:
+                postings.append(slot)
+
+    def remove(self, id: int) -> None:
+        """
+        Removes the document ``id`` from the index if it exists.
+        """
+        slot = self._slots.pop(id, None)
+        if slot is None:
+            return
+        self._ids[slot] = -1
+        if len(self._ids) - len(self._slots) > max(len(self._ids) // 4, 1024):
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Removes unused slots from the postings.
+        """
+        remap = array("q", (-1 for _ in self._ids))
+        ids = array("q")
+        sizes = array("H")
+        for slot, id in enumerate(self._ids):
+            if id >= 0:
+                remap[slot] = len(ids)
+                self._slots[id] = len(ids)
+                ids.append(id)
+                sizes.append(self._sizes[slot])
+        postings = {}
+        for gram, slots in self._postings.items():
+            compacted = array("I", (remap[s] for s in slots if remap[s] >= 0))
+            if compacted:
+                postings[gram] = compacted
+        self._postings, self._ids, self._sizes = postings, ids, sizes
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Finds the documents most similar to ``query``.
+
+        Documents are ranked by the fraction of query trigrams they contain. Ties are
+        broken in favor of documents with fewer trigrams.
+
+        :return: A list of at most ``limit`` tuples of document IDs and scores between
+                 ``0`` and ``1``, best matches first.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        counts: Counter = Counter()
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                counts.update(postings)
+        threshold = self.min_coverage * len(grams)
+        candidates = (
+            (shared / len(grams), shared / self._sizes[slot], self._ids[slot])
+            for slot, shared in counts.items()
+            if shared >= threshold and self._ids[slot] >= 0
+        )
+        return [(id, score) for score, _, id in heapq.nlargest(limit, candidates)]
+
+
+song_index = TrigramIndex()
+"""The suggestion index for all songs in the library."""
+
+
+def _add_song(row: sqlalchemy.engine.Row) -> None:
+    # The featured_artists column is nullable.
+    featured_artists = row["featured_artists"] or ()
+    song_index.add(row["id"], row["title"], row["artist"], *featured_artists)
+
+
+async def build_song_index(database: Database) -> None:
+    """
+    Adds all songs in ``database`` to the ``song_index``.
+    """
+    query = sqlalchemy.select(
+        [songs.c.id, songs.c.title, songs.c.artist, songs.c.featured_artists]
+    )
+    async for row in database.iterate(query):
+        _add_song(row)
+
+
+@songs_changed.connect
+async def update_song_index(song_ids: Collection[int]) -> None:
+    query = sqlalchemy.select(
+        [songs.c.id, songs.c.title, songs.c.artist, songs.c.featured_artists]
+    ).where(songs.c.id.in_(song_ids))
+    removed = set(song_ids)
+    for row in await models.database.fetch_all(query):
+        _add_song(row)
+        removed.discard(row["id"])
+    for id in removed:
+        song_index.remove(id)
@@ -0,0 +1,271 @@
+"""
+Resized variants of song images.
+
+Variants are rendered in worker processes and stored in a content-addressed disk cache.
+Variants of identical images are shared between songs. The cache has a maximum size
+and deletes the least recently used variants when it grows larger. The modification
+time of a variant is updated whenever it is used, so that several processes can share
+the same cache directory.
+
+Resizing requires the optional ``Pillow`` dependency. Without it
+``ThumbnailCache.available`` is ``False``.
+"""
+
+__all__ = ["ThumbnailCache", "ThumbnailError", "thumbnail_sizes", "thumbnails"]
+
+import asyncio
+import hashlib
+import importlib.util
+import io
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Collection, Dict, Iterable, List, Optional, Tuple, Union
+
+from karman.config import settings
+from karman.schemas import ImageSize
+
+logger = logging.getLogger("karman.thumbnails")
+
+# Pillow is only imported by the worker processes.
+_pillow_available = importlib.util.find_spec("PIL") is not None
+
+thumbnail_sizes: Dict[ImageSize, int] = {
+    ImageSize.small: 128,
+    ImageSize.medium: 256,
+    ImageSize.large: 512,
+}
+"""The maximum width and height of each size variant in pixels."""
+
+_VariantKey = Tuple[str, int, int, int]
+
+
+class ThumbnailError(Exception):
+    """
+    Raised if an image cannot be resized.
+    """
+
+
+def _touch(path: str) -> bool:
+    # Marks a variant as recently used. Returns whether the variant exists, it may have
+    # been evicted by another process.
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _render(source: str, size: int, directory: str) -> Tuple[str, int]:
+    # Runs in a worker process. The variant is named after the hash of the source
+    # image so that it is only rendered once for identical images. Returns the path of
+    # the variant and the number of bytes added to the cache.
+    with open(source, "rb") as file:
+        data = file.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    path = os.path.join(directory, digest[:2], f"{digest}-{size}.jpg")
+    if _touch(path):
+        return path, 0
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    # Lets the JPEG decoder skip pixels that would be discarded anyway.
+    image.draft("RGB", (size, size))
+    image.thumbnail((size, size), Image.LANCZOS)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    image.convert("RGB").save(temp, "JPEG", quality=85, optimize=True)
+    os.replace(temp, path)
+    return path, os.path.getsize(path)
+
+
+def _scan(directory: str) -> List[Tuple[str, int, float]]:
+    # Returns the path, size and modification time of all cached variants.
+    entries = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(".jpg"):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+    return entries
+
+
+def _delete(paths: Iterable[str]) -> int:
+    # Returns the number of deleted bytes.
+    deleted = 0
+    for path in paths:
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except FileNotFoundError:
+            continue
+        deleted += size
+    return deleted
+
+
+def _evict(directory: str, max_size: int, keep: str) -> Tuple[int, int]:
+    # Deletes the least recently used variants except keep until the cache is not
+    # larger than max_size. Returns the remaining size and the number of deleted
+    # variants.
+    entries = sorted(_scan(directory), key=lambda entry: entry[2])
+    size = sum(file_size for _, file_size, _ in entries)
+    victims = []
+    for path, file_size, _ in entries:
+        if size <= max_size:
+            break
+        if path != keep:
+            victims.append(path)
+            size -= file_size
+    _delete(victims)
+    return size, len(victims)
+
+
+class ThumbnailCache:
+    """
+    A disk cache of resized images with a maximum size.
+
+    The cache estimates its size in memory and scans its directory when the estimate
+    exceeds the maximum size. The scan deletes the variants with the oldest
+    modification times, so variants used by other processes sharing the directory
+    are kept as well. The paths of recently used variants are remembered so that
+    their source images are not read again.
+
+    :param directory: The directory in which the variants are stored.
+    :param max_size: The maximum total size of all variants in bytes.
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+    :param max_variants: The maximum number of remembered variant paths.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, "os.PathLike[str]"],
+        max_size: int,
+        workers: Optional[int] = None,
+        max_variants: int = 10000,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.workers = workers
+        self.max_variants = max_variants
+        self._size = 0
+        self._variants: "OrderedDict[_VariantKey, str]" = OrderedDict()
+        self._pending: Dict[_VariantKey, "asyncio.Future[str]"] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._loaded = False
+
+    @property
+    def available(self) -> bool:
+        """Whether images can be resized."""
+        return _pillow_available
+
+    @property
+    def size(self) -> int:
+        """
+        The estimated total size of all cached variants in bytes. It is exact after
+        the directory has been scanned and does not include variants added by other
+        processes since.
+        """
+        return self._size
+
+    async def get(self, source: str, stat_result: os.stat_result, size: int) -> str:
+        """
+        Returns the path of a variant of the image at ``source`` that fits into a
+        square of ``size`` pixels. The variant is rendered if it does not exist yet.
+        Concurrent requests for the same variant share a single rendering.
+
+        :raises ThumbnailError: If the source image cannot be read or resized.
+        """
+        key = (source, stat_result.st_mtime_ns, stat_result.st_size, size)
+        path = self._variants.get(key)
+        if path is not None:
+            if await asyncio.get_running_loop().run_in_executor(None, _touch, path):
+                if key in self._variants:
+                    self._variants.move_to_end(key)
+                return path
+            self._variants.pop(key, None)
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._create(key))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _create(self, key: _VariantKey) -> str:
+        loop = asyncio.get_running_loop()
+        if not self._loaded:
+            self._loaded = True
+            entries = await loop.run_in_executor(None, _scan, str(self.directory))
+            self._size = sum(file_size for _, file_size, _ in entries)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        source, _, _, size = key
+        try:
+            path, file_size = await loop.run_in_executor(
+                self._executor, _render, source, size, str(self.directory)
+            )
+        except BrokenProcessPool as e:
+            # A worker died, e.g. because it ran out of memory. The pool cannot be used
+            # anymore and is replaced by the next request.
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            raise ThumbnailError(
+                f"A worker process died while resizing {source}"
+            ) from e
+        except Exception as e:
+            # Pillow is not imported in this process so its errors, e.g. decompression
+            # bombs, cannot be caught individually.
+            raise ThumbnailError(f"Could not resize {source}: {e}") from e
+        self._variants[key] = path
+        while len(self._variants) > self.max_variants:
+            self._variants.popitem(last=False)
+        self._size += file_size
+        if self._size > self.max_size:
+            # The new variant is never evicted because it is about to be sent to a
+            # client.
+            self._size, evicted = await loop.run_in_executor(
+                None, _evict, str(self.directory), self.max_size, path
+            )
+            logger.debug("Evicted %d thumbnails", evicted)
+        return path
+
+    async def discard(self, sources: Collection[str]) -> None:
+        """
+        Deletes the variants of the images at ``sources``, e.g. because their songs
+        were deleted. Variants that are shared with other images are kept. Only
+        variants recently used by this process are known, others are eventually
+        evicted.
+        """
+        sources = set(sources)
+        shared = {path for key, path in self._variants.items() if key[0] not in sources}
+        victims = set()
+        for key in [key for key in self._variants if key[0] in sources]:
+            path = self._variants.pop(key)
+            if path not in shared:
+                victims.add(path)
+        if victims:
+            logger.debug("Discarding %d thumbnails", len(victims))
+            deleted = await asyncio.get_running_loop().run_in_executor(
+                None, _delete, victims
+            )
+            self._size = max(self._size - deleted, 0)
+
+    def close(self) -> None:
+        """
+        Shuts down the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+thumbnails = ThumbnailCache(
+    settings.thumbnail_dir, settings.thumbnail_cache_size, settings.thumbnail_workers
+)
+"""The thumbnail cache for song images."""
@@ -0,0 +1,201 @@
+__all__ = ["UltraStarError", "UltraStarSong", "parse", "parse_file"]
+
+import re
+from decimal import Decimal
+from itertools import chain
+from os import PathLike
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+_BOM = b"\xef\xbb\xbf"
+_HEADER = ord("#")
+_LINE_BREAK = ord("-")
+_PLAYER = ord("P")
+_END = ord("E")
+_NOTES = frozenset(b":*FRG")
+_GOLDEN_NOTES = frozenset(b"*G")
+_FEATURING = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s+", re.IGNORECASE)
+_ARTIST_SEPARATOR = re.compile(r"\s*(?:,|&)\s*")
+_MILLISECONDS = Decimal(1000)
+_DURATION_PLACES = Decimal("0.001")
+
+
+class UltraStarError(ValueError):
+    """Raised if a file is not a valid UltraStar song."""
+
+
+class UltraStarSong(NamedTuple):
+    """
+    The metadata of an UltraStar song. The field names match the fields of the
+    ``Song`` model and schema where possible.
+    """
+
+    title: str
+    artist: str
+    featured_artists: List[str]
+    year: Optional[int]
+    genre: Optional[str]
+    players: int
+    duration: Optional[Decimal]
+    """The duration in seconds up to the end of the last note or the ``#END`` tag."""
+    golden_notes: bool
+    audio: Optional[str]
+    """The file name of the audio file (``#MP3`` or ``#AUDIO``)."""
+    video: Optional[str]
+    cover: Optional[str]
+    background: Optional[str]
+    headers: Dict[str, str]
+    """All header tags of the song with upper case names and without the ``#``."""
+
+
+def _decode(value: bytes) -> str:
+    # UltraStar files are either UTF-8 or one of the legacy Windows encodings. This
+    # is only called for header values so the fallback is cheap.
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value.decode("cp1252", errors="replace")
+
+
+def _number(value: str) -> Decimal:
+    # Numbers in UltraStar files may use a comma as decimal separator.
+    return Decimal(value.replace(",", ".").strip())
+
+
+def _note_end(line: bytes) -> int:
+    # A note line looks like ": <start> <length> <pitch> <text>".
+    try:
+        _, start, length = line.split(maxsplit=3)[:3]
+        return int(start) + int(length)
+    except ValueError as e:
+        raise UltraStarError(f"Invalid note: {_decode(line)}") from e
+
+
+def _split_artist(artist: str) -> Tuple[str, List[str]]:
+    main, *featured = _FEATURING.split(artist, maxsplit=1)
+    if not featured:
+        return artist, []
+    return main, [name for name in _ARTIST_SEPARATOR.split(featured[0]) if name]
+
+
+def _header(line: bytes) -> Tuple[str, str]:
+    # A header line looks like "#<TAG>:<value>".
+    tag, _, value = line[1:].partition(b":")
+    return tag.strip().upper().decode("ascii", errors="replace"), _decode(value.strip())
+
+
+def _section_end(last_note: Optional[bytes], offset: int, end: int) -> int:
+    return end if last_note is None else max(end, offset + _note_end(last_note))
+
+
+def _line_break_offset(line: bytes) -> int:
+    # In relative mode a line break looks like "- <end> <offset>" or "- <offset>".
+    try:
+        return int(line[1:].split()[-1])
+    except (ValueError, IndexError) as e:
+        raise UltraStarError(f"Invalid line break: {_decode(line)}") from e
+
+
+def _scan(lines: Iterable[bytes]) -> Tuple[Dict[str, str], bool, int, int]:
+    """
+    Scans the lines of a song and returns its headers, whether it contains golden
+    notes, the number of players and the beat at which the last note ends.
+    """
+    headers: Dict[str, str] = {}
+    relative = False
+    golden_notes = False
+    players = 1
+    offset = 0
+    end = 0
+    last_note: Optional[bytes] = None
+
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        kind = line[0]
+        if kind in _NOTES:
+            golden_notes = golden_notes or kind in _GOLDEN_NOTES
+            last_note = line
+        elif kind == _LINE_BREAK and relative:
+            end = _section_end(last_note, offset, end)
+            last_note = None
+            offset += _line_break_offset(line)
+        elif kind == _HEADER:
+            name, value = _header(line)
+            headers[name] = value
+            relative = relative or (name == "RELATIVE" and value.upper() == "YES")
+        elif kind == _PLAYER:
+            # Duets have a separate section per player that starts at beat 0.
+            end = _section_end(last_note, offset, end)
+            last_note = None
+            offset = 0
+            players = max(players, 1 if line[1:].strip() in (b"", b"1") else 2)
+        elif kind == _END:
+            break
+    return headers, golden_notes, players, _section_end(last_note, offset, end)
+
+
+def _duration(headers: Dict[str, str], bpm: Decimal, end: int) -> Optional[Decimal]:
+    try:
+        if "END" in headers:
+            duration = _number(headers["END"]) / _MILLISECONDS
+        elif bpm > 0 and end > 0:
+            gap = _number(headers.get("GAP", "0"))
+            duration = gap / _MILLISECONDS + end * 60 / (bpm * 4)
+        else:
+            return None
+        return duration.quantize(_DURATION_PLACES) if duration > 0 else None
+    except ArithmeticError as e:
+        raise UltraStarError("Invalid #GAP or #END value") from e
+
+
+def parse(lines: Iterable[bytes]) -> UltraStarSong:
+    """
+    Parses an UltraStar song in a single pass over ``lines``.
+
+    Notes are never materialized. Golden notes are detected by the note type and only
+    the last note of each player's section is split to compute the duration of the
+    song. Line breaks are only parsed for songs that use relative beats.
+
+    :param lines: The raw lines of the song, for example an open file in binary mode.
+    :raises UltraStarError: If ``lines`` does not contain a valid song.
+    """
+    iterator = iter(lines)
+    first_line = next(iterator, b"").removeprefix(_BOM)
+    headers, golden_notes, players, end = _scan(chain((first_line,), iterator))
+
+    try:
+        title = headers["TITLE"]
+        artist, featured_artists = _split_artist(headers["ARTIST"])
+        bpm = _number(headers["BPM"])
+    except KeyError as e:
+        raise UltraStarError(f"Missing required tag #{e.args[0]}") from e
+    except ArithmeticError as e:
+        raise UltraStarError(f"Invalid BPM: {headers['BPM']}") from e
+    if "P2" in headers or "DUETSINGERP2" in headers:
+        players = 2
+
+    year = headers.get("YEAR", "").strip()
+    return UltraStarSong(
+        title=title,
+        artist=artist,
+        featured_artists=featured_artists,
+        year=int(year) if year.isdecimal() and int(year) > 0 else None,
+        genre=headers.get("GENRE") or None,
+        players=players,
+        duration=_duration(headers, bpm, end),
+        golden_notes=golden_notes,
+        audio=headers.get("AUDIO") or headers.get("MP3") or None,
+        video=headers.get("VIDEO") or None,
+        cover=headers.get("COVER") or None,
+        background=headers.get("BACKGROUND") or None,
+        headers=headers,
+    )
+
+
+def parse_file(path: Union[str, "PathLike[str]"]) -> UltraStarSong:
+    """
+    Parses the UltraStar file at ``path``. See ``parse()`` for details.
+    """
+    with open(path, "rb") as file:
+        return parse(file)
@@ -1 +1,3 @@
-from .openapi import remove_body_schemas
+from .conditional import cache_headers, is_not_modified, make_etag
+from .media import MediaResponse, parse_range
+from .openapi import OpenAPIDocument, remove_body_schemas, serve_openapi
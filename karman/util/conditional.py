@@ -0,0 +1,63 @@
+__all__ = ["make_etag", "cache_headers", "is_not_modified"]
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from starlette.requests import Request
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Creates a strong entity tag from the string representations of ``parts``. Equal
+    parts always produce the same tag.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    """
+    Returns the ``ETag`` and ``Last-Modified`` headers for a response. Naive
+    datetimes are interpreted as UTC.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        timestamp = last_modified.replace(tzinfo=last_modified.tzinfo or timezone.utc)
+        headers["Last-Modified"] = formatdate(timestamp.timestamp(), usegmt=True)
+    return headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Evaluates the ``If-None-Match`` and ``If-Modified-Since`` headers of ``request``
+    as described in RFC 7232. ``If-Modified-Since`` is ignored if the request
+    contains an ``If-None-Match`` header or if ``last_modified`` is ``None``.
+
+    :return: ``True`` if the client's cached representation is still current and a
+             ``304 Not Modified`` response can be sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses the weak comparison function.
+        tags = (tag.strip() for tag in if_none_match.split(","))
+        return any(
+            tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag
+            for tag in tags
+        )
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    timestamp = last_modified.replace(tzinfo=last_modified.tzinfo or timezone.utc)
+    # HTTP dates have a resolution of one second.
+    return int(timestamp.timestamp()) <= since.timestamp()
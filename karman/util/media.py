@@ -0,0 +1,171 @@
+__all__ = ["MediaResponse", "parse_range"]
+
+import mimetypes
+import os
+from datetime import datetime, timezone
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_206_PARTIAL_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+)
+from starlette.types import Receive, Scope, Send
+
+from .conditional import cache_headers, is_not_modified, make_etag
+
+ZERO_COPY_SEND = "http.response.zerocopysend"
+"""The ASGI extension that allows sending files using ``sendfile``."""
+
+
+def parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses the value of a ``Range`` header for a file of ``size`` bytes.
+
+    Only single byte ranges are supported. Requests for multiple ranges are answered
+    with the entire file which is permitted by RFC 7233.
+
+    :return: The start (inclusive) and end (exclusive) offset of the range or ``None``
+             if the header is invalid or unsupported and should be ignored.
+    :raises ValueError: If the range cannot be satisfied.
+    """
+    unit, _, spec = value.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if (
+        not sep
+        or not (first.isdigit() or not first)
+        or not (last.isdigit() or not last)
+    ):
+        return None
+    if not first:
+        # A suffix range requests the last bytes of the file.
+        if not last:
+            return None
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(size - suffix, 0), size
+    start = int(first)
+    end = int(last) + 1 if last else size
+    if start >= end and last:
+        return None
+    if start >= size:
+        raise ValueError("range starts after the end of the file")
+    return start, min(end, size)
+
+
+class MediaResponse(Response):
+    """
+    Sends (a range of) a file. The response supports conditional requests using
+    ``If-None-Match`` and ``If-Modified-Since`` as well as partial requests using
+    ``Range`` and ``If-Range``.
+
+    If the ASGI server supports the zero copy send extension, the file is sent using
+    ``sendfile``. Otherwise it is read and sent in chunks of ``chunk_size`` bytes so
+    that memory usage does not depend on the size of the file.
+    """
+
+    media_type = "application/octet-stream"
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        request: Request,
+        media_type: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.path = path
+        self.media_type = media_type or mimetypes.guess_type(path)[0] or self.media_type
+        self.background = None
+        size = stat_result.st_size
+        etag = make_etag(size, stat_result.st_mtime_ns)
+        last_modified = datetime.fromtimestamp(int(stat_result.st_mtime), timezone.utc)
+        headers = {
+            **(headers or {}),
+            "Accept-Ranges": "bytes",
+            **cache_headers(etag, last_modified),
+        }
+        self.status_code = HTTP_200_OK
+        self.offset, self.count = 0, size
+
+        byte_range = None
+        if is_not_modified(request, etag, last_modified):
+            self.status_code, self.count = HTTP_304_NOT_MODIFIED, 0
+        elif "range" in request.headers and self._if_range(request, headers):
+            try:
+                byte_range = parse_range(request.headers["range"], size)
+            except ValueError:
+                self.status_code = HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+                self.count = 0
+                headers["Content-Range"] = f"bytes */{size}"
+        if byte_range is not None:
+            start, end = byte_range
+            self.status_code = HTTP_206_PARTIAL_CONTENT
+            self.offset, self.count = start, end - start
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        if self.status_code != HTTP_304_NOT_MODIFIED:
+            headers["Content-Length"] = str(self.count)
+        self.init_headers(headers)
+
+    @staticmethod
+    def _if_range(request: Request, headers: dict) -> bool:
+        # A range is only sent if the client's partial copy is current. If-Range uses
+        # the strong comparison function.
+        if_range = request.headers.get("if-range")
+        return if_range is None or if_range.strip() in (
+            headers["ETag"],
+            headers.get("Last-Modified"),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if self.count == 0 or scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+        elif ZERO_COPY_SEND in scope.get("extensions", {}):
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+            with file:
+                await send(
+                    {
+                        "type": ZERO_COPY_SEND,
+                        "file": file,
+                        "offset": self.offset,
+                        "count": self.count,
+                    }
+                )
+        else:
+            await self._send_chunks(send)
+
+    async def _send_chunks(self, send: Send) -> None:
+        remaining = self.count
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.offset)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    # The file was truncated while it was being sent.
+                    break
+                remaining -= len(chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    }
+                )
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b""})
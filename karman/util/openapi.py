@@ -1,9 +1,38 @@
-__all__ = ["remove_body_schemas"]
+__all__ = ["remove_body_schemas", "OpenAPIDocument", "serve_openapi"]
 
-from typing import Any, Dict
+import gzip
+import hashlib
+from typing import Any, Dict, Optional
 
+import orjson
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from .conditional import is_not_modified
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+form_content_types = ["multipart/form-data", "application/x-www-form-urlencoded"]
+
+
+def _inline_body_schemas(openapi_schema: Dict[str, Any]) -> None:
+    schemas = openapi_schema.get("components", {}).get("schemas", {})
+    for path in openapi_schema["paths"].values():
+        for method_data in path.values():
+            if "requestBody" not in method_data:
+                continue
+            for content_type, content in method_data["requestBody"]["content"].items():
+                if content_type in form_content_types:
+                    schema_name = content["schema"]["$ref"].lstrip(
+                        "#/components/schemas/"
+                    )
+                    content["schema"] = schemas.pop(schema_name)
 
 
 def remove_body_schemas(app: FastAPI) -> None:
@@ -33,24 +62,112 @@ def remove_body_schemas(app: FastAPI) -> None:
         )
         # Move autogenerated Body_ schemas.
         # See https://github.com/tiangolo/fastapi/issues/1442
-        for path in openapi_schema["paths"].values():
-            for method_data in path.values():
-                if "requestBody" in method_data:
-                    for content_type, content in method_data["requestBody"][
-                        "content"
-                    ].items():
-                        if content_type in [
-                            "multipart/form-data",
-                            "application/x-www-form-urlencoded",
-                        ]:
-                            schema_name = content["schema"]["$ref"].lstrip(
-                                "#/components/schemas/"
-                            )
-                            schema_data = openapi_schema["components"]["schemas"].pop(
-                                schema_name
-                            )
-                            content["schema"] = schema_data
+        _inline_body_schemas(openapi_schema)
         app.openapi_schema = openapi_schema
         return app.openapi_schema
 
     app.openapi = custom_openapi  # type: ignore
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    encodings = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[coding.strip().lower()] = quality
+    return encodings
+
+
+class OpenAPIDocument:
+    """
+    The OpenAPI document of an app, serialized and compressed once.
+
+    FastAPI generates the document on the first request but encodes it as JSON again
+    for every request. An ``OpenAPIDocument`` keeps the encoded document as bytes
+    together with a gzip variant (and a brotli variant if the ``brotli`` package is
+    installed) so that requests only need to pick a variant. Every variant has its
+    own strong ``ETag``.
+
+    The document is built by ``prepare()``, which should be called at startup. If it
+    has not been called, the document is built on the first request.
+
+    :param app: The app whose ``openapi()`` method produces the document.
+    """
+
+    def __init__(self, app: FastAPI) -> None:
+        self.app = app
+        self.variants: Optional[Dict[str, bytes]] = None
+        self.etags: Dict[str, str] = {}
+
+    def prepare(self) -> None:
+        """
+        Generates, serializes and compresses the document. Calling this method again
+        rebuilds the document from the current schema of the app.
+        """
+        body = orjson.dumps(self.app.openapi())
+        variants = {"identity": body, "gzip": gzip.compress(body, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, mode=brotli.MODE_TEXT)
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.etags = {
+            encoding: f'"{digest}"'
+            if encoding == "identity"
+            else f'"{digest}-{encoding}"'
+            for encoding in variants
+        }
+        self.variants = variants
+
+    def encoding(self, request: Request) -> str:
+        """
+        Selects the best available content coding for ``request`` based on its
+        ``Accept-Encoding`` header. Brotli is preferred over gzip.
+        """
+        assert self.variants is not None
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding in ("br", "gzip"):
+            quality = accepted.get(encoding, accepted.get("*", 0.0))
+            if encoding in self.variants and quality > 0:
+                return encoding
+        return "identity"
+
+    async def endpoint(self, request: Request) -> Response:
+        if self.variants is None:
+            self.prepare()
+        assert self.variants is not None
+        encoding = self.encoding(request)
+        headers = {"ETag": self.etags[encoding], "Vary": "Accept-Encoding"}
+        if is_not_modified(request, self.etags[encoding]):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(
+            self.variants[encoding], media_type="application/json", headers=headers
+        )
+
+
+def serve_openapi(app: FastAPI) -> OpenAPIDocument:
+    """
+    Replaces the OpenAPI endpoint of ``app`` with a precomputed ``OpenAPIDocument``.
+    The interactive documentation of the app uses the same URL and is not affected.
+
+    :return: The document served by the app. Call its ``prepare()`` method to build
+             it before the first request.
+    """
+    assert app.openapi_url, "The app does not serve an OpenAPI document."
+    document = OpenAPIDocument(app)
+    route = Route(
+        app.openapi_url, document.endpoint, include_in_schema=False, name="openapi"
+    )
+    app.router.routes = [
+        route
+        if isinstance(existing, Route) and existing.path == app.openapi_url
+        else existing
+        for existing in app.router.routes
+    ]
+    return document
@@ -33,6 +33,20 @@ def version(
 def strict_version_selector(
     major: int, minor: Optional[int] = None
 ) -> Callable[[BaseRoute], Optional[BaseRoute]]:
+    """
+    Creates a selector for ``select_routes()`` that selects all routes available in a
+    specific API version.
+
+    Selected routes share their internals (dependencies, response fields and the
+    request handler) with the original route. Routes are only copied if the version
+    overrides their ``deprecated`` flag. The copy is shallow so attributes other than
+    ``deprecated`` must not be modified on selected routes.
+
+    :param major: The major API version.
+    :param minor: The minor API version. If omitted, the latest minor version of a
+                  route is selected.
+    """
+
     def selector(route: BaseRoute) -> Optional[BaseRoute]:
         api_route = cast(APIRoute, route)
         versions: Dict[Tuple[int, int], bool] = getattr(
@@ -43,10 +57,11 @@ def strict_version_selector(
                 continue
             if minor is not None and minor != route_minor:
                 continue
-            new_route = copy.deepcopy(api_route)
             deprecated = versions[(route_major, route_minor)]
-            if deprecated is not None:
-                new_route.deprecated = deprecated
+            if deprecated is None or deprecated == api_route.deprecated:
+                return api_route
+            new_route = copy.copy(api_route)
+            new_route.deprecated = deprecated
             return new_route
         return None
 
@@ -2,12 +2,31 @@ from alembic import context
 from sqlalchemy import create_engine, pool
 
 from karman import models
-from karman.config import settings
+from karman.config import configure_logging, settings
+
+configure_logging()
 
 # Load our MetaData for autogenerate support.
 target_metadata = models.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Excludes objects from autogenerate that Alembic cannot reflect correctly: the
+    dialect specific full text search objects and expression indexes. They are
+    managed manually in the migrations.
+    """
+    if name is not None and name.startswith(models.SQLITE_SEARCH_TABLE):
+        return False
+    if name in (
+        "ix_songs_year_id",
+        models.POSTGRES_SEARCH_COLUMN,
+        f"ix_songs_{models.POSTGRES_SEARCH_COLUMN}",
+    ):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -28,6 +47,7 @@ def run_migrations_offline():
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -48,6 +68,7 @@ def run_migrations_online():
             target_metadata=target_metadata,
             compare_type=True,
             compare_server_default=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
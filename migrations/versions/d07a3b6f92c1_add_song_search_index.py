@@ -0,0 +1,95 @@
+"""add song search index
+
+Revision ID: d07a3b6f92c1
+Revises: a51f0c9e7b24
+Create Date: 2026-10-17 14:03:27.880412
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d07a3b6f92c1"
+down_revision = "a51f0c9e7b24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The search index depends on the database dialect and cannot be autogenerated.
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE songs_fts USING fts5(
+                title, artist, featured_artists,
+                content='songs', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER songs_fts_insert AFTER INSERT ON songs
+            BEGIN
+                INSERT INTO songs_fts(rowid, title, artist, featured_artists)
+                VALUES (new.id, new.title, new.artist, new.featured_artists);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER songs_fts_delete AFTER DELETE ON songs
+            BEGIN
+                INSERT INTO songs_fts(
+                    songs_fts, rowid, title, artist, featured_artists
+                ) VALUES (
+                    'delete', old.id, old.title, old.artist, old.featured_artists
+                );
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER songs_fts_update
+            AFTER UPDATE OF title, artist, featured_artists ON songs
+            BEGIN
+                INSERT INTO songs_fts(
+                    songs_fts, rowid, title, artist, featured_artists
+                ) VALUES (
+                    'delete', old.id, old.title, old.artist, old.featured_artists
+                );
+                INSERT INTO songs_fts(rowid, title, artist, featured_artists)
+                VALUES (new.id, new.title, new.artist, new.featured_artists);
+            END
+            """
+        )
+        op.execute("INSERT INTO songs_fts(songs_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        op.execute(
+            """
+            ALTER TABLE songs ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', title), 'A')
+                || setweight(to_tsvector('simple', artist), 'B')
+                || setweight(
+                    to_tsvector('simple', coalesce(featured_artists::text, '')),
+                    'C'
+                )
+            ) STORED
+            """
+        )
+        op.execute(
+            "CREATE INDEX ix_songs_search_vector ON songs USING gin (search_vector)"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TRIGGER songs_fts_update")
+        op.execute("DROP TRIGGER songs_fts_delete")
+        op.execute("DROP TRIGGER songs_fts_insert")
+        op.execute("DROP TABLE songs_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX ix_songs_search_vector")
+        op.execute("ALTER TABLE songs DROP COLUMN search_vector")
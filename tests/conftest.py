@@ -0,0 +1,47 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+# The settings are read when karman is first imported so the test database must be
+# configured before that happens.
+_db_dir = tempfile.TemporaryDirectory()
+os.environ.setdefault(
+    "KARMAN_DB_URL", f"sqlite:///{Path(_db_dir.name) / 'test.sqlite'}"
+)
+
+import sqlalchemy  # noqa: E402
+
+from karman import models  # noqa: E402
+from karman.config import settings  # noqa: E402
+from karman.main import app  # noqa: E402
+from karman.oauth import Scope, tokens  # noqa: E402
+from karman.routes.songs import song_list_cache  # noqa: E402
+
+
+@pytest.fixture
+def db() -> Iterator[sqlalchemy.engine.Engine]:
+    """
+    Creates all tables in the test database and drops them after the test.
+    """
+    engine = sqlalchemy.create_engine(settings.db_url)
+    models.metadata.create_all(engine)
+    yield engine
+    models.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(db: sqlalchemy.engine.Engine) -> Iterator[TestClient]:
+    """
+    Returns a client for the API that is connected to the test database. The client
+    is authenticated as ``alice`` with all scopes.
+    """
+    song_list_cache.clear()
+    with TestClient(app) as client:
+        token = tokens.issue("alice", set(Scope))
+        client.headers["Authorization"] = f"Bearer {token}"
+        yield client
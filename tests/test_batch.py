@@ -0,0 +1,134 @@
+import sqlalchemy
+from fastapi.testclient import TestClient
+
+from karman import models
+from karman.models.song import song_revision
+from karman.oauth import Scope, tokens
+
+songs = models.Song.Meta.table
+
+
+def test_get_song_batch(db: sqlalchemy.engine.Engine, client: TestClient) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [
+                {"title": "Diamonds", "artist": "Rihanna"},
+                {"title": "Hello", "artist": "Adele"},
+                {"title": "Toxic", "artist": "Britney Spears"},
+            ],
+        )
+
+    response = client.get("/v1/songs/batch?ids=3&ids=7&ids=1&ids=3")
+    assert response.status_code == 200
+    batch = response.json()
+    assert [song["id"] for song in batch["items"]] == [3, 1, 3]
+    assert batch["items"][1]["title"] == "Diamonds"
+    assert batch["missing"] == [7]
+
+    etag = response.headers["ETag"]
+    response = client.get(
+        "/v1/songs/batch?ids=3&ids=7&ids=1&ids=3", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    with db.begin() as connection:
+        connection.execute(
+            songs.update().where(songs.c.id == 1).values(song_revision())
+        )
+    response = client.get(
+        "/v1/songs/batch?ids=3&ids=7&ids=1&ids=3", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    assert client.get("/v1/songs/batch").status_code == 422
+    ids = "&".join(f"ids={id}" for id in range(501))
+    assert client.get(f"/v1/songs/batch?{ids}").status_code == 422
+
+
+def test_delete_song_batch(db: sqlalchemy.engine.Engine, client: TestClient) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [{"title": "Diamonds", "artist": "Rihanna"}, {"title": "B", "artist": "C"}],
+        )
+
+    response = client.post("/v1/songs/batch/delete", json={"ids": [2, 3, 2]})
+    assert response.status_code == 200
+    assert response.json()["items"] == [
+        {"id": 2, "status": "deleted"},
+        {"id": 3, "status": "not_found"},
+        {"id": 2, "status": "deleted"},
+    ]
+    assert client.get("/v1/songs/2").status_code == 404
+    assert client.get("/v1/songs/1").status_code == 200
+    assert client.delete("/v1/songs/1").status_code == 204
+    assert client.delete("/v1/songs/1").status_code == 404
+
+
+def test_update_song_batch(db: sqlalchemy.engine.Engine, client: TestClient) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [
+                {"title": "Diamonds", "artist": "Rihanna", "year": None},
+                {"title": "Hello", "artist": "Adele", "year": None},
+                {"title": "Toxic", "artist": "Britney", "year": 2003},
+            ],
+        )
+
+    response = client.post(
+        "/v1/songs/batch/update",
+        json={
+            "items": [
+                {"id": 1, "genre": "R&B", "year": 2012},
+                {"id": 4, "genre": "R&B"},
+                {"id": 2, "genre": "R&B", "year": 2012},
+                {"id": 3, "artist": "Britney Spears", "year": None},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["items"]] == [
+        "updated",
+        "not_found",
+        "updated",
+        "updated",
+    ]
+    rows = {row["id"]: row for row in db.execute(songs.select())}
+    assert (rows[1]["genre"], rows[1]["year"], rows[1]["revision"]) == ("R&B", 2012, 2)
+    assert (rows[2]["genre"], rows[2]["title"]) == ("R&B", "Hello")
+    assert (rows[3]["artist"], rows[3]["year"]) == ("Britney Spears", None)
+
+    duplicate = {"items": [{"id": 1, "genre": "Pop"}, {"id": 1, "genre": "Rock"}]}
+    assert client.post("/v1/songs/batch/update", json=duplicate).status_code == 400
+    empty = {"items": [{"id": 1}]}
+    assert client.post("/v1/songs/batch/update", json=empty).status_code == 400
+
+
+def test_update_song_batch_null(
+    db: sqlalchemy.engine.Engine, client: TestClient
+) -> None:
+    with db.begin() as connection:
+        connection.execute(songs.insert(), {"title": "Diamonds", "artist": "Rihanna"})
+
+    for field in ("title", "artist", "featuredArtists"):
+        batch = {"items": [{"id": 1, field: None}]}
+        response = client.post("/v1/songs/batch/update", json=batch)
+        assert response.status_code == 422
+    row = db.execute(songs.select()).first()
+    assert (row["title"], row["artist"], row["revision"]) == ("Diamonds", "Rihanna", 1)
+    # Nullable fields can be cleared.
+    batch = {"items": [{"id": 1, "genre": None, "year": None}]}
+    assert client.post("/v1/songs/batch/update", json=batch).status_code == 200
+
+
+def test_song_changes_require_scope(client: TestClient) -> None:
+    del client.headers["Authorization"]
+    assert client.delete("/v1/songs/1").status_code == 401
+    batch = {"ids": [1]}
+    assert client.post("/v1/songs/batch/delete", json=batch).status_code == 401
+    token = tokens.issue("alice", [Scope.READ_SONGS])
+    client.headers["Authorization"] = f"Bearer {token}"
+    assert client.post("/v1/songs/batch/delete", json=batch).status_code == 403
+    # Reading songs does not require a token.
+    assert client.get("/v1/songs/").status_code == 200
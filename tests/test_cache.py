@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from karman.cache import ResponseCache
+from karman.replicas import PIN_COOKIE
+
+
+def test_response_cache() -> None:
+    now = 0.0
+    cache = ResponseCache(max_size=10, ttl=5, clock=lambda: now)
+    cache.put("a", b"aaaa", {}, cache.generation)
+    cache.put("b", b"bbbb", {}, cache.generation)
+    entry = cache.get("a")
+    assert entry is not None
+    assert entry.body == b"aaaa"
+    # b is the least recently used entry.
+    cache.put("c", b"cccc", {}, cache.generation)
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    cache.put("big", b"x" * 11, {}, cache.generation)
+    assert cache.get("big") is None
+
+    now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats == (2, 3, 1, 1, 4)
+
+    generation = cache.generation
+    cache.clear()
+    assert cache.cleared_at == 5.0
+    cache.put("a", b"aaaa", {}, generation)
+    assert cache.get("a") is None
+    assert cache.stats.entries == 0
+
+
+def test_song_list_cache(client: TestClient) -> None:
+    assert client.get("/v1/songs/").headers["X-Cache"] == "MISS"
+    assert client.get("/v1/songs/").headers["X-Cache"] == "HIT"
+    # Clients that recently wrote data bypass the cache.
+    response = client.get("/v1/songs/", cookies={PIN_COOKIE: "1"})
+    assert response.headers["X-Cache"] == "MISS"
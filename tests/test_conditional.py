@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import sqlalchemy
+from fastapi.testclient import TestClient
+
+from karman import models
+from karman.models.song import song_revision
+
+songs = models.Song.Meta.table
+
+
+def test_get_song(db: sqlalchemy.engine.Engine, client: TestClient) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            {
+                "title": "Diamonds",
+                "artist": "Rihanna",
+                "updated_at": datetime(2021, 1, 1),
+            },
+        )
+
+    response = client.get("/v1/songs/1")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Last-Modified"] == "Fri, 01 Jan 2021 00:00:00 GMT"
+
+    response = client.get("/v1/songs/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    response = client.get(
+        "/v1/songs/1", headers={"If-Modified-Since": "Fri, 01 Jan 2021 00:00:00 GMT"}
+    )
+    assert response.status_code == 304
+    response = client.get(
+        "/v1/songs/1", headers={"If-Modified-Since": "Thu, 31 Dec 2020 23:59:59 GMT"}
+    )
+    assert response.status_code == 200
+
+    with db.begin() as connection:
+        connection.execute(songs.update().values(genre="Pop").values(song_revision()))
+    response = client.get("/v1/songs/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert client.get("/v1/songs/2").status_code == 404
+
+
+def test_get_songs(db: sqlalchemy.engine.Engine, client: TestClient) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [{"title": "Diamonds", "artist": "Rihanna"}, {"title": "B", "artist": "C"}],
+        )
+
+    etag = client.get("/v1/songs/").headers["ETag"]
+    response = client.get("/v1/songs/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = client.get("/v1/songs/?sort=artist", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    assert client.delete("/v1/songs/2").status_code == 204
+    response = client.get("/v1/songs/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [song["title"] for song in response.json()["items"]] == ["Diamonds"]
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+import sqlalchemy
+
+from karman.config import settings
+from karman.instrumentation import InstrumentedDatabase
+from karman.models import base
+
+
+def test_database_options(monkeypatch: pytest.MonkeyPatch) -> None:
+    pool_settings = settings.copy(
+        update={
+            "db_pool_min_size": 2,
+            "db_pool_max_size": 20,
+            "db_connect_timeout": 5.0,
+            "db_statement_cache_size": 0,
+            "db_pool_recycle": 300.0,
+        }
+    )
+    monkeypatch.setattr(base, "settings", pool_settings)
+    assert base.database_options("postgresql://karman@localhost/karman") == {
+        "min_size": 2,
+        "max_size": 20,
+        "timeout": 5.0,
+        "statement_cache_size": 0,
+        "max_inactive_connection_lifetime": 300.0,
+    }
+    assert base.database_options("mysql://karman@localhost/karman") == {
+        "min_size": 2,
+        "max_size": 20,
+        "connect_timeout": 5.0,
+        "pool_recycle": 300,
+    }
+    assert base.database_options("sqlite:///db.sqlite") == {"cached_statements": 0}
+
+
+def test_warm_up(db: sqlalchemy.engine.Engine) -> None:
+    database = InstrumentedDatabase(settings.db_url)
+
+    async def run() -> None:
+        await base.warm_up(database)
+        assert database.is_connected
+        await database.disconnect()
+
+    asyncio.run(run())
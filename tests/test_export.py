@@ -0,0 +1,51 @@
+import json
+
+import pytest
+import sqlalchemy
+from fastapi.testclient import TestClient
+
+from karman import models
+from karman.routes.songs import export_batch_size
+
+songs = models.Song.Meta.table
+
+
+@pytest.fixture
+def song_count(db: sqlalchemy.engine.Engine) -> int:
+    # More songs than fit into a single batch with a partial last batch.
+    count = export_batch_size * 2 + 3
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [{"title": f"Song {i}", "artist": "Artist"} for i in range(count)],
+        )
+    return count
+
+
+def test_export_ndjson(client: TestClient, song_count: int) -> None:
+    response = client.get("/v1/songs/export")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert response.text.endswith("}\n")
+    lines = response.text.splitlines()
+    assert len(lines) == song_count
+    items = [json.loads(line) for line in lines]
+    assert [item["id"] for item in items] == list(range(1, song_count + 1))
+    assert items[0]["title"] == "Song 0"
+    assert items[0]["featuredArtists"] == []
+
+
+def test_export_json(client: TestClient, song_count: int) -> None:
+    response = client.get("/v1/songs/export", params={"format": "json"})
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/json"
+    items = response.json()
+    assert [item["id"] for item in items] == list(range(1, song_count + 1))
+    assert items[-1]["title"] == f"Song {song_count - 1}"
+
+
+@pytest.mark.parametrize("format, content", [("ndjson", ""), ("json", "[]")])
+def test_export_empty(client: TestClient, format: str, content: str) -> None:
+    response = client.get("/v1/songs/export", params={"format": format})
+    assert response.status_code == 200
+    assert response.text == content
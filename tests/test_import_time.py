@@ -0,0 +1,43 @@
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+# The maximum time in seconds it may take to import the app in a fresh interpreter.
+# The import currently takes about 0.4 seconds. The budget leaves room for slower
+# machines but catches accidental imports of large dependencies.
+IMPORT_BUDGET = 1.0
+
+
+def import_times(module: str) -> Dict[str, float]:
+    """
+    Imports ``module`` in a fresh interpreter with ``-X importtime`` and returns the
+    cumulative import time of every imported module in seconds.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+def test_import_budget() -> None:
+    times = import_times("karman.main")
+    assert times["karman.main"] < IMPORT_BUDGET
+    # Logging and image processing are configured and imported on demand.
+    for module in ["PIL", "yaml", "uvicorn", "karman.logging"]:
+        assert module not in times
+
+
+@pytest.mark.parametrize("module", ["karman.config", "karman.models"])
+def test_no_app_import(module: str) -> None:
+    assert "karman.main" not in import_times(module)
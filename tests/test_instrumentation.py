@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from typing import Any, Iterator, List
+
+import pytest
+import sqlalchemy
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from karman import models
+from karman.config import settings
+from karman.instrumentation import (
+    InstrumentedDatabase,
+    RequestMiddleware,
+    RequestStats,
+    current_request,
+    request_finished,
+)
+
+songs = models.Song.Meta.table
+
+
+@pytest.fixture
+def requests() -> Iterator[List[RequestStats]]:
+    finished: List[RequestStats] = []
+    request_finished.connect(finished.append)
+    yield finished
+    request_finished.disconnect(finished.append)
+
+
+def test_request_stats(client: TestClient, requests: List[RequestStats]) -> None:
+    response = client.get("/v1/songs/?limit=5")
+    assert response.status_code == 200
+    (stats,) = requests
+    assert stats.method == "GET"
+    assert stats.path == "/v1/songs/"
+    assert stats.route == "/v1/songs/"
+    assert stats.api_version == "1.0"
+    assert stats.response_size == len(response.content)
+    assert stats.db_queries >= 1
+    assert 0 < stats.db_time < stats.duration
+
+    client.get("/v1/songs/17")
+    assert requests[1].route == "/v1/songs/{id}"
+    assert requests[1].status_code == 404
+
+    client.get("/v1/unknown")
+    assert requests[2].route is None
+    assert requests[2].status_code == 404
+
+
+def test_server_timing() -> None:
+    async def endpoint(request: Request) -> Response:
+        stats = current_request.get()
+        assert stats is not None
+        stats.add_query(0.002)
+        return Response("")
+
+    app = Starlette(routes=[Route("/", endpoint)])
+    app.add_middleware(RequestMiddleware, server_timing=True)
+    response = TestClient(app).get("/")
+    app_timing, db_timing = response.headers["Server-Timing"].split(", ")
+    assert app_timing.startswith("app;dur=")
+    assert db_timing == 'db;dur=2.000;desc="1 queries"'
+
+
+def test_slow_query_log(
+    db: sqlalchemy.engine.Engine, caplog: pytest.LogCaptureFixture
+) -> None:
+    database = InstrumentedDatabase(settings.db_url, slow_query_threshold=0)
+
+    async def run() -> None:
+        async with database:
+            await database.fetch_all(songs.select().where(songs.c.id.in_([1, 2])))
+
+    with caplog.at_level(logging.WARNING, "karman.db"):
+        asyncio.run(run())
+    (record,) = caplog.records
+    assert record.sql.startswith("SELECT")  # type: ignore
+    assert record.params == {"id_1_1": 1, "id_1_2": 2}  # type: ignore
+    assert "songs" in record.plan  # type: ignore
+    assert "EXPLAIN failed" not in record.plan  # type: ignore
+
+
+def test_slow_query_log_in_transaction(
+    db: sqlalchemy.engine.Engine, caplog: pytest.LogCaptureFixture
+) -> None:
+    database = InstrumentedDatabase(settings.db_url, slow_query_threshold=0)
+    title = "x" * 1000
+
+    async def run() -> List[Any]:
+        async with database:
+            async with database.transaction(force_rollback=True):
+                await database.execute(songs.insert().values(title=title, artist="A"))
+                return await database.fetch_all(sqlalchemy.select([songs.c.title]))
+
+    with caplog.at_level(logging.WARNING, "karman.db"):
+        rows = asyncio.run(run())
+    # The EXPLAIN statements ran on other connections and did not affect the
+    # transaction.
+    assert [row["title"] for row in rows] == [title]
+    assert all("EXPLAIN failed" not in r.plan for r in caplog.records)  # type: ignore
+    params = caplog.records[0].params  # type: ignore
+    assert params["title"] == f"{'x' * 100}... (1000 characters)"
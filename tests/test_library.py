@@ -0,0 +1,78 @@
+import asyncio
+from pathlib import Path
+
+import sqlalchemy
+
+from karman import models
+from karman.library import ImportResult, delete_songs, import_songs
+
+
+def write_song(path: Path, title: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"#TITLE:{title}\n#ARTIST:Artist\n#BPM:100\n: 0 4 1 la\nE\n")
+
+
+def run_import(root: Path) -> ImportResult:
+    async def run() -> ImportResult:
+        async with models.database:
+            return await import_songs(root, workers=1)
+
+    return asyncio.run(run())
+
+
+def test_incremental_import(db: sqlalchemy.engine.Engine, tmp_path: Path) -> None:
+    for i in range(5):
+        write_song(tmp_path / f"Song {i}" / "song.txt", f"Song {i}")
+    (tmp_path / "broken.txt").write_text("#TITLE:Broken\n")
+
+    result = run_import(tmp_path)
+    assert (result.added, result.updated, result.removed) == (5, 0, 0)
+    assert result.failed == 1
+
+    # Files that could not be imported are not parsed again until they change.
+    result = run_import(tmp_path)
+    assert (result.added, result.updated, result.removed) == (0, 0, 0)
+    assert (result.unchanged, result.failed) == (6, 0)
+
+    write_song(tmp_path / "Song 0" / "song.txt", "Renamed")
+    (tmp_path / "Song 1" / "song.txt").unlink()
+    (tmp_path / "Song 1").rmdir()
+    write_song(tmp_path / "broken.txt", "Fixed")
+    (tmp_path / "Song 2" / "song.txt").write_text("#TITLE:Song 2\n")
+    result = run_import(tmp_path)
+    assert (result.added, result.updated, result.removed) == (1, 1, 1)
+    assert result.failed == 1
+
+    songs = models.Song.Meta.table
+    song_files = models.SongFile.Meta.table
+    with db.connect() as connection:
+        titles = connection.execute(sqlalchemy.select([songs.c.title])).scalars()
+        # A song keeps its metadata if its file cannot be parsed anymore.
+        assert sorted(titles) == ["Fixed", "Renamed", "Song 2", "Song 3", "Song 4"]
+        files = connection.execute(song_files.select()).fetchall()
+        assert len(files) == 5
+        assert all(file["song_id"] is not None for file in files)
+
+    (tmp_path / "broken.txt").unlink()
+    (tmp_path / "Song 2" / "song.txt").unlink()
+    result = run_import(tmp_path)
+    assert (result.added, result.updated, result.removed) == (0, 0, 2)
+
+
+def test_deleted_songs_are_not_imported_again(
+    db: sqlalchemy.engine.Engine, tmp_path: Path
+) -> None:
+    write_song(tmp_path / "Song" / "song.txt", "Song")
+    assert run_import(tmp_path).added == 1
+
+    async def delete() -> None:
+        async with models.database:
+            await delete_songs([1])
+
+    asyncio.run(delete())
+    result = run_import(tmp_path)
+    assert (result.added, result.unchanged) == (0, 1)
+
+    # Changed files are imported again.
+    write_song(tmp_path / "Song" / "song.txt", "Changed")
+    assert run_import(tmp_path).added == 1
@@ -0,0 +1,97 @@
+import logging
+import threading
+from typing import List
+
+import orjson
+
+from karman.logging import (
+    AccessFormatter,
+    ColorFormatter,
+    JSONFormatter,
+    QueueHandler,
+    start_queue_listeners,
+)
+
+
+def access_record() -> logging.LogRecord:
+    return logging.LogRecord(
+        "uvicorn.access",
+        logging.INFO,
+        __file__,
+        1,
+        '%s - "%s %s HTTP/%s" %d',
+        ("127.0.0.1:5000", "GET", "/v1/songs", "1.1", 404),
+        None,
+    )
+
+
+def test_formatters_without_colors() -> None:
+    formatter = ColorFormatter("%(levelname)s %(message)s", use_colors=False)
+    record = logging.LogRecord("karman", logging.INFO, __file__, 1, "Hi", None, None)
+    assert formatter.format(record) == "INFO Hi"
+
+    formatter = AccessFormatter(
+        "%(method)s %(full_path)s -> %(status_code)s %(status_phrase)s",
+        use_colors=False,
+    )
+    record = access_record()
+    assert formatter.format(record) == "GET /v1/songs -> 404 Not Found"
+    assert "status_code" not in record.__dict__
+
+
+def test_formatters_with_colors() -> None:
+    formatter = AccessFormatter(
+        "%(status_code)s",
+        use_colors=True,
+        colors={"status_code": {"status": True}},
+    )
+    record = access_record()
+    assert formatter.format(record) == "\x1b[31m404\x1b[0m"
+    # Colors are only applied to a copy of the record.
+    assert "status_code" not in record.__dict__
+
+
+def test_json_formatter() -> None:
+    record = logging.LogRecord(
+        "karman.access", logging.INFO, __file__, 1, "GET %s", ("/v1/songs",), None
+    )
+    record.duration_ms = 1.5
+    record.route = "/v1/songs/"
+    data = orjson.loads(JSONFormatter().format(record))
+    assert data["level"] == "INFO"
+    assert data["logger"] == "karman.access"
+    assert data["message"] == "GET /v1/songs"
+    assert data["duration_ms"] == 1.5
+    assert data["route"] == "/v1/songs/"
+    assert "args" not in data and "msg" not in data
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+        self.threads: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+        self.threads.append(threading.current_thread().name)
+
+
+def test_queue_listeners() -> None:
+    logger = logging.getLogger("karman.test.queue")
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+
+    (listener,) = start_queue_listeners([logger])
+    assert start_queue_listeners([logger]) == []
+    logger.warning("Hello %s", "World")
+    listener.stop()
+
+    assert [record.getMessage() for record in handler.records] == ["Hello World"]
+    # Every queue gets its own copy of the record.
+    record = logging.LogRecord("karman", logging.INFO, __file__, 1, "Hi", None, None)
+    (queue_handler,) = logger.handlers
+    assert isinstance(queue_handler, QueueHandler)
+    assert queue_handler.prepare(record) is not record
+    assert handler.threads != [threading.current_thread().name]
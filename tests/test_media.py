@@ -0,0 +1,102 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+import sqlalchemy
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from starlette.types import Message
+
+from karman import models
+from karman.util import MediaResponse, parse_range
+from karman.util.media import ZERO_COPY_SEND
+
+songs = models.Song.Meta.table
+
+
+def test_parse_range() -> None:
+    assert parse_range("bytes=0-99", 1000) == (0, 100)
+    assert parse_range("bytes=900-", 1000) == (900, 1000)
+    assert parse_range("bytes=900-2000", 1000) == (900, 1000)
+    assert parse_range("bytes=-100", 1000) == (900, 1000)
+    assert parse_range("bytes=-2000", 1000) == (0, 1000)
+    assert parse_range("bytes=0-1,5-6", 1000) is None
+    assert parse_range("bytes=5-1", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    assert parse_range("bytes=a-1", 1000) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=1000-", 1000)
+    with pytest.raises(ValueError):
+        parse_range("bytes=-0", 1000)
+
+
+def test_get_song_audio(
+    db: sqlalchemy.engine.Engine, client: TestClient, tmp_path: Path
+) -> None:
+    data = bytes(range(256)) * 1024
+    (tmp_path / "song.mp3").write_bytes(data)
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            {
+                "title": "Diamonds",
+                "artist": "Rihanna",
+                "path": str(tmp_path / "song.txt"),
+                "audio_file": "song.mp3",
+                "video_file": "../video.mp4",
+            },
+        )
+
+    song = client.get("/v1/songs/1").json()
+    assert song["audioUrl"] == "http://testserver/v1/songs/1/audio"
+    response = client.get("/v1/songs/1/audio")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "audio/mpeg"
+    assert response.content == data
+
+    etag = response.headers["ETag"]
+    response = client.get(
+        "/v1/songs/1/audio", headers={"Range": "bytes=1000-1999", "If-Range": etag}
+    )
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes 1000-1999/{len(data)}"
+    assert response.content == data[1000:2000]
+    response = client.get(
+        "/v1/songs/1/audio", headers={"Range": "bytes=0-1", "If-Range": '"old"'}
+    )
+    assert response.status_code == 200
+    response = client.get("/v1/songs/1/audio", headers={"Range": "bytes=999999-"})
+    assert response.status_code == 416
+    response = client.get("/v1/songs/1/audio", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Media files outside of the song directory are never served.
+    assert client.get("/v1/songs/1/video").status_code == 404
+    assert client.get("/v1/songs/2/audio").status_code == 404
+
+
+def test_zero_copy_send(tmp_path: Path) -> None:
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"x" * 100)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "headers": [(b"range", b"bytes=10-19")],
+        "extensions": {ZERO_COPY_SEND: {}},
+    }
+    response = MediaResponse(str(path), os.stat(path), Request(scope))
+    messages: List[Message] = []
+
+    async def receive() -> Message:
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    asyncio.run(response(scope, receive, send))
+    start, body = messages
+    assert start["status"] == 206
+    assert (body["type"], body["offset"], body["count"]) == (ZERO_COPY_SEND, 10, 10)
+    assert body["file"].closed
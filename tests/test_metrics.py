@@ -0,0 +1,104 @@
+import asyncio
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from karman import metrics
+from karman.metrics import Counter, Gauge, Histogram, MetricsRegistry
+from karman.replicas import ReplicaSet
+
+
+def test_histogram() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram("duration_seconds", "Duration.", ["route"], buckets=[0.1, 1])
+    )
+    for value in [0.05, 0.1, 0.5, 2]:
+        histogram.observe(value, "/songs")
+    lines = registry.render([(registry.collect(), True)]).splitlines()
+    assert lines[2:] == [
+        'duration_seconds_bucket{route="/songs",le="0.1"} 2',
+        'duration_seconds_bucket{route="/songs",le="1.0"} 3',
+        'duration_seconds_bucket{route="/songs",le="+Inf"} 4',
+        'duration_seconds_sum{route="/songs"} 2.65',
+        'duration_seconds_count{route="/songs"} 4',
+    ]
+
+
+def test_aggregation() -> None:
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("requests_total", "Requests.", ["status"]))
+    gauge = registry.register(Gauge("in_progress", "In progress."))
+    counter.inc(2, "200")
+    gauge.inc(3)
+    values = registry.collect()
+
+    # Gauges of processes that have exited are not reported.
+    output = registry.render([(values, True), (values, True), (values, False)])
+    assert 'requests_total{status="200"} 6' in output
+    assert "in_progress 6" in output
+
+
+def test_export_snapshots(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    update = {"metrics_dir": tmp_path}
+    monkeypatch.setattr(metrics, "settings", metrics.settings.copy(update=update))
+    gauge = 'karman_http_requests_in_progress{method="TEST"}'
+
+    async def run() -> str:
+        await metrics.write_snapshot(tmp_path)
+        # The snapshot appears to be written by another running process.
+        os.replace(tmp_path / f"{os.getpid()}.json", tmp_path / f"{os.getppid()}.json")
+        (tmp_path / "invalid.json").write_text("[]")
+        return await metrics.export()
+
+    metrics.http_requests_in_progress.inc(1, "TEST")
+    try:
+        output = asyncio.run(run())
+    finally:
+        metrics.http_requests_in_progress.dec(1, "TEST")
+    assert f"{gauge} 2" in output.splitlines()
+
+
+def sample(output: str, name: str) -> float:
+    for line in output.splitlines():
+        if line.startswith(f"{name} "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0
+
+
+def test_metrics_endpoint(client: TestClient) -> None:
+    labels = 'method="GET",route="/v1/songs/",version="1.0"'
+    requests = f'karman_http_requests_total{{{labels},status="200"}}'
+    durations = f"karman_http_request_duration_seconds_count{{{labels}}}"
+    hits = 'karman_cache_hits_total{cache="song_list"}'
+    before = client.get("/metrics").text
+
+    client.get("/v1/songs/")
+    client.get("/v1/songs/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert sample(response.text, requests) == sample(before, requests) + 2
+    assert sample(response.text, durations) == sample(before, durations) + 2
+    assert sample(response.text, hits) == sample(before, hits) + 1
+    # The metrics request itself is in progress.
+    assert sample(response.text, 'karman_http_requests_in_progress{method="GET"}') == 1
+
+
+def test_db_pool_metrics(monkeypatch: pytest.MonkeyPatch) -> None:
+    def database(size: int, idle: int, maximum: int) -> Any:
+        pool = SimpleNamespace(size=size, freesize=idle, maxsize=maximum)
+        return SimpleNamespace(_backend=SimpleNamespace(_pool=pool))
+
+    replica_set = ReplicaSet(database(4, 1, 10), [database(2, 2, 5), database(0, 0, 5)])
+    monkeypatch.setattr(metrics, "replicas", replica_set)
+    output = metrics.registry.render([(metrics.registry.collect(), True)])
+    connections = "karman_db_pool_connections"
+    assert sample(output, f'{connections}{{database="primary",state="in_use"}}') == 3
+    assert sample(output, f'{connections}{{database="replica1",state="idle"}}') == 2
+    maximum = 'karman_db_pool_max_connections{database="replica2"}'
+    assert sample(output, maximum) == 5
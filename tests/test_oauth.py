@@ -0,0 +1,195 @@
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, Security
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+
+from karman import oauth
+from karman.oauth import (
+    KeyRing,
+    Scope,
+    TokenAuthority,
+    TokenClaims,
+    TokenError,
+    TokenType,
+    authenticate,
+    hash_password,
+    verify_password,
+)
+from karman.routes import auth
+
+
+class FakeClock:
+    def __init__(self, time: float = 1000) -> None:
+        self.time = time
+
+    def __call__(self) -> float:
+        return self.time
+
+
+def test_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = FakeClock()
+    authority = TokenAuthority(KeyRing(), 60, 3600, cache_size=2, clock=clock)
+    token = authority.issue("alice", [Scope.READ_SONGS])
+    claims = authority.verify(token)
+    assert claims.subject == "alice"
+    assert claims.scopes == {Scope.READ_SONGS}
+    assert claims.expires == 1060
+
+    # Cached tokens are not verified again.
+    def fail(token: str) -> TokenClaims:
+        raise AssertionError("The signature was verified again.")
+
+    monkeypatch.setattr(authority, "_verify_signature", fail)
+    assert authority.verify(token) == claims
+    monkeypatch.undo()
+
+    with pytest.raises(TokenError):
+        authority.verify(token, TokenType.refresh)
+    with pytest.raises(TokenError):
+        authority.verify(token[:-2])
+    with pytest.raises(TokenError):
+        authority.verify("not a token")
+    clock.time = 1060
+    with pytest.raises(TokenError):
+        authority.verify(token)
+
+
+def test_key_rotation(tmp_path: Path) -> None:
+    path = tmp_path / "keys"
+    path.write_text("old first-secret\n")
+    clock = FakeClock()
+    keys = KeyRing(path, check_interval=10, clock=clock)
+    authority = TokenAuthority(keys, 60, 3600, cache_size=10)
+    old = authority.issue("alice", [])
+    authority.verify(old)
+
+    path.write_text("# Rotated\nnew second-secret\nold first-secret\n")
+    clock.time += 10
+    new = authority.issue("alice", [])
+    assert keys.signing_key[0] == "new"
+    authority.verify(old)
+    authority.verify(new)
+
+    path.write_text("new second-secret\n")
+    clock.time += 10
+    with pytest.raises(TokenError):
+        authority.verify(old)
+    authority.verify(new)
+
+    # A broken file does not remove the current keys.
+    path.write_text("")
+    clock.time += 10
+    authority.verify(new)
+
+
+def test_passwords() -> None:
+    password_hash = hash_password("hunter2", iterations=1000)
+    assert verify_password("hunter2", password_hash)
+    assert not verify_password("hunter3", password_hash)
+    assert not verify_password("hunter2", "invalid")
+
+
+def test_token_endpoint(monkeypatch: pytest.MonkeyPatch, client: TestClient) -> None:
+    users = {"alice": SecretStr(hash_password("hunter2", iterations=1000))}
+    monkeypatch.setattr(auth, "settings", auth.settings.copy(update={"users": users}))
+
+    response = client.post(
+        "/v1/token",
+        data={"grant_type": "password", "username": "alice", "password": "hunter2"},
+    )
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    body = response.json()
+    assert body["scope"] == "songs songs:rate songs:read"
+    assert auth.tokens.verify(body["access_token"]).subject == "alice"
+
+    response = client.post(
+        "/v1/token",
+        data={
+            "grant_type": "refresh_token",
+            "refresh_token": body["refresh_token"],
+            "scope": "songs:read",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["scope"] == "songs:read"
+    response = client.post(
+        "/v1/token",
+        data={
+            "grant_type": "refresh_token",
+            "refresh_token": response.json()["refresh_token"],
+            "scope": "songs",
+        },
+    )
+    assert response.json()["error"] == "invalid_scope"
+
+    response = client.post(
+        "/v1/token",
+        data={"grant_type": "password", "username": "alice", "password": "wrong"},
+    )
+    assert response.status_code == 400
+    assert response.json()["error"] == "invalid_grant"
+    response = client.post(
+        "/v1/token",
+        data={"grant_type": "refresh_token", "refresh_token": body["access_token"]},
+    )
+    assert response.json()["error"] == "invalid_grant"
+
+
+def test_token_endpoint_errors(
+    monkeypatch: pytest.MonkeyPatch, client: TestClient
+) -> None:
+    users = {"alice": SecretStr(hash_password("hunter2", iterations=1000))}
+    monkeypatch.setattr(auth, "settings", auth.settings.copy(update={"users": users}))
+    checked = []
+    monkeypatch.setattr(
+        auth,
+        "verify_password",
+        lambda password, password_hash: checked.append(password_hash) or False,
+    )
+
+    data = {"grant_type": "password", "username": "alice", "password": "hunter2"}
+    response = client.post("/v1/token", data={**data, "scope": "admin"})
+    assert response.json()["error"] == "invalid_scope"
+    response = client.post("/v1/token", data={**data, "scope": "songs:read admin"})
+    assert response.json()["error"] == "invalid_scope"
+    assert not checked
+
+    # Unknown users are checked against a dummy hash.
+    response = client.post("/v1/token", data={**data, "username": "mallory"})
+    assert response.json()["error"] == "invalid_grant"
+    assert checked == [auth.dummy_password_hash]
+    assert not verify_password("", auth.dummy_password_hash)
+
+
+def test_authenticate() -> None:
+    app = FastAPI()
+
+    @app.get("/")
+    def endpoint(
+        claims: TokenClaims = Security(authenticate, scopes=[Scope.READ_SONGS.value])
+    ) -> str:
+        return claims.subject
+
+    client = TestClient(app)
+    token = auth.tokens.issue("alice", [Scope.SONGS])
+    response = client.get("/", headers={"Authorization": f"Bearer {token}"})
+    assert response.json() == "alice"
+    assert client.get("/").status_code == 401
+    response = client.get("/", headers={"Authorization": "Bearer invalid"})
+    assert response.status_code == 401
+    assert 'error="invalid_token"' in response.headers["WWW-Authenticate"]
+    token = auth.tokens.issue("alice", [])
+    response = client.get("/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+
+def test_check_token_keys(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(oauth, "tokens", TokenAuthority(KeyRing(), 60, 3600, 0))
+    monkeypatch.setattr(oauth, "settings", oauth.settings.copy(update={"debug": True}))
+    oauth.check_token_keys()
+    monkeypatch.setattr(oauth, "settings", oauth.settings.copy(update={"debug": False}))
+    with pytest.raises(RuntimeError):
+        oauth.check_token_keys()
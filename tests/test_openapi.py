@@ -0,0 +1,51 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from karman.util.openapi import serve_openapi
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="Test")
+
+    @app.get("/items")
+    def get_items() -> list:
+        return []
+
+    return app
+
+
+def test_openapi_document() -> None:
+    app = create_app()
+    document = serve_openapi(app)
+    document.prepare()
+    assert document.variants is not None
+    assert gzip.decompress(document.variants["gzip"]) == document.variants["identity"]
+
+    client = TestClient(app)
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert "/items" in response.json()["paths"]
+    assert response.content == document.variants["identity"]
+
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json() == app.openapi()
+    etag = response.headers["ETag"]
+    assert etag != document.etags["identity"]
+
+    response = client.get(
+        "/openapi.json", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+def test_v1_openapi_document(client: TestClient) -> None:
+    response = client.get("/v1/openapi.json", headers={"Accept-Encoding": "gzip;q=0"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert response.json()["info"]["title"] == "Karman API"
+    assert client.get("/v1/docs").status_code == 200
@@ -0,0 +1,130 @@
+import asyncio
+from typing import Any, List, Optional
+
+import pytest
+import sqlalchemy
+from fastapi import HTTPException
+
+from karman import models
+from karman.models.song import song_year_key
+from karman.pagination import Cursor, CursorParams, paginate
+
+songs = models.Song.Meta.table
+
+
+def test_cursor_roundtrip() -> None:
+    cursor = Cursor("-title", "Love The Way You Lie", 123, backwards=True)
+    assert Cursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.parametrize("value", ["", "foo", "WzEsMiwzXQ", "WyJhIiwxLCJiIixmYWxzZV0"])
+def test_invalid_cursor(value: str) -> None:
+    with pytest.raises(ValueError):
+        Cursor.decode(value)
+
+
+def fetch_all_pages(ordering: str, key: Any, descending: bool) -> List[List[int]]:
+    async def run() -> List[List[int]]:
+        pages = []
+        cursor: Optional[str] = None
+        async with models.database:
+            while True:
+                params = CursorParams(limit=3, cursor=cursor)
+                rows, next_cursor, _ = await paginate(
+                    models.database,
+                    songs.select(),
+                    ordering,
+                    key,
+                    songs.c.id,
+                    params,
+                    descending,
+                )
+                pages.append([row["id"] for row in rows])
+                cursor = next_cursor
+                if cursor is None:
+                    return pages
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_paginate(db: sqlalchemy.engine.Engine, descending: bool) -> None:
+    years = [2010, None, 1999, 2010, None, 2021, 1999, 2010]
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [
+                {"id": i + 1, "title": f"Song {i % 3}", "artist": "A", "year": year}
+                for i, year in enumerate(years)
+            ],
+        )
+    expected = sorted(
+        range(1, len(years) + 1),
+        key=lambda id: (years[id - 1] or 0, id),
+        reverse=descending,
+    )
+
+    pages = fetch_all_pages("year", song_year_key, descending)
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert sum(pages, []) == expected
+
+
+def test_paginate_backwards(db: sqlalchemy.engine.Engine) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [{"id": i, "title": f"Song {i % 4}", "artist": "A"} for i in range(1, 11)],
+        )
+    forward = fetch_all_pages("title", songs.c.title, False)
+
+    async def last_page_cursor() -> Optional[str]:
+        cursor = None
+        async with models.database:
+            for _ in range(len(forward) - 1):
+                params = CursorParams(limit=3, cursor=cursor)
+                _, cursor, _ = await paginate(
+                    models.database,
+                    songs.select(),
+                    "title",
+                    songs.c.title,
+                    songs.c.id,
+                    params,
+                )
+            return cursor
+
+    cursor = asyncio.run(last_page_cursor())
+    assert cursor is not None
+    pages: List[List[int]] = []
+
+    async def run() -> None:
+        nonlocal cursor
+        async with models.database:
+            while cursor is not None:
+                params = CursorParams(limit=3, cursor=cursor)
+                rows, _, cursor = await paginate(
+                    models.database,
+                    songs.select(),
+                    "title",
+                    songs.c.title,
+                    songs.c.id,
+                    params,
+                )
+                pages.insert(0, [row["id"] for row in rows])
+
+    asyncio.run(run())
+    assert pages == forward
+
+
+def test_paginate_wrong_ordering() -> None:
+    params = CursorParams(limit=3, cursor=Cursor("title", "A", 1).encode())
+    with pytest.raises(HTTPException):
+        asyncio.run(
+            paginate(
+                models.database,
+                songs.select(),
+                "-title",
+                songs.c.title,
+                songs.c.id,
+                params,
+            )
+        )
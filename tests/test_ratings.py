@@ -0,0 +1,88 @@
+import asyncio
+
+import sqlalchemy
+from fastapi.testclient import TestClient
+
+from karman import models
+from karman.oauth import Scope, tokens
+from karman.ratings import reconcile_ratings
+from karman.routes.songs import song_list_cache
+
+songs = models.Song.Meta.table
+
+
+def test_ratings(db: sqlalchemy.engine.Engine, client: TestClient) -> None:
+    with db.begin() as connection:
+        connection.execute(songs.insert(), {"title": "Diamonds", "artist": "Rihanna"})
+    assert client.get("/v1/songs/1").json()["averageRating"] is None
+    etag = client.get("/v1/songs/1").headers["ETag"]
+    bob = {"Authorization": f"Bearer {tokens.issue('bob', [Scope.RATE_SONGS])}"}
+
+    assert client.put("/v1/songs/1/rating", json={"rating": 8}).status_code == 200
+    assert (
+        client.put("/v1/songs/1/rating", json={"rating": 6.5}, headers=bob).status_code
+        == 200
+    )
+    response = client.get("/v1/songs/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["averageRating"] == 7.3
+    assert client.get("/v1/songs/").json()["items"][0]["averageRating"] == 7.3
+
+    client.put("/v1/songs/1/rating", json={"rating": 10})
+    assert client.get("/v1/songs/1/ratings/alice").json() == {"rating": 10}
+    assert client.get("/v1/songs/1").json()["averageRating"] == 8.3
+    assert client.delete("/v1/songs/1/rating", headers=bob).status_code == 204
+    assert client.get("/v1/songs/1").json()["averageRating"] == 10
+
+    assert client.get("/v1/songs/1/ratings/bob").status_code == 404
+    assert client.delete("/v1/songs/1/rating", headers=bob).status_code == 404
+    assert client.put("/v1/songs/2/rating", json={"rating": 5}).status_code == 404
+    assert client.put("/v1/songs/1/rating", json={"rating": 11}).status_code == 422
+
+    # Ratings require a token with the songs:rate scope.
+    read_only = {"Authorization": f"Bearer {tokens.issue('bob', [Scope.READ_SONGS])}"}
+    response = client.put("/v1/songs/1/rating", json={"rating": 5}, headers=read_only)
+    assert response.status_code == 403
+    del client.headers["Authorization"]
+    assert client.delete("/v1/songs/1/rating").status_code == 401
+
+    # Ratings do not invalidate the caches of the whole library.
+    generation = song_list_cache.generation
+    response = client.put("/v1/songs/1/rating", json={"rating": 5}, headers=bob)
+    assert response.status_code == 200
+    assert client.delete("/v1/songs/1/rating", headers=bob).status_code == 204
+    assert song_list_cache.generation == generation
+
+
+def test_reconcile_ratings(db: sqlalchemy.engine.Engine) -> None:
+    ratings = models.Rating.Meta.table
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [
+                {"title": "A", "artist": "A", "rating_total": 9, "rating_count": 1},
+                {"title": "B", "artist": "B", "rating_total": 0, "rating_count": 0},
+                {"title": "C", "artist": "C", "rating_total": 3, "rating_count": 1},
+            ],
+        )
+        connection.execute(
+            ratings.insert(),
+            [
+                {"song_id": 1, "username": "alice", "rating": 9},
+                {"song_id": 2, "username": "alice", "rating": 4.5},
+                {"song_id": 2, "username": "bob", "rating": 5},
+            ],
+        )
+
+    async def reconcile() -> int:
+        async with models.database:
+            return await reconcile_ratings(batch_size=2)
+
+    assert asyncio.run(reconcile()) == 2
+    rows = db.execute(
+        sqlalchemy.select([songs.c.rating_total, songs.c.rating_count]).order_by(
+            songs.c.id
+        )
+    )
+    assert [tuple(row) for row in rows] == [(9, 1), (9.5, 2), (0, 0)]
+    assert asyncio.run(reconcile()) == 0
@@ -0,0 +1,59 @@
+import asyncio
+from pathlib import Path
+from typing import List
+
+import databases
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from karman.replicas import PIN_COOKIE, ReadYourWritesMiddleware, ReplicaSet
+
+
+def test_reader_round_robin() -> None:
+    primary = databases.Database("sqlite:///primary.sqlite")
+    first = databases.Database("sqlite:///first.sqlite")
+    second = databases.Database("sqlite:///second.sqlite")
+    replicas = ReplicaSet(primary, [first, second])
+    # Replicas are unhealthy until they have been checked.
+    assert replicas.reader() is primary
+    replicas.healthy = [True, True]
+    assert [replicas.reader() for _ in range(4)] == [second, first, second, first]
+    replicas.healthy = [False, True]
+    assert [replicas.reader() for _ in range(2)] == [second, second]
+    assert replicas.reader(pinned=True) is primary
+
+
+def test_check(tmp_path: Path) -> None:
+    primary = databases.Database("sqlite:///primary.sqlite")
+    replica = databases.Database(f"sqlite:///{tmp_path / 'replica.sqlite'}")
+    missing = databases.Database(f"sqlite:///{tmp_path / 'missing' / 'db.sqlite'}")
+    replicas = ReplicaSet(primary, [replica, missing])
+
+    async def check() -> List[bool]:
+        await replicas.check()
+        healthy = list(replicas.healthy)
+        await replicas.stop()
+        return healthy
+
+    assert asyncio.run(check()) == [True, False]
+    assert not replica.is_connected
+
+
+def test_read_your_writes_middleware() -> None:
+    def endpoint(request: Request) -> PlainTextResponse:
+        status = 400 if "fail" in request.query_params else 200
+        return PlainTextResponse(str(PIN_COOKIE in request.cookies), status)
+
+    app = Starlette(routes=[Route("/", endpoint, methods=["GET", "POST"])])
+    app.add_middleware(ReadYourWritesMiddleware, max_age=2.5)
+    client = TestClient(app)
+    assert "set-cookie" not in client.get("/").headers
+    assert "set-cookie" not in client.post("/?fail").headers
+    response = client.post("/")
+    assert response.headers["set-cookie"] == (
+        f"{PIN_COOKIE}=1; Max-Age=3; Path=/; HttpOnly; SameSite=Lax"
+    )
+    assert client.get("/").text == "True"
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import sqlalchemy
+
+from karman import models
+from karman.pagination import CursorParams, paginate
+from karman.search import search_songs
+
+songs = models.Song.Meta.table
+
+
+def song(
+    title: str, artist: str, featured_artists: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    return {
+        "title": title,
+        "artist": artist,
+        "featured_artists": featured_artists or [],
+    }
+
+
+def search(q: str) -> List[str]:
+    async def run() -> List[str]:
+        async with models.database:
+            query, key, id = search_songs(models.database, q)
+            params = CursorParams(limit=10, cursor=None)
+            rows, _, _ = await paginate(models.database, query, q, key, id, params)
+            return [row["title"] for row in rows]
+
+    return asyncio.run(run())
+
+
+def test_search(db: sqlalchemy.engine.Engine) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [
+                song("Love The Way You Lie", "Eminem"),
+                song("Diamonds", "Rihanna"),
+                song("Monster", "Eminem", ["Love"]),
+                song("Café", "Nobody"),
+                song("Deleted", "Nobody"),
+            ],
+        )
+        connection.execute(
+            songs.update().where(songs.c.title == "Diamonds").values(artist="Lover")
+        )
+        connection.execute(songs.delete().where(songs.c.title == "Deleted"))
+
+    assert set(search("love")) == {"Love The Way You Lie", "Diamonds", "Monster"}
+    assert search("love way")[0] == "Love The Way You Lie"
+    assert search("emi lie") == ["Love The Way You Lie"]
+    assert search("cafe") == ["Café"]
+    assert search("deleted") == []
+    assert search("!?") == []
+
+
+def test_search_ranking(db: sqlalchemy.engine.Engine) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [song("Other", "Nobody", ["Hello"]), song("Hello", "Nobody")],
+        )
+    assert search("hello") == ["Hello", "Other"]
@@ -0,0 +1,66 @@
+import asyncio
+from decimal import Decimal
+from typing import Any, List
+
+import orjson
+import sqlalchemy
+
+from karman import models, schemas
+from karman.serialization import RowSerializer, dumps
+
+songs = models.Song.Meta.table
+
+
+def test_row_serializer(db: sqlalchemy.engine.Engine) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [
+                {
+                    "title": "Love The Way You Lie",
+                    "artist": "Eminem",
+                    "featured_artists": ["Rihanna"],
+                    "year": 2010,
+                    "duration": Decimal("266.123"),
+                    "golden_notes": True,
+                    "audio_file": "song.mp3",
+                },
+                {
+                    "title": "Diamonds",
+                    "artist": "Rihanna",
+                    "featured_artists": [],
+                    "year": None,
+                    "duration": None,
+                    "golden_notes": False,
+                    "audio_file": None,
+                },
+            ],
+        )
+
+    async def fetch() -> List[Any]:
+        async with models.database:
+            return await models.database.fetch_all(songs.select())
+
+    rows = asyncio.run(fetch())
+    serializer = RowSerializer[str](
+        schemas.Song,
+        {
+            "audio_url": lambda row, base: f"{base}{row['id']}"
+            if row["audio_file"]
+            else None
+        },
+    )
+    actual = serializer.to_dicts(rows, "http://localhost/")
+    expected = [
+        schemas.Song.parse_obj(
+            {
+                **row._mapping,
+                "audio_url": "http://localhost/1" if row["id"] == 1 else None,
+            }
+        ).json(by_alias=True)
+        for row in rows
+    ]
+    assert orjson.loads(dumps(actual)) == [orjson.loads(song) for song in expected]
+    assert actual[0]["featuredArtists"] == ["Rihanna"]
+    assert actual[0]["averageRating"] is None
+    assert serializer.to_dicts([]) == []
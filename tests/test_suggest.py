@@ -0,0 +1,69 @@
+import asyncio
+
+import sqlalchemy
+
+from karman import models
+from karman.signals import songs_changed
+from karman.suggest import TrigramIndex, build_song_index, song_index, trigrams
+
+songs = models.Song.Meta.table
+
+
+def test_trigrams() -> None:
+    assert trigrams("Hé!") == {"  h", " he", "he "}
+    assert trigrams("a b") == {"  a", " a ", "  b", " b "}
+    assert trigrams("") == set()
+
+
+def test_search() -> None:
+    index = TrigramIndex()
+    index.add(1, "Love The Way You Lie", "Eminem", "Rihanna")
+    index.add(2, "Diamonds", "Rihanna")
+    index.add(3, "Lose Yourself", "Eminem")
+
+    assert [id for id, _ in index.search("luv the wa")] == [1]
+    assert [id for id, _ in index.search("diamnds")] == [2]
+    assert [id for id, _ in index.search("rihanna")] == [2, 1]
+    assert index.search("xyz") == []
+
+    index.add(2, "Umbrella", "Rihanna")
+    assert index.search("diamonds") == []
+    index.remove(1)
+    assert [id for id, _ in index.search("rihanna")] == [2]
+    assert len(index) == 2
+
+
+def test_compact() -> None:
+    index = TrigramIndex()
+    for id in range(5000):
+        index.add(id, f"Song {id}")
+    for id in range(0, 5000, 2):
+        index.remove(id)
+    assert len(index) == 2500
+    assert index.search("song 4321", 1)[0][0] == 4321
+    assert index.search("song 4320", 1)[0][0] != 4320
+
+
+def test_song_index(db: sqlalchemy.engine.Engine) -> None:
+    with db.begin() as connection:
+        connection.execute(
+            songs.insert(),
+            [
+                {"id": 1, "title": "Diamonds", "artist": "Rihanna"},
+                {"id": 2, "title": "Monster", "artist": "Eminem"},
+            ],
+        )
+
+    async def run() -> None:
+        async with models.database:
+            await build_song_index(models.database)
+            await models.database.execute(
+                songs.update().where(songs.c.id == 1).values(title="Umbrella")
+            )
+            await models.database.execute(songs.delete().where(songs.c.id == 2))
+            await songs_changed.send([1, 2])
+
+    asyncio.run(run())
+    assert [id for id, _ in song_index.search("umbrela")] == [1]
+    assert song_index.search("diamonds") == []
+    assert 2 not in song_index
@@ -0,0 +1,139 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+import sqlalchemy
+from fastapi.testclient import TestClient
+
+from karman import models
+from karman.thumbnails import ThumbnailCache, ThumbnailError
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_thumbnail_cache(tmp_path: Path) -> None:
+    for name, color in (("red.png", "red"), ("copy.png", "red"), ("blue.png", "blue")):
+        Image.new("RGB", (1000, 500), color).save(tmp_path / name)
+    cache = ThumbnailCache(tmp_path / "cache", max_size=10**6, workers=1)
+
+    async def run() -> None:
+        red = str(tmp_path / "red.png")
+        first, second = await asyncio.gather(
+            cache.get(red, os.stat(red), 128), cache.get(red, os.stat(red), 128)
+        )
+        assert first == second
+        with Image.open(first) as image:
+            assert image.size == (128, 64)
+        # Identical images share their variants.
+        copy = str(tmp_path / "copy.png")
+        assert await cache.get(copy, os.stat(copy), 128) == first
+
+        # The least recently used variant is evicted.
+        cache.max_size = cache.size
+        blue = str(tmp_path / "blue.png")
+        await cache.get(blue, os.stat(blue), 128)
+        assert not os.path.exists(first)
+        assert cache.size <= cache.max_size
+
+    try:
+        asyncio.run(run())
+    finally:
+        cache.close()
+
+
+def test_thumbnail_discard(tmp_path: Path) -> None:
+    for name, color in (("red.png", "red"), ("copy.png", "red"), ("blue.png", "blue")):
+        Image.new("RGB", (100, 100), color).save(tmp_path / name)
+    cache = ThumbnailCache(tmp_path / "cache", max_size=10**6, workers=1)
+    red, copy, blue = (
+        str(tmp_path / name) for name in ("red.png", "copy.png", "blue.png")
+    )
+
+    async def run() -> None:
+        shared = await cache.get(red, os.stat(red), 128)
+        await cache.get(copy, os.stat(copy), 128)
+        only = await cache.get(blue, os.stat(blue), 128)
+        await cache.discard([red, blue])
+        # The variant of the red image is still used by its copy.
+        assert os.path.exists(shared)
+        assert not os.path.exists(only)
+        assert cache.size == os.path.getsize(shared)
+
+    try:
+        asyncio.run(run())
+    finally:
+        cache.close()
+
+
+def test_thumbnail_shared_directory(tmp_path: Path) -> None:
+    for name, color in (("red.png", "red"), ("blue.png", "blue")):
+        Image.new("RGB", (100, 100), color).save(tmp_path / name)
+    cache = ThumbnailCache(
+        tmp_path / "cache", max_size=10**6, workers=1, max_variants=1
+    )
+    red, blue = str(tmp_path / "red.png"), str(tmp_path / "blue.png")
+
+    async def run() -> None:
+        path = await cache.get(red, os.stat(red), 128)
+        # Variants evicted by another process are rendered again.
+        os.unlink(path)
+        assert await cache.get(red, os.stat(red), 128) == path
+        assert os.path.exists(path)
+
+        # Only the most recently used variants are remembered.
+        blue_path = await cache.get(blue, os.stat(blue), 128)
+        assert [key[0] for key in cache._variants] == [blue]
+
+        # Eviction uses the modification times on disk.
+        other = ThumbnailCache(tmp_path / "cache", max_size=10**6, workers=1)
+        try:
+            await other.get(red, os.stat(red), 128)
+            other.max_size = os.path.getsize(path)
+            await other.get(red, os.stat(red), 256)
+            assert not os.path.exists(blue_path)
+            assert await cache.get(blue, os.stat(blue), 128) == blue_path
+            assert os.path.exists(blue_path)
+        finally:
+            other.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        cache.close()
+
+
+def test_thumbnail_invalid(tmp_path: Path) -> None:
+    (tmp_path / "invalid.png").write_bytes(b"not an image")
+    cache = ThumbnailCache(tmp_path / "cache", max_size=10**6, workers=1)
+    invalid = str(tmp_path / "invalid.png")
+
+    async def run() -> None:
+        with pytest.raises(ThumbnailError):
+            await cache.get(invalid, os.stat(invalid), 128)
+
+    try:
+        asyncio.run(run())
+    finally:
+        cache.close()
+
+
+def test_get_song_artwork_invalid(
+    db: sqlalchemy.engine.Engine, client: TestClient, tmp_path: Path
+) -> None:
+    (tmp_path / "cover.png").write_bytes(b"not an image")
+    with db.begin() as connection:
+        connection.execute(
+            models.Song.Meta.table.insert(),
+            {
+                "title": "Diamonds",
+                "artist": "Rihanna",
+                "path": str(tmp_path / "song.txt"),
+                "cover_file": "cover.png",
+            },
+        )
+    # The original image is returned if it cannot be resized.
+    response = client.get("/v1/songs/1/artwork", params={"size": "small"})
+    assert response.status_code == 200
+    assert response.content == b"not an image"
+    assert "Cache-Control" not in response.headers
@@ -0,0 +1,96 @@
+from decimal import Decimal
+from typing import List
+
+import pytest
+
+from karman.ultrastar import UltraStarError, parse
+
+SONG = """﻿#TITLE:Love The Way You Lie
+#ARTIST:Eminem feat. Rihanna
+#MP3:Eminem - Love The Way You Lie.mp3
+#COVER:Eminem - Love The Way You Lie [CO].jpg
+#YEAR:2010
+#GENRE:Hip-Hop
+#BPM:300,5
+#GAP:1000
+: 0 4 5 Just
+* 4 4 7 gon-
+- 10
+: 12 8 5 na
+E
+: 1000 10 10 ignored
+"""
+
+
+def test_parse() -> None:
+    song = parse(SONG.encode().splitlines())
+    assert song.title == "Love The Way You Lie"
+    assert song.artist == "Eminem"
+    assert song.featured_artists == ["Rihanna"]
+    assert song.year == 2010
+    assert song.genre == "Hip-Hop"
+    assert song.audio == "Eminem - Love The Way You Lie.mp3"
+    assert song.cover == "Eminem - Love The Way You Lie [CO].jpg"
+    assert song.video is None
+    assert song.players == 1
+    assert song.golden_notes
+    # 1s gap + 20 beats at 300.5 BPM
+    assert song.duration == Decimal("1.998")
+
+
+def test_parse_duet() -> None:
+    lines = [
+        b"#TITLE:Duet",
+        b"#ARTIST:A & B",
+        b"#BPM:60",
+        b"P1",
+        b": 0 4 1 a",
+        b"P2",
+        b": 0 8 1 b",
+        b"E",
+    ]
+    song = parse(lines)
+    assert song.artist == "A & B"
+    assert song.featured_artists == []
+    assert song.players == 2
+    assert not song.golden_notes
+    assert song.duration == Decimal("2.000")
+
+
+def test_parse_relative() -> None:
+    lines = [
+        b"#TITLE:Relative",
+        b"#ARTIST:A",
+        b"#BPM:60",
+        b"#RELATIVE:yes",
+        b": 0 4 1 a",
+        b"- 6 10",
+        b": 2 4 1 b",
+        b"E",
+    ]
+    assert parse(lines).duration == Decimal("4.000")
+
+
+def test_parse_legacy_encoding() -> None:
+    song = parse(["#TITLE:Caf\xe9".encode("cp1252"), b"#ARTIST:A", b"#BPM:60"])
+    assert song.title == "Caf\xe9"
+    assert song.duration is None
+
+
+@pytest.mark.parametrize("year", ["", "0", "20.10", "two thousand", "\u00b2"])
+def test_parse_invalid_year(year: str) -> None:
+    song = parse([b"#TITLE:A", b"#ARTIST:A", b"#BPM:60", f"#YEAR:{year}".encode()])
+    assert song.year is None
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        [b"#ARTIST:A", b"#BPM:60"],
+        [b"#TITLE:A", b"#ARTIST:A", b"#BPM:fast"],
+        [b"#TITLE:A", b"#ARTIST:A", b"#BPM:60", b": 0 x 1 a"],
+    ],
+)
+def test_parse_invalid(lines: List[bytes]) -> None:
+    with pytest.raises(UltraStarError):
+        parse(lines)
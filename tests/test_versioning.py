@@ -0,0 +1,34 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+
+from karman.versioning import select_routes, strict_version_selector, version
+
+
+def test_select_routes() -> None:
+    router = APIRouter()
+
+    @version(1)
+    @version(2, deprecated=True)
+    @router.get("/a")
+    def a() -> None:
+        pass
+
+    @version(2)
+    @router.get("/b")
+    def b() -> None:
+        pass
+
+    v1, v2 = FastAPI(), FastAPI()
+    select_routes(router, v1, strict_version_selector(1))
+    select_routes(router, v2, strict_version_selector(2))
+
+    v1_a, (v2_a, v2_b) = v1.router.routes[-1], v2.router.routes[-2:]
+    assert isinstance(v1_a, APIRoute)
+    assert isinstance(v2_a, APIRoute) and isinstance(v2_b, APIRoute)
+    assert v1_a.path == "/a"
+    assert [v2_a.path, v2_b.path] == ["/a", "/b"]
+    # Routes share their internals and are only copied to override deprecation.
+    assert v1_a is router.routes[0]
+    assert v2_b is router.routes[1]
+    assert v2_a is not v1_a and v2_a.dependant is v1_a.dependant
+    assert v2_a.deprecated and not v1_a.deprecated